@@ -0,0 +1,115 @@
+"""
+Account index for LifeLink Blood Bank Management System
+
+The ``account`` table maps every donor and patient email to its user type,
+id and password hash, so login and the registration duplicate check are a
+single indexed lookup instead of one query per user table. Index rows are
+written on the same connection as the Donor/Patient write they mirror
+(mapper events for ORM writes, ``index_users`` for bulk loads), so they
+commit or roll back together with the user row.
+
+New passwords are hashed with ``PASSWORD_HASH_METHOD``. A hash made with
+any other method is rehashed the next time its owner logs in, so the
+login cost can be tuned without resetting passwords.
+"""
+
+from flask import current_app
+from sqlalchemy import event, exists, inspect, literal, select
+from werkzeug.security import generate_password_hash, check_password_hash
+from models import db, Account, Donor, Patient
+
+USER_TYPES = {Donor: 'donor', Patient: 'patient'}
+MODELS = {user_type: model for model, user_type in USER_TYPES.items()}
+
+_method_prefixes = {}
+
+
+def find_account(email):
+    """Account index row for an email, or None"""
+    return Account.query.filter_by(email=email).first()
+
+
+def email_registered(email):
+    return db.session.query(Account.id).filter_by(email=email).first() is not None
+
+
+def hash_password(password):
+    return generate_password_hash(password, method=current_app.config['PASSWORD_HASH_METHOD'])
+
+
+def _method_prefix(method):
+    """Method part of a hash made with ``method``, defaults filled in (e.g. 'scrypt:32768:8:1')"""
+    if method not in _method_prefixes:
+        _method_prefixes[method] = generate_password_hash('', method=method).split('$', 1)[0]
+    return _method_prefixes[method]
+
+
+def needs_rehash(pwhash):
+    """Whether a stored hash was made with a method other than the configured one"""
+    return pwhash.split('$', 1)[0] != _method_prefix(current_app.config['PASSWORD_HASH_METHOD'])
+
+
+def authenticate(email, password):
+    """Return ``(user_type, user)`` for valid credentials, else None
+
+    Upgrades the stored hash when it was made with an outdated method.
+    """
+    account = find_account(email)
+    if account is None or not check_password_hash(account.password, password):
+        return None
+    user_type, user_id = account.user_type, account.user_id
+    user = db.session.get(MODELS[user_type], user_id)
+    if user is None:
+        return None
+    if needs_rehash(user.password):
+        try:
+            user.password = hash_password(password)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            current_app.logger.exception('password rehash for %s %s failed', user_type, user_id)
+    return user_type, user
+
+
+def index_users(connection, model, *criteria):
+    """Add index rows for the ``model`` users matching ``criteria`` that have none yet
+
+    Used after bulk inserts that bypass the ORM; raises IntegrityError when
+    an email is already registered as the other user type.
+    """
+    table = model.__table__
+    account = Account.__table__
+    users = select(table.c.email, literal(USER_TYPES[model]), table.c.id, table.c.password).where(
+        *criteria,
+        ~exists().where(account.c.user_type == USER_TYPES[model], account.c.user_id == table.c.id)
+    )
+    connection.execute(account.insert().from_select(['email', 'user_type', 'user_id', 'password'], users))
+
+
+def _insert_account(mapper, connection, target):
+    connection.execute(Account.__table__.insert().values(
+        email=target.email, user_type=USER_TYPES[mapper.class_], user_id=target.id, password=target.password
+    ))
+
+
+def _update_account(mapper, connection, target):
+    state = inspect(target)
+    if not (state.attrs.email.history.has_changes() or state.attrs.password.history.has_changes()):
+        return
+    account = Account.__table__
+    connection.execute(account.update().where(
+        account.c.user_type == USER_TYPES[mapper.class_], account.c.user_id == target.id
+    ).values(email=target.email, password=target.password))
+
+
+def _delete_account(mapper, connection, target):
+    account = Account.__table__
+    connection.execute(account.delete().where(
+        account.c.user_type == USER_TYPES[mapper.class_], account.c.user_id == target.id
+    ))
+
+
+for _model in USER_TYPES:
+    event.listen(_model, 'after_insert', _insert_account)
+    event.listen(_model, 'after_update', _update_account)
+    event.listen(_model, 'after_delete', _delete_account)
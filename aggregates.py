@@ -0,0 +1,137 @@
+"""
+Admin dashboard aggregates for LifeLink Blood Bank Management System
+
+All dashboard figures come from one GROUP BY pass over each table plus two
+small "latest rows" lookups. The result is cached for ``ADMIN_STATS_TTL``
+seconds. Refreshes are single-flight: when the cache expires one caller
+recomputes while everyone else keeps getting the previous value, and only
+the very first load makes callers wait.
+"""
+
+import threading
+import time
+from collections import Counter
+from flask import current_app
+from sqlalchemy import func
+from models import db, Donor, Patient, EmergencyRequest
+from compatibility import BLOOD_TYPES
+from emergency_search import normalize_city
+
+
+class AdminAggregates:
+    """TTL-cached dashboard aggregates with single-flight refresh"""
+
+    def __init__(self):
+        self._refresh_lock = threading.Lock()
+        self._data = None
+        self._expires_at = 0
+        self.computations = 0
+        self.last_compute_ms = None
+
+    def get(self):
+        """Return the cached aggregates, recomputing at most once per TTL"""
+        if self._data is not None and time.monotonic() < self._expires_at:
+            return self._data
+        # Without a value yet everyone waits for the first load; afterwards
+        # only the caller that wins the lock recomputes.
+        if self._refresh_lock.acquire(blocking=self._data is None):
+            try:
+                if self._data is None or time.monotonic() >= self._expires_at:
+                    self._refresh()
+            finally:
+                self._refresh_lock.release()
+        return self._data
+
+    def invalidate(self):
+        self._expires_at = 0
+
+    def _refresh(self):
+        start = time.perf_counter()
+        data = self.compute()
+        self._data = data
+        self._expires_at = time.monotonic() + current_app.config.get('ADMIN_STATS_TTL', 60)
+        self.computations += 1
+        self.last_compute_ms = round((time.perf_counter() - start) * 1000, 1)
+
+    def compute(self):
+        """Run the aggregate queries (needs an app context)"""
+        donors_by_type = {bt: {'total': 0, 'available': 0} for bt in BLOOD_TYPES}
+        total_donors = active_donors = 0
+        for blood_type, is_available, count in db.session.query(
+                Donor.blood_type, Donor.is_available, func.count(Donor.id)
+        ).group_by(Donor.blood_type, Donor.is_available):
+            entry = donors_by_type.setdefault(blood_type, {'total': 0, 'available': 0})
+            entry['total'] += count
+            total_donors += count
+            if is_available:
+                entry['available'] += count
+                active_donors += count
+
+        by_urgency, by_type, by_city = Counter(), Counter(), Counter()
+        for urgency, blood_type, city, count in db.session.query(
+                EmergencyRequest.urgency, EmergencyRequest.blood_type, EmergencyRequest.city,
+                func.count(EmergencyRequest.id)
+        ).group_by(EmergencyRequest.urgency, EmergencyRequest.blood_type, EmergencyRequest.city):
+            by_urgency[urgency] += count
+            by_type[blood_type] += count
+            by_city[normalize_city(city) or 'Unknown'] += count
+        total_emergencies = sum(by_urgency.values())
+
+        blood_types = {
+            blood_type: {
+                'donors': entry['total'],
+                'available_donors': entry['available'],
+                'requests': by_type.get(blood_type, 0)
+            } for blood_type, entry in donors_by_type.items()
+        }
+
+        top_cities = current_app.config.get('ADMIN_STATS_TOP_CITIES', 10)
+        return {
+            'totals': {
+                'total_donors': total_donors,
+                'active_donors': active_donors,
+                'total_patients': db.session.query(func.count(Patient.id)).scalar(),
+                'total_emergencies': total_emergencies,
+                # Requests have no fulfillment state yet, so all of them are active
+                'active_emergencies': total_emergencies,
+                'fulfilled_emergencies': 0,
+                'cities_covered': len(by_city)
+            },
+            'requests_by_urgency': dict(by_urgency.most_common()),
+            'requests_by_status': {'active': total_emergencies, 'fulfilled': 0},
+            'blood_types': blood_types,
+            'top_cities': by_city.most_common(top_cities),
+            'recent_emergencies': [
+                {
+                    'id': e.id,
+                    'patient_name': e.patient_name,
+                    'blood_type': e.blood_type,
+                    'urgency': e.urgency,
+                    'hospital': e.hospital,
+                    'city': e.city,
+                    'status': 'Active',
+                    'created_at': e.created_at
+                } for e in EmergencyRequest.query.order_by(EmergencyRequest.id.desc()).limit(5)
+            ],
+            'recent_donors': [
+                {
+                    'id': d.id,
+                    'name': d.name,
+                    'blood_type': d.blood_type,
+                    'address': d.address,
+                    'status': 'Available' if d.is_available else 'Unavailable'
+                } for d in Donor.query.order_by(Donor.id.desc()).limit(5)
+            ],
+            'computed_at': time.time()
+        }
+
+    def stats(self):
+        return {
+            'computations': self.computations,
+            'last_compute_ms': self.last_compute_ms,
+            'cached': self._data is not None and time.monotonic() < self._expires_at
+        }
+
+
+# Global admin aggregates instance
+admin_aggregates = AdminAggregates()
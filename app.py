@@ -11,6 +11,15 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from models import db, Donor, Patient
 from flask_socketio import SocketIO, emit, join_room
+from datetime import datetime
+from chat_writer import chat_writer, user_name
+from user_cache import user_cache
+from stats import site_stats
+from commands import register_commands
+from emergency_feed import emergency_feed
+from fanout import notification_fanout, room_owner
+from fragment_cache import fragment_cache
+from assets import asset_pipeline
 
 app = Flask(__name__)
 
@@ -23,9 +32,16 @@ csrf = CSRFProtect(app)
 db.init_app(app)
 migrate = Migrate(app, db)
 socketio = SocketIO(app)
+chat_writer.init_app(app)
+site_stats.init_app(app)
+emergency_feed.init_app(app, socketio)
+notification_fanout.init_app(app, socketio)
+fragment_cache.init_app(app)
+asset_pipeline.init_app(app)
 
 # Initialize routes
 init_app(app)
+register_commands(app)
 
 # Error handlers
 @app.errorhandler(404)
@@ -44,11 +60,8 @@ def forbidden_error(error):
 @app.context_processor
 def inject_user():
     user = None
-    if 'user_id' in session and 'user_type' in session:
-        if session['user_type'] == 'donor':
-            user = Donor.query.get(session['user_id'])
-        elif session['user_type'] == 'patient':
-            user = Patient.query.get(session['user_id'])
+    if 'user_id' in session and session.get('user_type') in ('donor', 'patient'):
+        user = user_cache.get(session['user_type'], session['user_id'])
     return dict(current_user=user)
 
 @app.context_processor
@@ -62,6 +75,10 @@ def inject_config():
 @socketio.on('join_room')
 def handle_join_room(data):
     room = data['room']
+    # Personal rooms carry private notifications: only their owner may join
+    owner = room_owner(room)
+    if owner is not None and owner != (session.get('user_type'), session.get('user_id')):
+        return
     join_room(room)
 
 @socketio.on('send_message')
@@ -73,34 +90,30 @@ def handle_send_message(data):
     receiver_type = data['receiver_type']
     message = data['message']
     room = data['room']
-    print(f"[DEBUG] handle_send_message: sender_id={sender_id}, sender_type={sender_type}, receiver_id={receiver_id}, receiver_type={receiver_type}, message={message}, room={room}")
-    chat = ChatMessage(sender_id=sender_id, sender_type=sender_type, receiver_id=receiver_id, receiver_type=receiver_type, message=message)
-    db.session.add(chat)
-    db.session.commit()
-    # Get sender and receiver names
-    sender_name = None
-    receiver_name = None
-    if sender_type == 'donor':
-        sender = Donor.query.get(sender_id)
-        sender_name = sender.name if sender else 'Donor'
-    elif sender_type == 'patient':
-        sender = Patient.query.get(sender_id)
-        sender_name = sender.name if sender else 'Patient'
-    if receiver_type == 'donor':
-        receiver = Donor.query.get(receiver_id)
-        receiver_name = receiver.name if receiver else 'Donor'
-    elif receiver_type == 'patient':
-        receiver = Patient.query.get(receiver_id)
-        receiver_name = receiver.name if receiver else 'Patient'
+    app.logger.debug('send_message %s %s -> %s %s in %s', sender_type, sender_id, receiver_type, receiver_id, room)
+    row = {
+        'sender_id': sender_id,
+        'sender_type': sender_type,
+        'receiver_id': receiver_id,
+        'receiver_type': receiver_type,
+        'message': message,
+        'timestamp': datetime.utcnow(),
+        'conversation_key': ChatMessage.make_conversation_key(sender_id, sender_type, receiver_id, receiver_type)
+    }
+    # Write-behind mode queues the row for a batched insert; a full queue
+    # (or the default mode) writes it synchronously before emitting.
+    if not (chat_writer.enabled and chat_writer.submit(row)):
+        db.session.add(ChatMessage(**row))
+        db.session.commit()
     emit('receive_message', {
         'sender_id': sender_id,
         'sender_type': sender_type,
-        'sender_name': sender_name,
+        'sender_name': user_name(sender_type, sender_id),
         'receiver_id': receiver_id,
         'receiver_type': receiver_type,
-        'receiver_name': receiver_name,
+        'receiver_name': user_name(receiver_type, receiver_id),
         'message': message,
-        'timestamp': chat.timestamp.strftime('%Y-%m-%d %H:%M')
+        'timestamp': row['timestamp'].strftime('%Y-%m-%d %H:%M')
     }, room=room)
 
 # Create the application instance
@@ -0,0 +1,184 @@
+"""
+Static asset pipeline for LifeLink Blood Bank Management System
+
+``build()`` copies every file under ``static/`` to ``static/dist/`` with a
+content hash in its name (``js/notify.js`` -> ``js/notify.1a2b3c4d5e.js``),
+stores gzip and, when the optional ``brotli`` package is installed, brotli
+copies of text assets next to it, and records the mapping in
+``manifest.json``. Templates link assets with ``asset_url('js/notify.js')``.
+
+Building is explicit: run ``flask assets build`` at deploy time (and after
+editing static files locally). App startup only reads the manifest, unless
+``ASSETS_AUTO_BUILD`` is set. Each build deletes outputs that neither the
+new manifest nor the one it replaces refers to, so ``static/dist/`` holds
+at most two generations and processes still on the previous manifest keep
+working during a rolling deploy.
+
+A hashed name never changes content, so ``/assets/`` serves it with a
+one-year ``immutable`` cache lifetime and repeat page loads do not even
+revalidate it; any edit produces a new name. The precompressed copy the
+client accepts is sent as-is, so nothing is compressed per request. If an
+asset is missing from the manifest (e.g. ``flask assets build`` not run),
+``asset_url`` falls back to the plain
+``/static/`` URL.
+"""
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import tempfile
+from flask import abort, request, send_file, url_for
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MANIFEST = 'manifest.json'
+HASH_LENGTH = 10
+MAX_AGE = 365 * 24 * 3600
+COMPRESSIBLE = {'.css', '.js', '.json', '.svg', '.txt', '.html', '.map'}
+MIN_COMPRESS_BYTES = 512
+# Best first; each entry is (Content-Encoding, file suffix)
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def _write(path, data):
+    """Write a file atomically so a concurrent request never sees half of it"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp, 0o644)  # mkstemp creates owner-only files
+        os.replace(tmp, path)
+    except Exception:
+        os.unlink(tmp)
+        raise
+
+
+class AssetPipeline:
+    """Fingerprinted, precompressed copies of the static files"""
+
+    def __init__(self):
+        self.static_folder = None
+        self.output_dir = None
+        self.skip = set()
+        self.manifest = {}
+        self._served = set()
+
+    def init_app(self, app):
+        self.static_folder = app.static_folder
+        output = app.config.get('ASSETS_OUTPUT_DIR', 'dist')
+        self.output_dir = os.path.join(self.static_folder, output)
+        # Build output and user uploads are not site assets
+        self.skip = {output, os.path.relpath(app.config.get('UPLOAD_FOLDER', 'static/uploads'), 'static')}
+        if app.config.get('ASSETS_AUTO_BUILD', False):
+            try:
+                self.build()
+            except OSError:
+                app.logger.exception('asset build failed, serving unhashed static files')
+                self.load()
+        else:
+            self.load()
+        app.jinja_env.globals['asset_url'] = self.url
+        app.add_url_rule('/assets/<path:filename>', 'assets', self.serve)
+
+    def sources(self):
+        """Relative paths (with '/') of the files to fingerprint"""
+        for root, dirs, files in os.walk(self.static_folder):
+            rel_root = os.path.relpath(root, self.static_folder)
+            if rel_root == '.':
+                dirs[:] = [d for d in dirs if d not in self.skip]
+            dirs.sort()
+            for name in sorted(files):
+                if not name.startswith('.'):
+                    yield os.path.normpath(os.path.join(rel_root, name)).replace(os.sep, '/')
+
+    def build(self):
+        """Write hashed and precompressed copies plus the manifest; returns the manifest"""
+        previous = self._read_manifest()
+        manifest = {}
+        for source in self.sources():
+            with open(os.path.join(self.static_folder, source), 'rb') as f:
+                data = f.read()
+            stem, ext = os.path.splitext(source)
+            hashed = f'{stem}.{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}{ext}'
+            target = os.path.join(self.output_dir, hashed)
+            outputs = {target: lambda: data}
+            if ext in COMPRESSIBLE and len(data) >= MIN_COMPRESS_BYTES:
+                outputs[target + '.gz'] = lambda: gzip.compress(data, compresslevel=9, mtime=0)
+                if brotli is not None:
+                    outputs[target + '.br'] = lambda: brotli.compress(data, quality=11)
+            # Same name means same content, so existing outputs are kept
+            for path, render in outputs.items():
+                if not os.path.exists(path):
+                    _write(path, render())
+            manifest[source] = hashed
+        _write(os.path.join(self.output_dir, MANIFEST), json.dumps(manifest, indent=2, sort_keys=True).encode())
+        self._use(manifest)
+        self.prune(set(manifest.values()) | set(previous.values()))
+        return manifest
+
+    def prune(self, keep):
+        """Delete outputs (and their compressed copies) not named in ``keep``; returns the count"""
+        keep = {os.path.normpath(name) for name in keep} | {MANIFEST}
+        suffixes = tuple(suffix for _, suffix in ENCODINGS)
+        removed = 0
+        for root, dirs, files in os.walk(self.output_dir, topdown=False):
+            for name in files:
+                path = os.path.join(root, name)
+                rel = os.path.relpath(path, self.output_dir)
+                if name.endswith(suffixes):
+                    rel = os.path.splitext(rel)[0]
+                if rel not in keep and not name.startswith('.tmp-'):
+                    os.unlink(path)
+                    removed += 1
+            if root != self.output_dir and not os.listdir(root):
+                os.rmdir(root)
+        return removed
+
+    def _read_manifest(self):
+        try:
+            with open(os.path.join(self.output_dir, MANIFEST)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def load(self):
+        self._use(self._read_manifest())
+
+    def _use(self, manifest):
+        self.manifest = manifest
+        self._served = set(manifest.values())
+
+    def url(self, filename):
+        """URL of the hashed copy of a static file, or its plain static URL"""
+        hashed = self.manifest.get(filename)
+        if hashed is None:
+            return url_for('static', filename=filename)
+        return url_for('assets', filename=hashed)
+
+    def serve(self, filename):
+        if filename not in self._served:
+            abort(404)
+        path = os.path.join(self.output_dir, filename)
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        encoding = None
+        for name, suffix in ENCODINGS:
+            if request.accept_encodings[name] and os.path.exists(path + suffix):
+                encoding, path = name, path + suffix
+                break
+        response = send_file(path, mimetype=mimetype, max_age=MAX_AGE, conditional=True)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+
+# Global asset pipeline instance
+asset_pipeline = AssetPipeline()
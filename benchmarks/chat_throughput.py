@@ -0,0 +1,79 @@
+"""
+Benchmark send_message throughput: synchronous commit vs write-behind
+
+Drives the Socket.IO send_message handler in-process against a file-backed
+SQLite database (so every synchronous commit pays a real fsync) and reports
+messages per second in both modes.
+
+Usage: python benchmarks/chat_throughput.py [--messages 5000]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix='lifelink-bench-'), 'chat.sqlite3')
+os.environ['FLASK_ENV'] = 'testing'
+os.environ['TEST_DATABASE_URL'] = 'sqlite:///' + DB_PATH
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, socketio
+from models import db, ChatMessage, Donor, Patient
+from chat_writer import chat_writer
+
+
+def send_messages(client, count):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(count):
+            client.emit('send_message', {
+                'sender_id': 1, 'sender_type': 'donor',
+                'receiver_id': 1, 'receiver_type': 'patient',
+                'message': f'message {i}', 'room': '1-donor-1-patient'
+            })
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--messages', type=int, default=5000)
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+        db.session.add(Donor(name='Bench Donor', email='donor@example.com', phone='1', age=30,
+                             password='!', blood_type='O+'))
+        db.session.add(Patient(name='Bench Patient', email='patient@example.com', phone='1', age=30,
+                               password='!', blood_type='O+', address='Lahore'))
+        db.session.commit()
+
+    client = socketio.test_client(app)
+    client.emit('join_room', {'room': '1-donor-1-patient'})
+
+    app.config['CHAT_WRITE_BEHIND'] = False
+    sync_elapsed = send_messages(client, args.messages)
+
+    app.config['CHAT_WRITE_BEHIND'] = True
+    behind_elapsed = send_messages(client, args.messages)
+    start = time.perf_counter()
+    chat_writer.shutdown()
+    drain_elapsed = time.perf_counter() - start
+
+    with app.app_context():
+        stored = db.session.query(ChatMessage).count()
+    client.disconnect()
+
+    print(f'Database: {DB_PATH}')
+    print(f'{"mode":<16}{"messages":>10}{"seconds":>10}{"msg/s":>12}')
+    print(f'{"synchronous":<16}{args.messages:>10}{sync_elapsed:>10.2f}{args.messages / sync_elapsed:>12.0f}')
+    print(f'{"write-behind":<16}{args.messages:>10}{behind_elapsed:>10.2f}{args.messages / behind_elapsed:>12.0f}')
+    print(f'Write-behind drain after last emit: {drain_elapsed * 1000:.1f} ms')
+    print(f'Rows stored: {stored} of {2 * args.messages} (failed batches: {chat_writer.failed})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark DatabaseManager: connect-per-call vs pooled connections
+
+Runs a mixed workload (lookups by email, notification reads, notification
+inserts) from several threads against a file-backed SQLite database. The
+baseline replicates the previous behaviour: a fresh ``sqlite3.connect`` in
+default rollback-journal mode for every call. The pooled run uses the
+current ``DatabaseManager`` (bounded connection pool, WAL, tuned PRAGMAs).
+
+Usage: python benchmarks/database_pool.py [--threads 8] [--ops 2000]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+
+
+class ConnectPerCallManager(DatabaseManager):
+    """The old access pattern: open, use and close a connection per call"""
+
+    def get_connection(self):
+        if not self._initialized:
+            self.init_database()
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def get_user_by_email(self, email):
+        conn = self.get_connection()
+        try:
+            user = conn.execute('SELECT * FROM users WHERE email = ?', (email,)).fetchone()
+            return dict(user) if user else None
+        finally:
+            conn.close()
+
+    def get_notifications_by_user(self, user_id, limit=50):
+        conn = self.get_connection()
+        try:
+            rows = conn.execute('''
+                SELECT * FROM notifications WHERE user_id = ?
+                ORDER BY created_at DESC LIMIT ?
+            ''', (user_id, limit))
+            return [dict(row) for row in rows]
+        finally:
+            conn.close()
+
+    def insert_notification(self, notification_data):
+        conn = self.get_connection()
+        try:
+            cursor = conn.execute('''
+                INSERT INTO notifications (user_id, title, message, notification_type)
+                VALUES (?, ?, ?, ?)
+            ''', (notification_data['user_id'], notification_data['title'],
+                  notification_data['message'], notification_data['notification_type']))
+            conn.commit()
+            return cursor.lastrowid
+        finally:
+            conn.close()
+
+
+def seed(manager, users):
+    with manager.transaction() as conn:
+        conn.executemany('''
+            INSERT INTO users (name, email, phone, user_type, blood_type, city)
+            VALUES (?, ?, ?, 'donor', 'O+', 'Lahore')
+        ''', [(f'User {i}', f'user{i}@example.com', '0300') for i in range(users)])
+
+
+def worker(manager, ops, users, seed_value):
+    rng = random.Random(seed_value)
+    for _ in range(ops):
+        user_id = rng.randint(1, users)
+        roll = rng.random()
+        if roll < 0.45:
+            manager.get_user_by_email(f'user{user_id - 1}@example.com')
+        elif roll < 0.9:
+            manager.get_notifications_by_user(user_id, limit=20)
+        else:
+            manager.insert_notification({'user_id': user_id, 'title': 'Bench', 'message': 'Bench',
+                                         'notification_type': 'system'})
+
+
+def run(manager_class, threads, ops, users):
+    path = os.path.join(tempfile.mkdtemp(prefix='lifelink-bench-'), 'pool.sqlite3')
+    seeder = DatabaseManager(path)
+    seed(seeder, users)
+    seeder.close()
+    if manager_class is ConnectPerCallManager:
+        # Put the file back into the default rollback journal the old code used
+        conn = sqlite3.connect(path)
+        conn.execute('PRAGMA journal_mode = DELETE')
+        conn.close()
+
+    manager = manager_class(path)
+    manager._initialized = True
+    workers = [threading.Thread(target=worker, args=(manager, ops, users, i)) for i in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    manager.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--ops', type=int, default=2000, help='operations per thread')
+    parser.add_argument('--users', type=int, default=5000)
+    args = parser.parse_args()
+
+    total = args.threads * args.ops
+    print(f'{args.threads} threads x {args.ops} ops (45% email lookup, 45% notification read, 10% insert)')
+    print(f'{"mode":<18}{"seconds":>10}{"ops/s":>12}')
+    for label, manager_class in (('connect-per-call', ConnectPerCallManager), ('pooled', DatabaseManager)):
+        elapsed = run(manager_class, args.threads, args.ops, args.users)
+        print(f'{label:<18}{elapsed:>10.2f}{total / elapsed:>12.0f}')
+
+
+if __name__ == '__main__':
+    main()
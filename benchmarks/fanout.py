@@ -0,0 +1,109 @@
+"""
+Benchmark emergency notification fan-out to a large donor pool
+
+Loads N compatible, available donors in one city (default 100k), connects
+a number of Socket.IO test clients as online donors, then creates a
+Critical request through the real /emergency/create route and measures:
+
+- request latency (the route returns before fan-out starts), and
+- end-to-end latency until every notification is written and pushed.
+
+Usage: python benchmarks/fanout.py [--donors 100000] [--online 200] [--no-fts]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+WORK_DIR = tempfile.mkdtemp(prefix='lifelink-bench-')
+os.environ['FLASK_ENV'] = 'testing'
+os.environ['TEST_DATABASE_URL'] = 'sqlite:///' + os.path.join(WORK_DIR, 'fanout.sqlite3')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, socketio
+from models import db, Donor
+from database import DatabaseManager
+from donor_search import create_fts_index, reset_fts_state
+from fanout import notification_fanout, user_room
+from ingest import bulk_insert
+
+BLOOD_TYPES = ['O-', 'O+', 'B-', 'B+']  # all can give to B+
+
+
+def load_donors(count, fts):
+    with app.app_context():
+        db.create_all()
+        if fts:
+            with db.engine.begin() as conn:
+                create_fts_index(conn)
+            reset_fts_state()
+        for start in range(0, count, 10000):
+            bulk_insert(Donor, [{
+                'name': f'Donor {i}', 'email': f'donor{i}@example.com', 'phone': '0300',
+                'age': 20 + i % 40, 'blood_type': BLOOD_TYPES[i % 4],
+                'address': f'{i} Mall Road, Lahore'
+            } for i in range(start, min(start + 10000, count))], start=start + 1)
+        # A few donors elsewhere, so the city filter has something to reject
+        bulk_insert(Donor, [{
+            'name': f'Far Donor {i}', 'email': f'far{i}@example.com', 'phone': '0300',
+            'age': 30, 'blood_type': 'O-', 'address': 'Karachi'
+        } for i in range(1000)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--donors', type=int, default=100000)
+    parser.add_argument('--online', type=int, default=200, help='connected donor clients')
+    parser.add_argument('--no-fts', action='store_true', help='match the city with ILIKE instead of FTS')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    load_donors(args.donors, fts=not args.no_fts)
+    print(f'Loaded {args.donors} donors in {time.perf_counter() - start:.1f}s ({WORK_DIR})')
+
+    notification_fanout.manager = DatabaseManager(os.path.join(WORK_DIR, 'notifications.sqlite3'))
+    clients = []
+    for donor_id in range(1, args.online + 1):
+        # Personal rooms only admit their owner, so connect as that donor
+        web = app.test_client()
+        with web.session_transaction() as sess:
+            sess['user_id'] = donor_id
+            sess['user_type'] = 'donor'
+        client = socketio.test_client(app, flask_test_client=web)
+        client.emit('join_room', {'room': user_room('donor', donor_id)})
+        clients.append(client)
+
+    web = app.test_client()
+    with web.session_transaction() as sess:
+        sess['user_id'] = 1
+        sess['user_type'] = 'patient'
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        web.post('/emergency/create', data={
+            'patient_name': 'Bench Patient', 'blood_type': 'B+', 'units_needed': '3',
+            'urgency': 'Critical', 'hospital': 'Mayo Hospital', 'contact': '0300', 'city': 'Lahore'
+        })
+    request_ms = (time.perf_counter() - start) * 1000
+    notification_fanout.join()
+    total_ms = (time.perf_counter() - start) * 1000
+
+    received = sum(
+        1 for client in clients for packet in client.get_received() if packet['name'] == 'notification'
+    )
+    stats = notification_fanout.stats()
+    with notification_fanout.manager.connection() as conn:
+        stored = conn.execute('SELECT COUNT(*) FROM notifications').fetchone()[0]
+    print(f'Request latency (route returns):   {request_ms:10.1f} ms')
+    print(f'End-to-end fan-out latency:        {total_ms:10.1f} ms')
+    print(f'Worker latency (queue to done):    {stats["last_latency_ms"]:10.1f} ms')
+    print(f'Notifications written:             {stored:10d}')
+    print(f'Pushed to online clients:          {received:10d} of {args.online}')
+
+
+if __name__ == '__main__':
+    main()
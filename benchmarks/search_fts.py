@@ -0,0 +1,100 @@
+"""
+Benchmark donor search: FTS5 prefix queries vs the ILIKE fallback
+
+Loads N synthetic donors into an in-memory SQLite database and times
+/api/search/donors for a set of typed prefixes with the donor_fts index
+enabled and disabled.
+
+Usage: python benchmarks/search_fts.py [--donors 100000] [--repeat 20]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import statistics
+import sys
+import time
+
+os.environ['FLASK_ENV'] = 'testing'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app
+from models import db, Donor
+from donor_search import create_fts_index, reset_fts_state
+
+FIRST_NAMES = ['Ahmed', 'Ali', 'Fatima', 'Ayesha', 'Omar', 'Hassan', 'Zainab', 'Bilal',
+               'Sara', 'Usman', 'Hina', 'Imran', 'Maryam', 'Kamran', 'Nadia', 'Tariq']
+LAST_NAMES = ['Khan', 'Ahmed', 'Hussain', 'Malik', 'Sheikh', 'Qureshi', 'Butt', 'Raza',
+              'Chaudhry', 'Siddiqui', 'Iqbal', 'Javed', 'Aslam', 'Farooq']
+CITIES = ['Karachi', 'Lahore', 'Islamabad', 'Faisalabad', 'Rawalpindi', 'Multan', 'Peshawar', 'Quetta']
+# Rare names and towns make up ~0.1% of rows, like a real typed-in search
+RARE_NAMES = ['Zubair Lodhi', 'Shahzeb Marwat']
+RARE_CITIES = ['Gilgit', 'Chitral']
+QUERIES = [
+    {'q': 'a'}, {'q': 'ah'}, {'q': 'fati'}, {'q': 'omar kh'},
+    {'city': 'lah'}, {'city': 'islamabad'}, {'q': 'sara', 'city': 'kar'},
+    {'q': 'zub'}, {'q': 'shahzeb marw'}, {'city': 'gilg'}, {'q': 'ali', 'city': 'chitral'},
+]
+
+
+def load_donors(count, seed=42):
+    rng = random.Random(seed)
+    rare = rng.random
+    rows = [{
+        'name': rng.choice(RARE_NAMES) if rare() < 0.001 else f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+        'email': f'donor{i}@example.com',
+        'phone': '03001234567',
+        'age': rng.randint(18, 65),
+        'password': '!',
+        'blood_type': rng.choice(['O+', 'A+', 'B+', 'AB+', 'O-', 'A-', 'B-', 'AB-']),
+        'address': f'House {rng.randint(1, 999)}, Street {rng.randint(1, 99)}, '
+                   f'{rng.choice(RARE_CITIES) if rare() < 0.001 else rng.choice(CITIES)}',
+        'is_available': rng.random() < 0.7,
+    } for i in range(count)]
+    db.session.execute(Donor.__table__.insert(), rows)
+    db.session.commit()
+
+
+def time_queries(client, repeat):
+    timings = {}
+    for params in QUERIES:
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                response = client.get('/api/search/donors', query_string=params)
+            samples.append((time.perf_counter() - start) * 1000)
+            assert response.status_code == 200
+        timings[str(params)] = statistics.median(samples)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--donors', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+        print(f'Loading {args.donors} donors...')
+        load_donors(args.donors)
+        create_fts_index(db.session.connection())
+        db.session.commit()
+        reset_fts_state()
+
+        client = app.test_client()
+        app.config['DONOR_SEARCH_FTS'] = False
+        ilike = time_queries(client, args.repeat)
+        app.config['DONOR_SEARCH_FTS'] = True
+        fts = time_queries(client, args.repeat)
+
+    print(f"\n{'query':<40}{'ilike ms':>12}{'fts5 ms':>12}{'speedup':>10}")
+    for key in ilike:
+        print(f'{key:<40}{ilike[key]:>12.2f}{fts[key]:>12.2f}{ilike[key] / fts[key]:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
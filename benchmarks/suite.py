@@ -0,0 +1,373 @@
+"""
+Benchmark suite for the hot HTTP and Socket.IO paths
+
+Generates a seeded dataset (see synthetic.py) in a file-backed SQLite
+database, then drives each scenario in-process through the Flask test
+client or the Flask-SocketIO test client and reports p50/p95/p99 latency,
+throughput, SQL statements per request and peak Python allocations as JSON:
+
+    python benchmarks/suite.py run --donors 100000 -o before.json
+    python benchmarks/suite.py run --donors 100000 -o after.json
+    python benchmarks/suite.py compare before.json after.json
+
+``compare`` prints the change per metric and exits with status 1 when a
+scenario got slower (or issues more SQL, or uses more memory) by more than
+``--threshold``.
+
+Memory is measured per scenario in a separate, untimed pass with
+tracemalloc (which would otherwise slow the timed requests down): the peak
+is reset before the pass and reported above the allocations live when it
+started. The process peak RSS covers the data generation and every
+scenario run so far, so it is reported once, in ``meta``.
+
+Usage: python benchmarks/suite.py {run,compare} --help
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD = 'bench-password'
+SCENARIOS = ('search_donors', 'chat_history', 'emergency_list', 'donors_page', 'login', 'send_message')
+# Metric: (label, True if bigger is better)
+METRICS = {
+    'p50_ms': ('p50 ms', False),
+    'p95_ms': ('p95 ms', False),
+    'p99_ms': ('p99 ms', False),
+    'throughput_rps': ('req/s', True),
+    'queries_per_request': ('SQL/req', False),
+    'peak_alloc_mb': ('alloc MB', False),
+}
+LATENCY_METRICS = ('p50_ms', 'p95_ms', 'p99_ms')
+
+SEARCHES = [
+    {}, {'blood_type': 'O+'}, {'q': 'ali'}, {'q': 'fatima kh'}, {'city': 'lahore'},
+    {'q': 'sara', 'city': 'kar'}, {'compatible_with': 'A+'}, {'availability': 'eligible', 'blood_type': 'B+'},
+]
+EMERGENCY_FILTERS = [
+    {}, {'sort': 'newest'}, {'blood_type': 'O+'}, {'city': 'Lahore'}, {'urgency': 'Critical'},
+    {'compatible_with': 'O-'}, {'blood_type': 'AB-', 'city': 'Karachi'},
+]
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KiB on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of a sorted list"""
+    index = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(samples, queries, errors, elapsed, peak_alloc):
+    ordered = sorted(samples)
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'p50_ms': round(percentile(ordered, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(ordered, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 0.99) * 1000, 3),
+        'mean_ms': round(sum(ordered) / len(ordered) * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+        'throughput_rps': round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        'queries_per_request': round(queries / len(samples), 2),
+        'peak_alloc_mb': round(peak_alloc / (1024 * 1024), 2),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Bench:
+    """One benchmark run: the app, its dataset and the scenario drivers"""
+
+    def __init__(self, args):
+        self.args = args
+        self.queries = 0
+
+        from app import app, socketio
+        from models import db
+        from sqlalchemy import event
+        self.app, self.socketio, self.db = app, socketio, db
+        # Per-request debug logging would flood the report and skew timings
+        app.logger.setLevel(logging.INFO)
+        # No app context stays pushed, so every request gets a fresh session
+        with app.app_context():
+            event.listen(db.engine, 'before_cursor_execute', self._count_query)
+
+    def _count_query(self, *args):
+        self.queries += 1
+
+    def prepare(self):
+        with self.app.app_context():
+            return self._prepare()
+
+    def _prepare(self):
+        """Create the schema and generate the dataset unless the database already has one"""
+        from config import Config
+        from models import Donor, Patient, ChatMessage
+        from synthetic import generate
+        from accounts import hash_password
+
+        # Log in against production-strength hashes, not the fast testing ones
+        self.app.config['PASSWORD_HASH_METHOD'] = Config.PASSWORD_HASH_METHOD
+        self.db.create_all()
+        dataset = {'generated': False, 'seconds': 0.0}
+        if not self.db.session.query(Donor.id).first():
+            args = self.args
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate(args.donors, args.patients, args.emergencies, args.messages, args.feedback,
+                         seed=args.seed, chunk_size=10000, password=hash_password(PASSWORD))
+            dataset = {'generated': True, 'seconds': round(time.perf_counter() - start, 1)}
+
+        session = self.db.session
+        dataset.update({
+            'donors': session.query(Donor).count(),
+            'patients': session.query(Patient).count(),
+            'messages': session.query(ChatMessage).count(),
+        })
+        sample = self.args.requests
+        self.emails = [email for email, in session.query(Donor.email).order_by(Donor.id).limit(sample)]
+        self.conversations = [
+            (row.sender_id, row.sender_type, row.receiver_id, row.receiver_type)
+            for row in session.query(ChatMessage).order_by(ChatMessage.id.desc()).limit(sample)
+        ]
+        self.donor_ids = [id for id, in session.query(Donor.id).order_by(Donor.id).limit(sample)]
+        self.patient_ids = [id for id, in session.query(Patient.id).order_by(Patient.id).limit(sample)]
+        if not (self.emails and self.conversations and self.patient_ids):
+            raise SystemExit('the dataset needs donors, patients and chat messages')
+        return dataset
+
+    # Scenario drivers: each returns a callable performing one request and
+    # returning True on success
+
+    def search_donors(self):
+        client = self.app.test_client()
+        return lambda i: client.get('/api/search/donors', query_string=SEARCHES[i % len(SEARCHES)]).status_code == 200
+
+    def chat_history(self):
+        client = self.app.test_client()
+
+        def request(i):
+            user1, type1, user2, type2 = self.conversations[i % len(self.conversations)]
+            return client.get('/chat/history', query_string={
+                'user1': user1, 'type1': type1, 'user2': user2, 'type2': type2
+            }).status_code == 200
+        return request
+
+    def emergency_list(self):
+        # Donors see every request, most urgent first
+        client = self.app.test_client()
+        self.login(client, self.emails[0])
+        return lambda i: client.get('/emergency/', query_string=EMERGENCY_FILTERS[i % len(EMERGENCY_FILTERS)]).status_code == 200
+
+    def donors_page(self):
+        client = self.app.test_client()
+        return lambda i: client.get('/donors').status_code == 200
+
+    def login(self, client, email):
+        response = client.post('/login', data={'email': email, 'password': PASSWORD})
+        return response.status_code == 302 and '/dashboard/' in response.headers.get('Location', '')
+
+    def login_scenario(self):
+        client = self.app.test_client()
+        return lambda i: self.login(client, self.emails[i % len(self.emails)])
+
+    def send_message(self):
+        client = self.socketio.test_client(self.app)
+        rooms = []
+        for donor_id, patient_id in zip(self.donor_ids, self.patient_ids):
+            room = f'{donor_id}-donor-{patient_id}-patient'
+            client.emit('join_room', {'room': room})
+            rooms.append((donor_id, patient_id, room))
+
+        def request(i):
+            donor_id, patient_id, room = rooms[i % len(rooms)]
+            client.emit('send_message', {
+                'sender_id': donor_id, 'sender_type': 'donor',
+                'receiver_id': patient_id, 'receiver_type': 'patient',
+                'message': f'benchmark message {i}', 'room': room
+            })
+            return any(packet['name'] == 'receive_message' for packet in client.get_received())
+        return request
+
+    def run_scenario(self, name):
+        driver = self.login_scenario if name == 'login' else getattr(self, name)
+        with contextlib.redirect_stdout(io.StringIO()):
+            request = driver()
+            for i in range(self.args.warmup):
+                request(i)
+            samples, errors = [], 0
+            self.queries = 0
+            started = time.perf_counter()
+            for i in range(self.args.requests):
+                start = time.perf_counter()
+                ok = request(i)
+                samples.append(time.perf_counter() - start)
+                errors += not ok
+            elapsed = time.perf_counter() - started
+            peak_alloc = self.measure_memory(request)
+        return summarize(samples, self.queries, errors, elapsed, peak_alloc)
+
+    def measure_memory(self, request):
+        """Peak bytes allocated above the starting level over an untimed pass"""
+        tracemalloc.start()
+        try:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            for i in range(self.args.memory_requests):
+                request(i)
+            return tracemalloc.get_traced_memory()[1] - baseline
+        finally:
+            tracemalloc.stop()
+
+
+def run(args):
+    db_path = args.database or os.path.join(tempfile.mkdtemp(prefix='lifelink-bench-'), 'bench.sqlite3')
+    os.environ['FLASK_ENV'] = 'testing'
+    os.environ['TEST_DATABASE_URL'] = 'sqlite:///' + os.path.abspath(db_path)
+    sys.path.insert(0, ROOT)
+
+    bench = Bench(args)
+    dataset = bench.prepare()
+    print(f'Database: {db_path} ({dataset["donors"]} donors, {dataset["messages"]} messages)', file=sys.stderr)
+    results = {
+        'meta': {
+            'revision': git_revision(),
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'requests': args.requests,
+            'warmup': args.warmup,
+            'memory_requests': args.memory_requests,
+        },
+        'dataset': dataset,
+        'scenarios': {},
+    }
+    for name in args.only or SCENARIOS:
+        results['scenarios'][name] = stats = bench.run_scenario(name)
+        errors = f'  {stats["errors"]} errors' if stats['errors'] else ''
+        print(f'{name:<16}{stats["p50_ms"]:>10.2f}{stats["p95_ms"]:>10.2f}{stats["p99_ms"]:>10.2f} ms'
+              f'{stats["throughput_rps"]:>10.0f} req/s{stats["queries_per_request"]:>8.1f} SQL/req{errors}',
+              file=sys.stderr)
+
+    results['meta']['peak_rss_mb'] = peak_rss_mb()
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+def regressions(baseline, current, threshold, min_ms):
+    """``[(scenario, metric, before, after, change)]`` for every metric that got worse"""
+    found = []
+    for name, after in current['scenarios'].items():
+        before = baseline['scenarios'].get(name)
+        if before is None:
+            continue
+        for metric, (_, higher_is_better) in METRICS.items():
+            old, new = before.get(metric), after.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            if metric in LATENCY_METRICS and abs(new - old) < min_ms:
+                continue
+            # Query counts are exact, so any increase is a regression
+            limit = 0 if metric == 'queries_per_request' else threshold
+            if worse > limit:
+                found.append((name, metric, old, new, change))
+    return found
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    print(f'{"scenario":<16}' + ''.join(f'{label:>22}' for label, _ in METRICS.values()))
+    for name, after in current['scenarios'].items():
+        before = baseline['scenarios'].get(name, {})
+        cells = []
+        for metric in METRICS:
+            old, new = before.get(metric), after.get(metric)
+            if old and new is not None:
+                cells.append(f'{old:>8g} -> {new:<8g}{(new - old) / old:+4.0%}')
+            else:
+                cells.append(f'{new if new is not None else "-":>22}')
+        print(f'{name:<16}' + ''.join(f'{cell:>22}' for cell in cells))
+
+    found = regressions(baseline, current, args.threshold, args.min_ms)
+    for name, metric, old, new, change in found:
+        print(f'REGRESSION {name} {METRICS[metric][0]}: {old:g} -> {new:g} ({change:+.1%})')
+    if not found:
+        print('No regressions.')
+    return 1 if found else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='Run the scenarios and write JSON results.')
+    run_parser.add_argument('--donors', type=int, default=20000)
+    run_parser.add_argument('--patients', type=int, default=2000)
+    run_parser.add_argument('--emergencies', type=int, default=5000)
+    run_parser.add_argument('--messages', type=int, default=50000)
+    run_parser.add_argument('--feedback', type=int, default=500)
+    run_parser.add_argument('--seed', type=int, default=42)
+    run_parser.add_argument('--requests', type=int, default=200, help='Timed requests per scenario.')
+    run_parser.add_argument('--warmup', type=int, default=20, help='Untimed requests per scenario.')
+    run_parser.add_argument('--memory-requests', type=int, default=50,
+                            help='Requests per scenario in the tracemalloc pass.')
+    run_parser.add_argument('--database', help='SQLite file to use; reused as-is if it already has donors.')
+    run_parser.add_argument('--only', nargs='+', choices=SCENARIOS, help='Run only these scenarios.')
+    run_parser.add_argument('-o', '--output', help='Write the JSON results here instead of stdout.')
+
+    compare_parser = commands.add_parser('compare', help='Compare two result files and flag regressions.')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.10,
+                                help='Relative change counted as a regression (default: 0.10).')
+    compare_parser.add_argument('--min-ms', type=float, default=0.2,
+                                help='Ignore latency changes smaller than this many milliseconds.')
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        run(args)
+    else:
+        sys.exit(compare(args))
+
+
+if __name__ == '__main__':
+    main()
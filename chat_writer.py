@@ -0,0 +1,163 @@
+"""
+Write-behind chat persistence for LifeLink Blood Bank Management System
+
+With ``CHAT_WRITE_BEHIND`` enabled, ``send_message`` emits to the room
+immediately and hands the row to a bounded queue. A background thread
+inserts queued messages in batches, one transaction per batch.
+
+Crash safety: the queue is flushed on interpreter exit and on
+``shutdown()``. A hard crash loses every message still queued, which is up
+to ``CHAT_WRITE_QUEUE_SIZE`` messages if the writer has fallen behind (at
+least one ``CHAT_WRITE_FLUSH_INTERVAL`` of traffic otherwise). When the
+queue is full, callers fall back to a synchronous write, so back-pressure
+never drops a message.
+
+A batch that fails to insert is retried ``CHAT_WRITE_RETRIES`` times with
+exponential backoff, then written row by row, so one bad row cannot take
+its whole batch down. Only rows that still fail are lost; they are logged
+with their conversation key and counted in ``failed``.
+"""
+
+import atexit
+import queue
+import threading
+import time
+from models import db, ChatMessage
+from user_cache import user_cache
+from versions import versions, chat_resource
+
+_STOP = object()
+
+
+class ChatWriter:
+    """Bounded queue plus a background thread that batch-inserts chat messages"""
+
+    def __init__(self):
+        self.app = None
+        self._queue = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self.written = 0
+        self.failed = 0
+
+    def init_app(self, app):
+        self.app = app
+        self._queue = queue.Queue(maxsize=app.config.get('CHAT_WRITE_QUEUE_SIZE', 10000))
+        atexit.register(self.shutdown)
+
+    @property
+    def enabled(self):
+        return self.app is not None and self.app.config.get('CHAT_WRITE_BEHIND', False)
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name='chat-writer', daemon=True)
+                    self._thread.start()
+
+    def submit(self, row):
+        """Queue a message row for writing; returns False if the queue is full"""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            return False
+        return True
+
+    def _next_batch(self, first):
+        """Collect up to CHAT_WRITE_BATCH_SIZE rows, waiting at most one flush interval"""
+        batch_size = self.app.config.get('CHAT_WRITE_BATCH_SIZE', 500)
+        deadline = time.monotonic() + self.app.config.get('CHAT_WRITE_FLUSH_INTERVAL', 0.5)
+        batch, stop = [first], False
+        while len(batch) < batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                row = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if row is _STOP:
+                stop = True
+                break
+            batch.append(row)
+        return batch, stop
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch, stop = self._next_batch(first)
+            self._write(batch)
+            if stop:
+                return
+
+    def _insert(self, rows):
+        try:
+            db.session.execute(ChatMessage.__table__.insert(), rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        self.written += len(rows)
+        versions.bump(*{chat_resource(row['conversation_key']) for row in rows})
+
+    def _write(self, rows):
+        config = self.app.config
+        retries = config.get('CHAT_WRITE_RETRIES', 3)
+        delay = config.get('CHAT_WRITE_RETRY_DELAY', 0.1)
+        with self.app.app_context():
+            logger = self.app.logger
+            for attempt in range(retries + 1):
+                try:
+                    self._insert(rows)
+                    return
+                except Exception as e:
+                    logger.warning('chat writer: batch of %d messages failed (attempt %d): %s',
+                                   len(rows), attempt + 1, e)
+                if attempt < retries:
+                    time.sleep(delay * 2 ** attempt)
+
+            # Keep every row that can be written
+            for row in rows:
+                try:
+                    self._insert([row])
+                except Exception as e:
+                    self.failed += 1
+                    logger.error('chat writer: lost message %s -> %s in %s: %s',
+                                 row['sender_id'], row['receiver_id'], row['conversation_key'], e)
+
+    def flush(self):
+        """Synchronously write everything currently queued"""
+        if self._queue is None:
+            return
+        rows = []
+        while True:
+            try:
+                row = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if row is not _STOP:
+                rows.append(row)
+        if rows:
+            self._write(rows)
+
+    def shutdown(self, timeout=5):
+        """Stop the background thread and persist anything still queued"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+        self._thread = None
+        self.flush()
+
+
+# Global chat writer instance
+chat_writer = ChatWriter()
+
+
+def user_name(user_type, user_id):
+    """Display name for a chat participant, served from the user cache"""
+    if user_type not in ('donor', 'patient'):
+        return None
+    user = user_cache.get(user_type, user_id)
+    return user.name if user else user_type.capitalize()
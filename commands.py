@@ -0,0 +1,240 @@
+"""
+Command line tools for LifeLink Blood Bank Management System
+
+    flask ingest donors roster.csv
+    flask ingest patients patients.ndjson --chunk-size 10000
+    flask ingest donations donations.csv --defer-indexes
+    flask export donors --format csv --gzip -o donors.csv.gz
+    flask rollups backfill
+    flask generate --donors 1000000 --patients 100000 --seed 7
+"""
+
+import csv
+import json
+import os
+import time
+from contextlib import nullcontext
+from datetime import datetime
+from itertools import islice
+import click
+from flask.cli import AppGroup, with_appcontext
+from models import db, Donor, Patient
+from database import db_manager
+from ingest import ingest, BulkResult, RowError
+from export import DATASETS, FORMATS, iter_export
+from rollups import backfill, BACKFILL_BATCH_SIZE
+from eligibility import record_donations
+from assets import asset_pipeline
+from synthetic import generate
+from accounts import hash_password
+from ingest import IMPORTED_PASSWORD
+
+ingest_cli = AppGroup('ingest', help='Bulk-load partner CSV or NDJSON files.')
+rollups_cli = AppGroup('rollups', help='Maintain the emergency demand rollups.')
+assets_cli = AppGroup('assets', help='Build fingerprinted, precompressed static assets.')
+
+
+def read_records(stream, fmt):
+    """Yield one dict per record from an open CSV or NDJSON file"""
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            raise click.ClickException(f'line {number}: invalid JSON ({e})')
+
+
+def chunked(records, size):
+    """Group an iterator into lists of at most ``size`` items"""
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _detect_format(path, fmt):
+    if fmt != 'auto':
+        return fmt
+    ext = os.path.splitext(path)[1].lower()
+    return 'ndjson' if ext in ('.ndjson', '.jsonl', '.json') else 'csv'
+
+
+def _ingest_options(fn):
+    fn = click.argument('path', type=click.Path(exists=True, dir_okay=False))(fn)
+    fn = click.option('--format', 'fmt', type=click.Choice(['auto', 'csv', 'ndjson']), default='auto',
+                      help='Input format (default: from the file extension).')(fn)
+    fn = click.option('--chunk-size', type=click.IntRange(1), default=5000, show_default=True,
+                      help='Rows written per transaction.')(fn)
+    fn = click.option('--defer-indexes', is_flag=True,
+                      help='Drop secondary indexes during the load and rebuild them once at the end.')(fn)
+    fn = click.option('--show-errors', type=click.IntRange(0), default=20, show_default=True,
+                      help='How many rejected rows to print.')(fn)
+    return fn
+
+
+def _report(label, result, elapsed, show_errors):
+    click.echo('', err=True)
+    for error in result.errors[:show_errors]:
+        click.echo(f'  row {error.row}: {error.message}', err=True)
+    if len(result.errors) > show_errors:
+        click.echo(f'  ... {len(result.errors) - show_errors} more rejected rows', err=True)
+    rate = result.inserted / elapsed if elapsed else 0
+    click.echo(f'{label}: {result.inserted} inserted, {len(result.errors)} rejected '
+               f'in {elapsed:.1f}s ({rate:,.0f} rows/s)')
+
+
+def _progress(result):
+    click.echo(f'\r  {result.inserted} inserted, {len(result.errors)} rejected', err=True, nl=False)
+
+
+def _load_model(model, label, path, fmt, chunk_size, defer_indexes, show_errors):
+    start = time.perf_counter()
+    with open(path, newline='', encoding='utf-8') as stream:
+        chunks = chunked(read_records(stream, _detect_format(path, fmt)), chunk_size)
+        result = ingest(model, chunks, defer=defer_indexes, on_chunk=_progress)
+    _report(label, result, time.perf_counter() - start, show_errors)
+
+
+@ingest_cli.command('donors')
+@_ingest_options
+def ingest_donors(path, fmt, chunk_size, defer_indexes, show_errors):
+    """Load donors from PATH"""
+    _load_model(Donor, 'donors', path, fmt, chunk_size, defer_indexes, show_errors)
+
+
+@ingest_cli.command('patients')
+@_ingest_options
+def ingest_patients(path, fmt, chunk_size, defer_indexes, show_errors):
+    """Load patients from PATH"""
+    _load_model(Patient, 'patients', path, fmt, chunk_size, defer_indexes, show_errors)
+
+
+def _donation_dates(chunk, errors):
+    """``(users.id, donated_at)`` pairs for the accepted rows of a donations chunk"""
+    rejected = {index for index, _ in errors}
+    pairs = []
+    for index, row in enumerate(chunk):
+        if index in rejected:
+            continue
+        try:
+            pairs.append((int(row['donor_id']), datetime.fromisoformat(str(row['donation_date']).strip())))
+        except (TypeError, ValueError):
+            continue
+    return pairs
+
+
+def _orm_donations(pairs):
+    """Map ``(users.id, donated_at)`` pairs to ORM ``Donor.id`` by email
+
+    The two stores number donors independently; the email is the shared
+    key. Donations of users without an ORM donor are dropped.
+    """
+    emails = db_manager.get_user_emails({user_id for user_id, _ in pairs})
+    donor_ids = dict(
+        db.session.query(Donor.email, Donor.id).filter(Donor.email.in_(set(emails.values())))
+    ) if emails else {}
+    return [
+        (donor_ids[emails[user_id]], donated_at)
+        for user_id, donated_at in pairs if emails.get(user_id) in donor_ids
+    ]
+
+
+@ingest_cli.command('donations')
+@_ingest_options
+def ingest_donations(path, fmt, chunk_size, defer_indexes, show_errors):
+    """Load donations from PATH into the donation log and update donor eligibility dates
+
+    ``donor_id`` is the legacy ``users.id`` of the donation log. Eligibility
+    dates are then applied to the ORM donor with the same email.
+    """
+    start = time.perf_counter()
+    result = BulkResult()
+    position = 1
+    manager = db_manager.deferred_indexes('blood_donations') if defer_indexes else nullcontext()
+    with open(path, newline='', encoding='utf-8') as stream, manager:
+        for chunk in chunked(read_records(stream, _detect_format(path, fmt)), chunk_size):
+            inserted, errors = db_manager.bulk_insert_donations(chunk)
+            # Keep the donors' eligibility dates in step with the donation log
+            record_donations(_orm_donations(_donation_dates(chunk, errors)))
+            result.add(inserted, [RowError(position + index, message) for index, message in errors])
+            position += len(chunk)
+            _progress(result)
+    _report('donations', result, time.perf_counter() - start, show_errors)
+
+
+@click.command('export')
+@click.argument('dataset', type=click.Choice(list(DATASETS)))
+@click.option('--format', 'fmt', type=click.Choice(list(FORMATS)), default='ndjson', show_default=True)
+@click.option('--gzip', 'compress', is_flag=True, help='Compress the output with gzip.')
+@click.option('-o', '--output', type=click.File('wb'), default='-', help='Output file (default: stdout).')
+@with_appcontext
+def export_dataset(dataset, fmt, compress, output):
+    """Stream DATASET out as NDJSON or CSV"""
+    for chunk in iter_export(dataset, fmt, compress):
+        output.write(chunk)
+
+
+@rollups_cli.command('backfill')
+@click.option('--batch-size', type=click.IntRange(1), default=BACKFILL_BATCH_SIZE, show_default=True,
+              help='Rows read and written per batch.')
+def rollups_backfill(batch_size):
+    """Rebuild the demand rollups from every emergency request"""
+    start = time.perf_counter()
+    scanned, rows = backfill(batch_size)
+    click.echo(f'rollups: {scanned} requests folded into {rows} rollup rows '
+               f'in {time.perf_counter() - start:.1f}s')
+
+
+@assets_cli.command('build')
+def assets_build():
+    """Write hashed and precompressed copies of static/ and the manifest"""
+    manifest = asset_pipeline.build()
+    click.echo(f'assets: {len(manifest)} files in {asset_pipeline.output_dir}')
+
+
+@click.command('generate')
+@click.option('--donors', type=click.IntRange(0), default=10000, show_default=True)
+@click.option('--patients', type=click.IntRange(0), default=2000, show_default=True)
+@click.option('--emergencies', type=click.IntRange(0), default=5000, show_default=True)
+@click.option('--messages', type=click.IntRange(0), default=50000, show_default=True)
+@click.option('--feedback', type=click.IntRange(0), default=500, show_default=True)
+@click.option('--seed', type=int, default=42, show_default=True, help='Same seed and counts, same data.')
+@click.option('--days', type=click.IntRange(1), default=365, show_default=True,
+              help='Spread requests, donations and messages over this many days before --now.')
+@click.option('--now', type=click.DateTime(), default=None,
+              help='Anchor date for generated timestamps (default: 2025-01-01, for repeatable output).')
+@click.option('--password', default=None,
+              help='Password for every generated donor and patient (default: unusable).')
+@click.option('--chunk-size', type=click.IntRange(1), default=10000, show_default=True,
+              help='Rows written per transaction.')
+@click.option('--defer-indexes', is_flag=True,
+              help='Drop secondary indexes during each table load and rebuild them once at the end.')
+@with_appcontext
+def generate_dataset(donors, patients, emergencies, messages, feedback, seed, days, now, password, chunk_size,
+                     defer_indexes):
+    """Fill the database with seeded synthetic data for load testing"""
+    def table_done(label, inserted, rejected, elapsed):
+        rate = inserted / elapsed if elapsed else 0
+        click.echo('', err=True)
+        click.echo(f'{label}: {inserted} inserted, {rejected} rejected in {elapsed:.1f}s ({rate:,.0f} rows/s)')
+
+    start = time.perf_counter()
+    generate(donors, patients, emergencies, messages, feedback, seed=seed, days=days, now=now,
+             chunk_size=chunk_size, defer=defer_indexes, password=hash_password(password) if password else IMPORTED_PASSWORD,
+             on_table=table_done, on_chunk=lambda inserted: click.echo(f'\r  {inserted} inserted', err=True, nl=False))
+    click.echo(f'generated in {time.perf_counter() - start:.1f}s')
+
+
+def register_commands(app):
+    app.cli.add_command(ingest_cli)
+    app.cli.add_command(rollups_cli)
+    app.cli.add_command(assets_cli)
+    app.cli.add_command(export_dataset)
+    app.cli.add_command(generate_dataset)
@@ -0,0 +1,136 @@
+"""
+Blood compatibility index for LifeLink Blood Bank Management System
+
+Compiles ``Config.BLOOD_COMPATIBILITY`` into an 8-bit mask per blood type
+(one bit per type) and keeps per-blood-type sets of donor IDs, so questions
+like "who can give to AB-" or "which requests can this O+ donor serve" are
+answered with bit and set operations instead of list scans.
+
+The donor sets follow commits made in this process; they are reloaded
+from the database every ``DONOR_TYPE_INDEX_TTL`` seconds so writes made by
+other workers or CLI commands show up too.
+"""
+
+import threading
+import time
+from typing import Dict, List, Set
+from flask import current_app
+from config import Config
+from models import db, Donor
+from hooks import on_commit, on_bulk_change
+
+BLOOD_TYPES = list(Config.BLOOD_COMPATIBILITY)
+BLOOD_TYPE_BITS = {bt: 1 << i for i, bt in enumerate(BLOOD_TYPES)}
+
+# GIVES_TO[donor] has a bit set for every recipient type it can donate to,
+# RECEIVES_FROM[recipient] has a bit set for every donor type it accepts.
+GIVES_TO = {
+    donor: sum(BLOOD_TYPE_BITS[r] for r in recipients)
+    for donor, recipients in Config.BLOOD_COMPATIBILITY.items()
+}
+RECEIVES_FROM = {
+    recipient: sum(BLOOD_TYPE_BITS[d] for d, mask in GIVES_TO.items() if mask & bit)
+    for recipient, bit in BLOOD_TYPE_BITS.items()
+}
+
+# Row i is GIVES_TO[BLOOD_TYPES[i]]
+COMPATIBILITY_MATRIX = bytes(GIVES_TO[bt] for bt in BLOOD_TYPES)
+
+
+def types_in(mask: int) -> List[str]:
+    """Expand a blood type bitmask into the list of blood types"""
+    return [bt for bt in BLOOD_TYPES if mask & BLOOD_TYPE_BITS[bt]]
+
+
+def can_donate(donor_type: str, recipient_type: str) -> bool:
+    """Check whether blood of ``donor_type`` can be given to ``recipient_type``"""
+    return bool(GIVES_TO.get(donor_type, 0) & BLOOD_TYPE_BITS.get(recipient_type, 0))
+
+
+def donor_types_for(recipient_type: str) -> List[str]:
+    """Blood types that can donate to ``recipient_type``"""
+    return types_in(RECEIVES_FROM.get(recipient_type, 0))
+
+
+def recipient_types_for(donor_type: str) -> List[str]:
+    """Blood types that ``donor_type`` can donate to"""
+    return types_in(GIVES_TO.get(donor_type, 0))
+
+
+class DonorTypeIndex:
+    """Per-blood-type donor ID sets, kept current on Donor writes"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_type: Dict[str, Set[int]] = None
+        self._available: Set[int] = None
+        self._loaded_at = 0.0
+
+    def _load(self):
+        by_type = {bt: set() for bt in BLOOD_TYPES}
+        available = set()
+        rows = db.session.query(Donor.id, Donor.blood_type, Donor.is_available)
+        for donor_id, blood_type, is_available in rows:
+            if blood_type in by_type:
+                by_type[blood_type].add(donor_id)
+            if is_available:
+                available.add(donor_id)
+        self._by_type, self._available = by_type, available
+        self._loaded_at = time.monotonic()
+
+    def _expired(self):
+        ttl = current_app.config.get('DONOR_TYPE_INDEX_TTL', 300)
+        return self._by_type is None or time.monotonic() - self._loaded_at >= ttl
+
+    def _ensure_loaded(self):
+        if self._expired():
+            with self._lock:
+                if self._expired():
+                    self._load()
+
+    def reset(self):
+        """Drop the index; it is reloaded from the database on next use"""
+        with self._lock:
+            self._by_type = self._available = None
+
+    def apply(self, operation, row, previous):
+        """Apply one committed Donor write to the index"""
+        if self._by_type is None:
+            return
+        donor_id = row['id']
+        with self._lock:
+            old_type = previous.get('blood_type', row['blood_type'])
+            self._by_type.get(old_type, set()).discard(donor_id)
+            self._available.discard(donor_id)
+            if operation != 'delete':
+                if row['blood_type'] in self._by_type:
+                    self._by_type[row['blood_type']].add(donor_id)
+                if row['is_available']:
+                    self._available.add(donor_id)
+
+    def donors_for(self, recipient_type: str, available_only: bool = True) -> Set[int]:
+        """IDs of donors whose blood can be given to ``recipient_type``"""
+        self._ensure_loaded()
+        with self._lock:
+            ids = set().union(*(self._by_type[bt] for bt in donor_types_for(recipient_type)))
+            if available_only:
+                ids &= self._available
+        return ids
+
+    def count_for(self, recipient_type: str, available_only: bool = True) -> int:
+        """Number of donors whose blood can be given to ``recipient_type``"""
+        return len(self.donors_for(recipient_type, available_only))
+
+
+# Global donor index instance
+donor_type_index = DonorTypeIndex()
+
+
+@on_commit(Donor)
+def _update_index_on_donor_change(operation, row, previous):
+    donor_type_index.apply(operation, row, previous)
+
+
+@on_bulk_change(Donor)
+def _reset_index_on_bulk_load():
+    donor_type_index.reset()
@@ -40,9 +40,47 @@ class Config:
     # Security settings
     WTF_CSRF_ENABLED = True
     WTF_CSRF_TIME_LIMIT = 3600  # 1 hour
+    # werkzeug hash method for new passwords; hashes made with another method are upgraded on login
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD') or 'scrypt:32768:8:1'
     
     # Pagination settings
     ITEMS_PER_PAGE = 20
+    SEARCH_MAX_PAGE_SIZE = 100
+    DONOR_SEARCH_FTS = True  # use the donor_fts index when the database has it
+    CHAT_HISTORY_PAGE_SIZE = 50
+    CHAT_HISTORY_MAX_PAGE_SIZE = 200
+    EMERGENCY_FEED_LIMIT = 100  # max requests per /emergency/api/emergency/active response
+    
+    # Chat write-behind settings (see chat_writer.py)
+    CHAT_WRITE_BEHIND = os.environ.get('CHAT_WRITE_BEHIND', 'false').lower() in ['true', 'on', '1']
+    CHAT_WRITE_QUEUE_SIZE = 10000
+    CHAT_WRITE_BATCH_SIZE = 500
+    CHAT_WRITE_FLUSH_INTERVAL = 0.5  # seconds a partial batch waits before it is written
+    CHAT_WRITE_RETRIES = 3  # retries of a failed batch before falling back to row-by-row inserts
+    CHAT_WRITE_RETRY_DELAY = 0.1  # seconds before the first retry; doubles each time
+    
+    # Current-user cache settings (see user_cache.py)
+    USER_CACHE_SIZE = 10000
+    USER_CACHE_TTL = 300  # seconds
+    
+    # Statistics settings (see stats.py)
+    STATS_RECONCILE_INTERVAL = 300  # seconds between full recounts
+    ADMIN_STATS_TTL = 60  # seconds the admin dashboard aggregates are cached (see aggregates.py)
+    ADMIN_STATS_TOP_CITIES = 10
+    
+    # Emergency demand trend settings (see rollups.py)
+    TREND_DEFAULT_BUCKETS = {'hour': 48, 'day': 30, 'month': 12}
+    TREND_MAX_BUCKETS = 1000  # max buckets per /api/emergency/trends response
+    
+    # Template fragment cache settings (see fragment_cache.py)
+    FRAGMENT_CACHE_ENABLED = True
+    FRAGMENT_CACHE_MAX_BYTES = 32 * 1024 * 1024
+    FRAGMENT_CACHE_TTL = 60  # seconds; bounds staleness when several processes share the database
+    CONDITIONAL_GET_TTL = 30  # seconds an ETag stays valid (see versions.py); bounds cross-process staleness
+    
+    # Static asset pipeline settings (see assets.py)
+    ASSETS_OUTPUT_DIR = 'dist'  # under static/
+    ASSETS_AUTO_BUILD = False  # startup only reads the manifest; `flask assets build` writes static/dist
     
     # File upload settings
     UPLOAD_FOLDER = 'static/uploads'
@@ -54,6 +92,12 @@ class Config:
     # Emergency settings
     EMERGENCY_RESPONSE_TIME_LIMIT = 300  # 5 minutes in seconds
     MAX_EMERGENCY_REQUESTS_PER_USER = 5  # per day
+    URGENCY_LEVELS = ('Critical', 'High', 'Moderate', 'Low')  # most urgent first
+    EMERGENCY_PRIORITY_UNIT_SECONDS = 3600  # each unit needed counts as an hour of extra waiting (see priority.py)
+    EMERGENCY_QUEUE_LIMIT = 10  # default /api/emergency/queue size
+    EMERGENCY_QUEUE_MAX_LIMIT = 100
+    EMERGENCY_PAGE_SIZE = 30  # requests per page on the emergency list and donor dashboard
+    EMERGENCY_COUNT_CAP = 99  # donor dashboard shows "99+ Active" instead of counting every match
     
     # Donation settings
     MIN_DONATION_INTERVAL_DAYS = 56  # 8 weeks
@@ -61,6 +105,9 @@ class Config:
     MIN_DONATION_AGE = 18
     
     # Notification settings
+    FANOUT_ENABLED = True  # notify matching donors when a request is created (see fanout.py)
+    FANOUT_URGENCIES = ('Critical',)
+    FANOUT_QUEUE_SIZE = 1000
     ENABLE_EMAIL_NOTIFICATIONS = True
     ENABLE_SMS_NOTIFICATIONS = False  # Requires SMS service integration
     
@@ -75,6 +122,14 @@ class Config:
         'AB-': ['AB+', 'AB-'],
         'AB+': ['AB+']
     }
+    
+    # Donor matching settings
+    MATCH_SNAPSHOT_REFRESH_SECONDS = 30  # max staleness of the donor snapshot after writes
+    MATCH_SNAPSHOT_MAX_AGE = 300  # rebuild at least this often, for writes made by other processes
+    DONOR_TYPE_INDEX_TTL = 300  # seconds between reloads of the per-type donor sets (see compatibility.py)
+    MATCH_TYPE_PENALTY_KM = 10.0  # prefer an exact blood type over other compatible types
+    MATCH_UNKNOWN_DISTANCE_KM = 10000.0  # donors without coordinates rank last
+    MATCH_MAX_RESULTS = 500
 
 class DevelopmentConfig(Config):
     """Development configuration"""
@@ -136,9 +191,10 @@ class TestingConfig(Config):
     # Testing-specific settings
     WTF_CSRF_ENABLED = False
     SESSION_COOKIE_SECURE = False
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'  # fast hashing for test logins
     
-    # Use in-memory database for testing
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    # Use in-memory database for testing (benchmarks may point at a file)
+    SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL') or 'sqlite:///:memory:'
     
     # Mock data settings
     USE_MOCK_DATA = True
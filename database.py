@@ -4,27 +4,151 @@ Database initialization and management for LifeLink Blood Bank Management System
 
 import sqlite3
 import os
+import queue
+import threading
+from collections import Counter
+from contextlib import contextmanager
 from datetime import datetime
-from models import BloodType, EmergencyUrgency, UserType
 
 class DatabaseManager:
-    """Database manager for SQLite operations"""
-    
-    def __init__(self, db_path='blood_bank.db'):
+    """Database manager for SQLite operations
+
+    Connections come from a bounded pool of ``pool_size`` connections, opened
+    lazily in WAL mode with tuned PRAGMAs and a statement cache. A thread
+    checks one out for the duration of a ``connection()`` block and returns
+    it on exit, so short-lived request threads never leave connections
+    behind. Writes go through ``transaction()``, which commits on success,
+    rolls back on error and joins an enclosing transaction when nested. The
+    schema is created on first use rather than at import time.
+    """
+
+    # Applied to every new connection
+    PRAGMAS = (
+        ('journal_mode', 'WAL'),
+        ('synchronous', 'NORMAL'),
+        ('busy_timeout', 5000),
+        ('mmap_size', 256 * 1024 * 1024),
+        ('temp_store', 'MEMORY'),
+    )
+    CACHED_STATEMENTS = 256
+    POOL_SIZE = 8
+    POOL_TIMEOUT = 10  # seconds to wait for a free connection
+
+    def __init__(self, db_path='blood_bank.db', pool_size=POOL_SIZE):
         self.db_path = db_path
-        self.init_database()
-    
-    def get_connection(self):
-        """Get database connection"""
-        conn = sqlite3.connect(self.db_path)
+        self.pool_size = pool_size
+        self._pool = queue.LifoQueue()
+        self._opened = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=5, cached_statements=self.CACHED_STATEMENTS,
+                               check_same_thread=False)
         conn.row_factory = sqlite3.Row
+        for name, value in self.PRAGMAS:
+            conn.execute(f'PRAGMA {name} = {value}')
         return conn
-    
+
+    def _checkout(self):
+        """Take an idle connection, open a new one below the limit, or wait"""
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            grow = self._opened < self.pool_size
+            if grow:
+                self._opened += 1
+        if grow:
+            try:
+                return self._connect()
+            except BaseException:
+                with self._lock:
+                    self._opened -= 1
+                raise
+        try:
+            return self._pool.get(timeout=self.POOL_TIMEOUT)
+        except queue.Empty:
+            raise sqlite3.OperationalError('timed out waiting for a pooled database connection')
+
+    @contextmanager
+    def connection(self):
+        """Hold a pooled connection for a block; nested blocks on a thread share it"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            yield conn
+            return
+        conn = self._checkout()
+        self._local.conn, self._local.depth = conn, 0
+        try:
+            if not self._initialized:
+                self._ensure_schema(conn)
+            yield conn
+        finally:
+            self._local.conn = None
+            if conn.in_transaction:
+                conn.rollback()
+            self._pool.put(conn)
+
+    @contextmanager
+    def transaction(self):
+        """Run a block in one write transaction on this thread's connection
+
+        The transaction starts with ``BEGIN IMMEDIATE``, so reads inside the
+        block already hold the write lock and cannot be invalidated by a
+        concurrent writer before the block's own writes run.
+        """
+        with self.connection() as conn:
+            if self._local.depth:
+                # Already inside a transaction on this thread: join it
+                self._local.depth += 1
+                try:
+                    yield conn
+                finally:
+                    self._local.depth -= 1
+                return
+            self._local.depth = 1
+            try:
+                if not conn.in_transaction:
+                    conn.execute('BEGIN IMMEDIATE')
+                yield conn
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                self._local.depth = 0
+
+    def close(self):
+        """Close the idle pooled connections; checked-out ones are closed by the next close"""
+        closed = 0
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            closed += 1
+        with self._lock:
+            self._opened -= closed
+
     def init_database(self):
         """Initialize database tables"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
+        with self.connection():
+            pass
+
+    def _ensure_schema(self, conn):
+        with self._init_lock:
+            if self._initialized:
+                return
+            with conn:
+                self._create_tables(conn.cursor())
+            self._initialized = True
+
+    def _create_tables(self, cursor):
         # Create users table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS users (
@@ -42,7 +166,7 @@ class DatabaseManager:
                 is_verified BOOLEAN DEFAULT 0
             )
         ''')
-        
+
         # Create donors table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS donors (
@@ -57,7 +181,7 @@ class DatabaseManager:
                 FOREIGN KEY (user_id) REFERENCES users (id)
             )
         ''')
-        
+
         # Create emergency_requests table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS emergency_requests (
@@ -77,7 +201,7 @@ class DatabaseManager:
                 FOREIGN KEY (fulfilled_by) REFERENCES users (id)
             )
         ''')
-        
+
         # Create blood_donations table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS blood_donations (
@@ -95,7 +219,13 @@ class DatabaseManager:
                 FOREIGN KEY (verified_by) REFERENCES users (id)
             )
         ''')
-        
+
+        # Donation history per donor, and the deferrable index for bulk loads
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS ix_blood_donations_donor_date
+            ON blood_donations (donor_id, donation_date)
+        ''')
+
         # Create notifications table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS notifications (
@@ -109,266 +239,373 @@ class DatabaseManager:
                 FOREIGN KEY (user_id) REFERENCES users (id)
             )
         ''')
-        
-        conn.commit()
-        conn.close()
-    
+
+        # Covers the unread lookups and the per-user listing
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS ix_notifications_user_read_created
+            ON notifications (user_id, is_read, created_at)
+        ''')
+
+        # Per-user unread counters, kept in step by the notification methods
+        counters_exist = cursor.execute('''
+            SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'notification_counters'
+        ''').fetchone()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS notification_counters (
+                user_id INTEGER PRIMARY KEY,
+                unread INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        if not counters_exist:
+            cursor.execute('''
+                INSERT INTO notification_counters (user_id, unread)
+                SELECT user_id, COUNT(*) FROM notifications WHERE is_read = 0 GROUP BY user_id
+            ''')
+
     def insert_user(self, user_data):
         """Insert a new user"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO users (name, email, phone, user_type, blood_type, age, city, address)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            user_data['name'],
-            user_data['email'],
-            user_data['phone'],
-            user_data['user_type'],
-            user_data.get('blood_type'),
-            user_data.get('age'),
-            user_data.get('city'),
-            user_data.get('address')
-        ))
-        
-        user_id = cursor.lastrowid
-        
-        # If user is a donor, create donor record
-        if user_data['user_type'] == 'donor':
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+
             cursor.execute('''
-                INSERT INTO donors (user_id)
-                VALUES (?)
-            ''', (user_id,))
-        
-        conn.commit()
-        conn.close()
-        
+                INSERT INTO users (name, email, phone, user_type, blood_type, age, city, address)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                user_data['name'],
+                user_data['email'],
+                user_data['phone'],
+                user_data['user_type'],
+                user_data.get('blood_type'),
+                user_data.get('age'),
+                user_data.get('city'),
+                user_data.get('address')
+            ))
+
+            user_id = cursor.lastrowid
+
+            # If user is a donor, create donor record
+            if user_data['user_type'] == 'donor':
+                cursor.execute('''
+                    INSERT INTO donors (user_id)
+                    VALUES (?)
+                ''', (user_id,))
+
         return user_id
-    
+
+    DONATION_COLUMNS = ('donor_id', 'blood_type', 'units', 'donation_date', 'location')
+
+    @contextmanager
+    def deferred_indexes(self, *tables):
+        """Drop the named tables' secondary indexes and recreate them on exit"""
+        with self.connection() as conn:
+            placeholders = ', '.join('?' * len(tables))
+            indexes = conn.execute(f'''
+                SELECT name, sql FROM sqlite_master
+                WHERE type = 'index' AND sql IS NOT NULL AND tbl_name IN ({placeholders})
+            ''', tables).fetchall()
+            with self.transaction():
+                for index in indexes:
+                    conn.execute(f'DROP INDEX "{index["name"]}"')
+            try:
+                yield
+            finally:
+                with self.transaction():
+                    for index in indexes:
+                        conn.execute(index['sql'])
+
+    def _bulk_insert(self, rows, columns, required, insert_sql, after_rows=None):
+        """Insert rows with one executemany, falling back to per-row savepoints on error"""
+        values, positions, errors = [], [], []
+        for position, row in enumerate(rows):
+            missing = [c for c in required if row.get(c) in (None, '')]
+            if missing:
+                errors.append((position, f"missing {', '.join(missing)}"))
+                continue
+            values.append(tuple(row.get(c) for c in columns))
+            positions.append(position)
+
+        with self.transaction() as conn:
+            try:
+                conn.execute('SAVEPOINT bulk')
+                conn.executemany(insert_sql, values)
+                if after_rows:
+                    after_rows(conn, values)
+                conn.execute('RELEASE bulk')
+                return len(values), errors
+            except sqlite3.DatabaseError:
+                conn.execute('ROLLBACK TO bulk')
+                conn.execute('RELEASE bulk')
+
+            inserted = []
+            for position, value in zip(positions, values):
+                conn.execute('SAVEPOINT bulk_row')
+                try:
+                    conn.execute(insert_sql, value)
+                    inserted.append(value)
+                except sqlite3.DatabaseError as e:
+                    conn.execute('ROLLBACK TO bulk_row')
+                    errors.append((position, str(e)))
+                conn.execute('RELEASE bulk_row')
+            if after_rows and inserted:
+                after_rows(conn, inserted)
+        errors.sort()
+        return len(inserted), errors
+
+    def bulk_insert_donations(self, donations):
+        """Insert many donations in one transaction and refresh donor totals
+
+        Returns ``(inserted, errors)`` where ``errors`` lists ``(position,
+        message)`` for rejected rows. Donor totals are updated from the
+        chunk itself, one UPDATE per donor, without rescanning the donation
+        history.
+        """
+        def refresh_donors(conn, values):
+            totals = {}
+            for donor_id, _, _, donation_date, _ in values:
+                count, latest = totals.get(donor_id, (0, donation_date))
+                totals[donor_id] = (count + 1, max(latest, donation_date))
+            conn.executemany('''
+                UPDATE donors
+                SET total_donations = COALESCE(total_donations, 0) + ?,
+                    last_donation_date = MAX(COALESCE(last_donation_date, ''), ?),
+                    next_eligible_date = datetime(MAX(COALESCE(last_donation_date, ''), ?), '+56 days')
+                WHERE user_id = ?
+            ''', [(count, latest, latest, donor_id) for donor_id, (count, latest) in totals.items()])
+
+        insert_sql = '''
+            INSERT INTO blood_donations (donor_id, blood_type, units, donation_date, location)
+            VALUES (?, ?, ?, ?, ?)
+        '''
+        return self._bulk_insert(donations, self.DONATION_COLUMNS, self.DONATION_COLUMNS, insert_sql,
+                                 refresh_donors)
+
     def get_user_by_id(self, user_id):
         """Get user by ID"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT * FROM users WHERE id = ?
-        ''', (user_id,))
-        
-        user = cursor.fetchone()
-        conn.close()
-        
-        return dict(user) if user else None
-    
+        with self.connection() as conn:
+            user = conn.execute('''
+                SELECT * FROM users WHERE id = ?
+            ''', (user_id,)).fetchone()
+
+            return dict(user) if user else None
+
+    def get_user_emails(self, user_ids):
+        """``{user_id: email}`` for the given user ids; unknown ids are left out"""
+        ids = list(user_ids)
+        if not ids:
+            return {}
+        with self.connection() as conn:
+            rows = conn.execute(f'''
+                SELECT id, email FROM users WHERE id IN ({', '.join('?' * len(ids))})
+            ''', ids)
+
+            return {row['id']: row['email'] for row in rows}
+
     def get_user_by_email(self, email):
         """Get user by email"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT * FROM users WHERE email = ?
-        ''', (email,))
-        
-        user = cursor.fetchone()
-        conn.close()
-        
-        return dict(user) if user else None
-    
+        with self.connection() as conn:
+            user = conn.execute('''
+                SELECT * FROM users WHERE email = ?
+            ''', (email,)).fetchone()
+
+            return dict(user) if user else None
+
     def get_all_donors(self):
         """Get all donors"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT u.*, d.total_donations, d.last_donation_date, d.next_eligible_date, 
-                   d.is_available, d.emergency_contact, d.medical_conditions
-            FROM users u
-            LEFT JOIN donors d ON u.id = d.user_id
-            WHERE u.user_type = 'donor' AND u.is_active = 1
-        ''')
-        
-        donors = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        
-        return donors
-    
+        with self.connection() as conn:
+            rows = conn.execute('''
+                SELECT u.*, d.total_donations, d.last_donation_date, d.next_eligible_date,
+                       d.is_available, d.emergency_contact, d.medical_conditions
+                FROM users u
+                LEFT JOIN donors d ON u.id = d.user_id
+                WHERE u.user_type = 'donor' AND u.is_active = 1
+            ''')
+
+            return [dict(row) for row in rows]
+
     def insert_emergency_request(self, request_data):
         """Insert a new emergency request"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO emergency_requests (patient_name, blood_type, units_needed, urgency, hospital, contact, city)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            request_data['patient_name'],
-            request_data['blood_type'],
-            request_data['units_needed'],
-            request_data['urgency'],
-            request_data['hospital'],
-            request_data['contact'],
-            request_data.get('city')
-        ))
-        
-        request_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        
-        return request_id
-    
+        with self.transaction() as conn:
+            cursor = conn.execute('''
+                INSERT INTO emergency_requests (patient_name, blood_type, units_needed, urgency, hospital, contact, city)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                request_data['patient_name'],
+                request_data['blood_type'],
+                request_data['units_needed'],
+                request_data['urgency'],
+                request_data['hospital'],
+                request_data['contact'],
+                request_data.get('city')
+            ))
+
+        return cursor.lastrowid
+
     def get_active_emergency_requests(self):
         """Get all active emergency requests"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT * FROM emergency_requests 
-            WHERE is_active = 1 
-            ORDER BY created_at DESC
-        ''')
-        
-        requests = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        
-        return requests
-    
+        with self.connection() as conn:
+            rows = conn.execute('''
+                SELECT * FROM emergency_requests
+                WHERE is_active = 1
+                ORDER BY created_at DESC
+            ''')
+
+            return [dict(row) for row in rows]
+
     def update_emergency_request(self, request_id, data):
         """Update emergency request"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE emergency_requests 
-            SET is_fulfilled = ?, fulfilled_at = ?, fulfilled_by = ?
-            WHERE id = ?
-        ''', (
-            data.get('is_fulfilled', False),
-            data.get('fulfilled_at'),
-            data.get('fulfilled_by'),
-            request_id
-        ))
-        
-        conn.commit()
-        conn.close()
-    
+        with self.transaction() as conn:
+            conn.execute('''
+                UPDATE emergency_requests
+                SET is_fulfilled = ?, fulfilled_at = ?, fulfilled_by = ?
+                WHERE id = ?
+            ''', (
+                data.get('is_fulfilled', False),
+                data.get('fulfilled_at'),
+                data.get('fulfilled_by'),
+                request_id
+            ))
+
     def insert_donation(self, donation_data):
         """Insert a new blood donation"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO blood_donations (donor_id, blood_type, units, donation_date, location)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (
-            donation_data['donor_id'],
-            donation_data['blood_type'],
-            donation_data['units'],
-            donation_data['donation_date'],
-            donation_data['location']
-        ))
-        
-        donation_id = cursor.lastrowid
-        
-        # Update donor's donation count and dates
-        cursor.execute('''
-            UPDATE donors 
-            SET total_donations = total_donations + 1,
-                last_donation_date = ?,
-                next_eligible_date = datetime(?, '+56 days')
-            WHERE user_id = ?
-        ''', (
-            donation_data['donation_date'],
-            donation_data['donation_date'],
-            donation_data['donor_id']
-        ))
-        
-        conn.commit()
-        conn.close()
-        
+        with self.transaction() as conn:
+            cursor = conn.execute('''
+                INSERT INTO blood_donations (donor_id, blood_type, units, donation_date, location)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (
+                donation_data['donor_id'],
+                donation_data['blood_type'],
+                donation_data['units'],
+                donation_data['donation_date'],
+                donation_data['location']
+            ))
+
+            donation_id = cursor.lastrowid
+
+            # Update donor's donation count and dates
+            conn.execute('''
+                UPDATE donors
+                SET total_donations = total_donations + 1,
+                    last_donation_date = ?,
+                    next_eligible_date = datetime(?, '+56 days')
+                WHERE user_id = ?
+            ''', (
+                donation_data['donation_date'],
+                donation_data['donation_date'],
+                donation_data['donor_id']
+            ))
+
         return donation_id
-    
+
     def get_donations_by_donor(self, donor_id):
         """Get all donations by a donor"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT * FROM blood_donations 
-            WHERE donor_id = ? 
-            ORDER BY donation_date DESC
-        ''', (donor_id,))
-        
-        donations = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        
-        return donations
-    
+        with self.connection() as conn:
+            rows = conn.execute('''
+                SELECT * FROM blood_donations
+                WHERE donor_id = ?
+                ORDER BY donation_date DESC
+            ''', (donor_id,))
+
+            return [dict(row) for row in rows]
+
+    def _add_unread(self, conn, counts):
+        """Adjust unread counters by ``(user_id, delta)`` pairs"""
+        conn.executemany('''
+            INSERT INTO notification_counters (user_id, unread) VALUES (?, ?)
+            ON CONFLICT (user_id) DO UPDATE SET unread = MAX(unread + excluded.unread, 0)
+        ''', counts)
+
     def insert_notification(self, notification_data):
         """Insert a new notification"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO notifications (user_id, title, message, notification_type)
-            VALUES (?, ?, ?, ?)
-        ''', (
-            notification_data['user_id'],
-            notification_data['title'],
-            notification_data['message'],
-            notification_data['notification_type']
-        ))
-        
-        notification_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        
-        return notification_id
-    
+        with self.transaction() as conn:
+            cursor = conn.execute('''
+                INSERT INTO notifications (user_id, title, message, notification_type)
+                VALUES (?, ?, ?, ?)
+            ''', (
+                notification_data['user_id'],
+                notification_data['title'],
+                notification_data['message'],
+                notification_data['notification_type']
+            ))
+            self._add_unread(conn, [(notification_data['user_id'], 1)])
+
+        return cursor.lastrowid
+
+    def insert_notifications(self, notifications):
+        """Insert many notifications in one transaction; returns how many were written"""
+        rows = [(n['user_id'], n['title'], n['message'], n['notification_type']) for n in notifications]
+        with self.transaction() as conn:
+            conn.executemany('''
+                INSERT INTO notifications (user_id, title, message, notification_type)
+                VALUES (?, ?, ?, ?)
+            ''', rows)
+            self._add_unread(conn, Counter(row[0] for row in rows).items())
+
+        return len(rows)
+
     def get_notifications_by_user(self, user_id, limit=50):
         """Get notifications for a user"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT * FROM notifications 
-            WHERE user_id = ? 
-            ORDER BY created_at DESC 
-            LIMIT ?
-        ''', (user_id, limit))
-        
-        notifications = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        
-        return notifications
-    
+        with self.connection() as conn:
+            rows = conn.execute('''
+                SELECT * FROM notifications
+                WHERE user_id = ?
+                ORDER BY created_at DESC
+                LIMIT ?
+            ''', (user_id, limit))
+
+            return [dict(row) for row in rows]
+
     def mark_notification_read(self, notification_id):
         """Mark notification as read"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE notifications 
-            SET is_read = 1 
-            WHERE id = ?
-        ''', (notification_id,))
-        
-        conn.commit()
-        conn.close()
-    
+        return self.mark_notifications_read([notification_id])
+
+    def mark_notifications_read(self, notification_ids, user_id=None):
+        """Mark a batch of notifications as read; returns how many were unread
+
+        Pass ``user_id`` to only touch that user's notifications.
+        """
+        ids = list(notification_ids)
+        if not ids:
+            return 0
+        placeholders = ', '.join('?' * len(ids))
+        owner = '' if user_id is None else 'AND user_id = ?'
+        params = ids if user_id is None else ids + [user_id]
+        with self.transaction() as conn:
+            owners = conn.execute(f'''
+                SELECT user_id, COUNT(*) FROM notifications
+                WHERE id IN ({placeholders}) AND is_read = 0 {owner}
+                GROUP BY user_id
+            ''', params).fetchall()
+            conn.execute(f'''
+                UPDATE notifications
+                SET is_read = 1
+                WHERE id IN ({placeholders}) AND is_read = 0 {owner}
+            ''', params)
+            self._add_unread(conn, [(row[0], -row[1]) for row in owners])
+
+        return sum(row[1] for row in owners)
+
+    def mark_all_notifications_read(self, user_id):
+        """Mark every notification of a user as read; returns how many were unread"""
+        with self.transaction() as conn:
+            cursor = conn.execute('''
+                UPDATE notifications
+                SET is_read = 1
+                WHERE user_id = ? AND is_read = 0
+            ''', (user_id,))
+            conn.execute('''
+                UPDATE notification_counters SET unread = 0 WHERE user_id = ?
+            ''', (user_id,))
+
+        return cursor.rowcount
+
     def get_unread_notification_count(self, user_id):
         """Get count of unread notifications for a user"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT COUNT(*) FROM notifications 
-            WHERE user_id = ? AND is_read = 0
-        ''', (user_id,))
-        
-        count = cursor.fetchone()[0]
-        conn.close()
-        
-        return count
-
-# Global database manager instance
-db_manager = DatabaseManager() 
\ No newline at end of file
+        with self.connection() as conn:
+            row = conn.execute('''
+                SELECT unread FROM notification_counters WHERE user_id = ?
+            ''', (user_id,)).fetchone()
+
+            return row[0] if row else 0
+
+# Global database manager instance (connections and schema are created lazily)
+db_manager = DatabaseManager()
@@ -0,0 +1,96 @@
+"""
+Donor full-text search for LifeLink Blood Bank Management System
+
+On SQLite the ``donor_fts`` FTS5 table (created by migration
+``3f6a2c1d9b7e``) indexes donor name and address and is kept in sync by
+triggers. Name and city filters become prefix queries against it; backends
+without the table fall back to ``ILIKE`` scans.
+"""
+
+import re
+from flask import current_app
+from sqlalchemy import text, table, column
+from models import db, Donor
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+_fts_state = {}
+donor_fts = table('donor_fts', column('rowid'))
+
+# Kept in step with migrations/versions/3f6a2c1d9b7e_add_donor_fts_index.py
+FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS donor_fts USING fts5(
+        name, address, content='donor', content_rowid='id', prefix='1 2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS donor_fts_ai AFTER INSERT ON donor BEGIN
+        INSERT INTO donor_fts(rowid, name, address) VALUES (new.id, new.name, new.address);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS donor_fts_ad AFTER DELETE ON donor BEGIN
+        INSERT INTO donor_fts(donor_fts, rowid, name, address) VALUES ('delete', old.id, old.name, old.address);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS donor_fts_au AFTER UPDATE OF name, address ON donor BEGIN
+        INSERT INTO donor_fts(donor_fts, rowid, name, address) VALUES ('delete', old.id, old.name, old.address);
+        INSERT INTO donor_fts(rowid, name, address) VALUES (new.id, new.name, new.address);
+    END""",
+    "INSERT INTO donor_fts(donor_fts) VALUES ('rebuild')",
+]
+
+
+def create_fts_index(connection):
+    """Create and populate the FTS index on an existing SQLite connection"""
+    for statement in FTS_DDL:
+        connection.execute(text(statement))
+
+
+def fts_available():
+    """Check (once per engine) whether the donor FTS index can be used"""
+    if not current_app.config.get('DONOR_SEARCH_FTS', True):
+        return False
+    engine = db.engine
+    key = str(engine.url)
+    if key not in _fts_state:
+        available = False
+        if engine.dialect.name == 'sqlite':
+            with engine.connect() as conn:
+                available = conn.execute(text(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'donor_fts'"
+                )).first() is not None
+        _fts_state[key] = available
+    return _fts_state[key]
+
+
+def reset_fts_state():
+    """Forget cached FTS availability, e.g. after creating the index"""
+    _fts_state.clear()
+
+
+def prefix_terms(column, value):
+    """Build an FTS5 column filter matching every word of ``value`` as a prefix"""
+    tokens = _TOKEN_RE.findall(value)
+    if not tokens:
+        return None
+    return '%s : (%s)' % (column, ' '.join('"%s"*' % token for token in tokens))
+
+
+def filter_by_text(query, name=None, city=None):
+    """Apply the name / city filters to a donor query, using FTS when possible
+
+    Returns ``(query, key)`` where ``key`` is the column holding the donor ID
+    that keyset pagination should filter and order on.
+    """
+    if not (name or city):
+        return query, Donor.id
+    terms = [prefix_terms(column, value) for column, value in (('name', name), ('address', city)) if value]
+    # A value with no word characters (e.g. '@@') has no FTS terms; ILIKE still filters on it
+    if all(terms) and fts_available():
+        # Driving the query from the FTS table and paging on its rowid lets
+        # SQLite walk matches in id order and stop at the page limit instead
+        # of materializing every match.
+        query = query.select_from(donor_fts).join(Donor, Donor.id == donor_fts.c.rowid).filter(
+            text('donor_fts MATCH :fts_match').bindparams(fts_match=' AND '.join(terms))
+        )
+        return query, donor_fts.c.rowid
+    if name:
+        query = query.filter(Donor.name.ilike(f'%{name}%'))
+    if city:
+        query = query.filter(Donor.address.ilike(f'%{city}%'))
+    return query, Donor.id
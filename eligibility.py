@@ -0,0 +1,104 @@
+"""
+Donor eligibility for LifeLink Blood Bank Management System
+
+Every donor row carries ``last_donation_date`` and an indexed
+``next_eligible_date`` (``NEVER_DONATED`` for first-time donors), both set
+when a donation is recorded. "Eligible to donate now" is then the index
+range ``next_eligible_date <= now``, and bulk checks read the two columns
+for a batch of donors at once instead of evaluating donors one by one.
+"""
+
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import bindparam, or_
+from models import db, Donor
+from hooks import bulk_changed
+
+ELIGIBILITY_BATCH_SIZE = 500
+
+
+def donation_interval():
+    return timedelta(days=current_app.config.get('MIN_DONATION_INTERVAL_DAYS', 56))
+
+
+def eligible_now(now=None):
+    """Criterion for donors whose donation interval has passed"""
+    return Donor.next_eligible_date <= (now or datetime.utcnow())
+
+
+def age_eligible():
+    """Criterion for donors inside the configured donation age range"""
+    config = current_app.config
+    return Donor.age.between(config.get('MIN_DONATION_AGE', 18), config.get('MAX_DONATION_AGE', 65))
+
+
+def record_donation(donor, donated_at=None):
+    """Update a donor's donation dates for a new donation (the caller commits)
+
+    Back-dated donations older than the recorded last donation are ignored.
+    """
+    donated_at = donated_at or datetime.utcnow()
+    if donor.last_donation_date is None or donated_at > donor.last_donation_date:
+        donor.last_donation_date = donated_at
+        donor.next_eligible_date = donated_at + donation_interval()
+
+
+def record_donations(donations):
+    """Apply many ``(donor_id, donated_at)`` donations in one transaction
+
+    Only the latest donation per donor matters; it is written with a single
+    executemany and never moves a donor's dates backwards. Returns the
+    number of donors updated.
+    """
+    latest = {}
+    for donor_id, donated_at in donations:
+        if donor_id not in latest or donated_at > latest[donor_id]:
+            latest[donor_id] = donated_at
+    if not latest:
+        return 0
+
+    table = Donor.__table__
+    interval = donation_interval()
+    update = table.update().where(
+        table.c.id == bindparam('_id'),
+        or_(table.c.last_donation_date.is_(None), table.c.last_donation_date < bindparam('_last'))
+    ).values(last_donation_date=bindparam('_last'), next_eligible_date=bindparam('_next'))
+    try:
+        result = db.session.connection().execute(update, [
+            {'_id': donor_id, '_last': donated_at, '_next': donated_at + interval}
+            for donor_id, donated_at in latest.items()
+        ])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    bulk_changed(Donor)
+    return result.rowcount
+
+
+def check_eligibility(donor_ids, now=None):
+    """Eligibility of many donors, ``{donor_id: {...}}``, read in batches
+
+    Each entry has the same flags as ``utils.is_eligible_for_donation`` plus
+    ``next_eligible_date`` (None for first-time donors). Unknown ids are
+    left out.
+    """
+    now = now or datetime.utcnow()
+    config = current_app.config
+    min_age, max_age = config.get('MIN_DONATION_AGE', 18), config.get('MAX_DONATION_AGE', 65)
+    donor_ids = list(dict.fromkeys(donor_ids))
+    results = {}
+    for start in range(0, len(donor_ids), ELIGIBILITY_BATCH_SIZE):
+        batch = donor_ids[start:start + ELIGIBILITY_BATCH_SIZE]
+        for donor_id, age, last_donation, next_eligible in db.session.query(
+                Donor.id, Donor.age, Donor.last_donation_date, Donor.next_eligible_date
+        ).filter(Donor.id.in_(batch)):
+            age_ok = min_age <= age <= max_age
+            time_ok = next_eligible <= now
+            results[donor_id] = {
+                'eligible': age_ok and time_ok,
+                'age_eligible': age_ok,
+                'time_eligible': time_ok,
+                'next_eligible_date': next_eligible if last_donation else None
+            }
+    return results
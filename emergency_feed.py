@@ -0,0 +1,64 @@
+"""
+Live emergency feed for LifeLink Blood Bank Management System
+
+Every committed EmergencyRequest write is pushed to Socket.IO clients in
+the ``emergency_feed`` room as an ``emergency_update`` event, so dashboards
+no longer poll. ``static/js/emergency_feed.js``, loaded on every page by
+``base.html``, joins the room. Clients that reconnect catch up through
+``/emergency/api/emergency/active?since=<id|timestamp>``.
+"""
+
+from datetime import datetime
+from models import EmergencyRequest
+from hooks import on_commit
+
+EMERGENCY_FEED_ROOM = 'emergency_feed'
+EMERGENCY_FEED_EVENT = 'emergency_update'
+
+FEED_FIELDS = ('id', 'patient_id', 'patient_name', 'blood_type', 'units_needed', 'urgency',
+               'hospital', 'contact', 'city', 'created_at')
+
+
+def serialize_emergency(values):
+    """JSON-ready dict for an emergency request, from a model or a column dict"""
+    if not isinstance(values, dict):
+        values = {field: getattr(values, field) for field in FEED_FIELDS}
+    data = {field: values.get(field) for field in FEED_FIELDS}
+    if isinstance(data['created_at'], datetime):
+        data['created_at'] = data['created_at'].isoformat()
+    return data
+
+
+class EmergencyFeed:
+    """Publishes committed emergency request changes over Socket.IO"""
+
+    def __init__(self):
+        self.app = None
+        self.socketio = None
+        self.published = 0
+
+    def init_app(self, app, socketio):
+        self.app = app
+        self.socketio = socketio
+
+    def publish(self, operation, row):
+        if self.socketio is None:
+            return
+        try:
+            self.socketio.emit(EMERGENCY_FEED_EVENT, {
+                'operation': operation,
+                'emergency': serialize_emergency(row)
+            }, to=EMERGENCY_FEED_ROOM)
+            self.published += 1
+        except Exception:
+            # The write is already committed; clients catch up via ?since=
+            self.app.logger.exception('emergency feed publish failed')
+
+
+# Global emergency feed instance
+emergency_feed = EmergencyFeed()
+
+
+@on_commit(EmergencyRequest)
+def _publish_emergency_change(operation, row, previous):
+    emergency_feed.publish(operation, row)
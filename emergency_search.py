@@ -0,0 +1,104 @@
+"""
+Emergency request filtering and pagination for LifeLink Blood Bank Management System
+
+The emergency list and the donor dashboard share these filters (blood type,
+city, urgency, compatible-with) and page with a keyset cursor instead of
+rendering every request. Each sort walks an index in order:
+
+- ``priority``: ``ix_emergency_request_priority`` (see priority.py)
+- ``newest``: ``ix_emergency_request_created_at``, or
+  ``ix_emergency_request_patient_id_created_at`` for one patient's requests
+
+and ``ix_emergency_request_blood_type_city`` serves blood type + city
+lookups. Cities are stored normalized (``normalize_city``, applied on every
+ORM write) so the city filter is a single equality on that index. The cursor is the sort key of the last row on the page, so the
+next page starts with an index seek rather than an OFFSET scan. Totals are
+capped with ``capped_count`` so a broad filter never counts every match.
+"""
+
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import event, tuple_
+from models import EmergencyRequest
+from compatibility import BLOOD_TYPE_BITS, recipient_types_for
+
+SORTS = {
+    'priority': ((EmergencyRequest.priority_rank, EmergencyRequest.priority_at, EmergencyRequest.id), False),
+    'newest': ((EmergencyRequest.created_at, EmergencyRequest.id), True),
+}
+FILTERS = ('blood_type', 'city', 'urgency', 'compatible_with')
+
+
+def read_filters(args):
+    """Filter values from request args, blanks dropped"""
+    return {name: args.get(name, '').strip() for name in FILTERS if args.get(name, '').strip()}
+
+
+def normalize_city(city):
+    """The stored spelling of a city: trimmed and title-cased"""
+    return (city or '').strip().title()
+
+
+@event.listens_for(EmergencyRequest, 'before_insert')
+@event.listens_for(EmergencyRequest, 'before_update')
+def _normalize_city(mapper, connection, target):
+    target.city = normalize_city(target.city)
+
+
+def filter_requests(query, blood_type=None, city=None, urgency=None, compatible_with=None):
+    """Apply the emergency filters to a request query"""
+    if blood_type:
+        query = query.filter(EmergencyRequest.blood_type == blood_type)
+    if compatible_with in BLOOD_TYPE_BITS:
+        # Requests a donor of this blood type can serve
+        query = query.filter(EmergencyRequest.blood_type.in_(recipient_types_for(compatible_with)))
+    if city:
+        query = query.filter(EmergencyRequest.city == normalize_city(city))
+    if urgency:
+        query = query.filter(EmergencyRequest.urgency == urgency)
+    return query
+
+
+def encode_cursor(values):
+    values = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, sort):
+    """Sort key values from a cursor; raises ValueError if it is malformed"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except Exception:
+        raise ValueError('invalid cursor')
+    columns = SORTS[sort][0]
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError('invalid cursor')
+    try:
+        return [
+            datetime.fromisoformat(value) if column.type.python_type is datetime else int(value)
+            for column, value in zip(columns, values)
+        ]
+    except (TypeError, ValueError):
+        raise ValueError('invalid cursor')
+
+
+def capped_count(query, cap):
+    """Number of matches, counting at most ``cap + 1``; over ``cap`` means "more than cap"""
+    return query.order_by(None).limit(cap + 1).count()
+
+
+def paginate(query, sort='priority', after=None, limit=20):
+    """One keyset page: ``(requests, next_cursor)``; ``next_cursor`` is None on the last page"""
+    columns, descending = SORTS[sort]
+    if after:
+        key = tuple_(*columns)
+        values = tuple_(*decode_cursor(after, sort))
+        query = query.filter(key < values if descending else key > values)
+    query = query.order_by(*(column.desc() if descending else column for column in columns))
+    requests = query.limit(limit + 1).all()
+    if len(requests) <= limit:
+        return requests, None
+    requests = requests[:limit]
+    last = requests[-1]
+    return requests, encode_cursor([getattr(last, column.key) for column in columns])
@@ -0,0 +1,95 @@
+"""
+Streaming data export for LifeLink Blood Bank Management System
+
+Rows are read in ``EXPORT_BATCH_SIZE`` batches (``yield_per``) and written
+out as NDJSON or CSV text chunks, optionally gzip-compressed on the fly, so
+memory stays flat however large the table is. Used by the admin export
+routes and the ``flask export`` command.
+"""
+
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from models import db, Donor, EmergencyRequest, ChatMessage, Feedback
+
+# Exported columns per dataset (donor passwords are never exported)
+DATASETS = {
+    'donors': (Donor, ('id', 'name', 'email', 'phone', 'age', 'blood_type', 'latitude', 'longitude',
+                       'address', 'medical_conditions', 'emergency_contact', 'is_available',
+                       'last_donation_date', 'next_eligible_date')),
+    'emergencies': (EmergencyRequest, ('id', 'patient_id', 'patient_name', 'blood_type', 'units_needed',
+                                       'urgency', 'hospital', 'contact', 'city', 'created_at')),
+    'chat': (ChatMessage, ('id', 'sender_id', 'sender_type', 'receiver_id', 'receiver_type', 'message',
+                           'timestamp', 'conversation_key')),
+    'feedback': (Feedback, ('id', 'name', 'email', 'subject', 'message', 'created_at')),
+}
+FORMATS = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+EXPORT_BATCH_SIZE = 1000
+
+
+def _value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def iter_rows(dataset, batch_size=EXPORT_BATCH_SIZE):
+    """Yield the rows of a dataset as tuples, in id order, one batch in memory at a time"""
+    model, columns = DATASETS[dataset]
+    query = db.session.query(*(getattr(model, c) for c in columns)).order_by(model.id)
+    for row in query.execution_options(yield_per=batch_size, stream_results=True):
+        yield tuple(_value(v) for v in row)
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_ndjson(dataset, batch_size=EXPORT_BATCH_SIZE):
+    """Yield NDJSON text, one chunk per batch of rows"""
+    columns = DATASETS[dataset][1]
+    for batch in _batches(iter_rows(dataset, batch_size), batch_size):
+        yield ''.join(json.dumps(dict(zip(columns, row)), default=str) + '\n' for row in batch)
+
+
+def iter_csv(dataset, batch_size=EXPORT_BATCH_SIZE):
+    """Yield CSV text (header first), one chunk per batch of rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(DATASETS[dataset][1])
+    for batch in _batches(iter_rows(dataset, batch_size), batch_size):
+        writer.writerows(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def iter_export(dataset, fmt, compress=False):
+    """Yield the export as bytes, gzip-compressed when ``compress`` is set"""
+    chunks = (chunk.encode('utf-8') for chunk in (iter_csv if fmt == 'csv' else iter_ndjson)(dataset))
+    return gzip_stream(chunks) if compress else chunks
+
+
+def gzip_stream(chunks, level=6):
+    """Compress a stream of byte chunks into a single gzip member"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_filename(dataset, fmt, compress=False):
+    return f'{dataset}.{fmt}' + ('.gz' if compress else '')
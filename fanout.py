@@ -0,0 +1,183 @@
+"""
+Emergency notification fan-out for LifeLink Blood Bank Management System
+
+When a Critical request commits, it is queued for a background worker. The
+worker selects compatible, available donors who are eligible to donate
+(age and donation interval, see eligibility.py) and whose address
+matches the request's city, writes one notification per donor in a single
+batched transaction, then pushes a ``notification`` event to the donors
+that are online (those with a joined ``donor_<id>`` Socket.IO room).
+Personal rooms are qualified by user type because donor and patient ids
+overlap.
+"""
+
+import atexit
+import queue
+import threading
+import time
+from models import db, Donor, EmergencyRequest
+from compatibility import donor_types_for
+from donor_search import filter_by_text
+from eligibility import eligible_now, age_eligible
+from database import db_manager
+from hooks import on_commit
+
+NOTIFICATION_EVENT = 'notification'
+_STOP = object()
+
+
+def user_room(user_type, user_id):
+    """Personal Socket.IO room of a donor or patient"""
+    return f'{user_type}_{user_id}'
+
+
+def room_owner(room):
+    """``(user_type, user_id)`` of a personal room, or None for any other room"""
+    user_type, _, user_id = str(room).partition('_')
+    if user_type in ('donor', 'patient') and user_id.isdigit():
+        return user_type, int(user_id)
+    return None
+
+
+class NotificationFanout:
+    """Background worker that notifies matching donors about Critical requests"""
+
+    def __init__(self, manager=db_manager):
+        self.manager = manager
+        self.app = None
+        self.socketio = None
+        self._queue = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.notified = 0
+        self.pushed = 0
+        self.last_latency_ms = None
+
+    def init_app(self, app, socketio):
+        self.app = app
+        self.socketio = socketio
+        self._queue = queue.Queue(maxsize=app.config.get('FANOUT_QUEUE_SIZE', 1000))
+        atexit.register(self.shutdown)
+
+    def wants(self, row):
+        """Whether a committed emergency request should be fanned out"""
+        if self.app is None or not self.app.config.get('FANOUT_ENABLED', True):
+            return False
+        return row['urgency'] in self.app.config.get('FANOUT_URGENCIES', ('Critical',))
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name='notification-fanout', daemon=True)
+                    self._thread.start()
+
+    def submit(self, row):
+        """Queue an emergency request (column dict) for fan-out"""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((row, time.perf_counter()))
+        except queue.Full:
+            self.app.logger.error('fan-out queue full, emergency request %s not notified', row['id'])
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                row, queued_at = item
+                with self.app.app_context():
+                    try:
+                        self.fan_out(row, queued_at)
+                    except Exception:
+                        db.session.rollback()
+                        self.app.logger.exception('fan-out for emergency request %s failed', row['id'])
+            finally:
+                self._queue.task_done()
+
+    def recipients(self, emergency):
+        """IDs of donors to notify about an emergency request (needs an app context)"""
+        query, _ = filter_by_text(db.session.query(Donor.id), city=emergency['city'])
+        query = query.filter(
+            Donor.blood_type.in_(donor_types_for(emergency['blood_type'])),
+            Donor.is_available == True,
+            age_eligible(),
+            eligible_now()
+        )
+        return [donor_id for donor_id, in query.execution_options(yield_per=10000)]
+
+    def fan_out(self, emergency, queued_at=None):
+        """Notify every matching donor; returns the number of notifications written"""
+        queued_at = queued_at or time.perf_counter()
+        donor_ids = self.recipients(emergency)
+        title = f"Critical: {emergency['blood_type']} blood needed"
+        message = (f"{emergency['units_needed']} unit(s) of {emergency['blood_type']} needed at "
+                   f"{emergency['hospital']}, {emergency['city']}.")
+        # notifications.user_id holds the donor's id, matching the donor_<id> room
+        self.manager.insert_notifications(
+            {'user_id': donor_id, 'title': title, 'message': message, 'notification_type': 'emergency'}
+            for donor_id in donor_ids
+        )
+        pushed = self._push(donor_ids, {
+            'recipient_type': 'donor',
+            'title': title,
+            'message': message,
+            'notification_type': 'emergency',
+            'emergency_id': emergency['id']
+        })
+        self.requests += 1
+        self.notified += len(donor_ids)
+        self.pushed += pushed
+        self.last_latency_ms = round((time.perf_counter() - queued_at) * 1000, 1)
+        return len(donor_ids)
+
+    def _push(self, donor_ids, payload):
+        """Emit to the rooms of donors that are connected; returns how many were online"""
+        if self.socketio is None or not donor_ids:
+            return 0
+        online = self.socketio.server.manager.rooms.get('/', {})
+        pushed = 0
+        for donor_id in donor_ids:
+            room = user_room('donor', donor_id)
+            if room in online:
+                self.socketio.emit(NOTIFICATION_EVENT, payload, to=room)
+                pushed += 1
+        return pushed
+
+    def join(self, timeout=None):
+        """Wait until everything queued so far has been fanned out"""
+        if self._queue is None:
+            return
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() > deadline:
+                return
+            time.sleep(0.01)
+
+    def shutdown(self, timeout=5):
+        """Stop the worker after the queued requests are handled"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+        self._thread = None
+
+    def stats(self):
+        return {
+            'requests': self.requests,
+            'notified': self.notified,
+            'pushed': self.pushed,
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'last_latency_ms': self.last_latency_ms
+        }
+
+
+# Global notification fan-out instance
+notification_fanout = NotificationFanout()
+
+
+@on_commit(EmergencyRequest)
+def _fan_out_critical_request(operation, row, previous):
+    if operation == 'insert' and notification_fanout.wants(row):
+        notification_fanout.submit(row)
@@ -2,6 +2,7 @@
 Forms for LifeLink Blood Bank Management System
 """
 
+from flask import current_app
 from flask_wtf import FlaskForm
 from wtforms import StringField, PasswordField, EmailField, IntegerField, SelectField, TextAreaField, BooleanField, DateField
 from wtforms.validators import DataRequired, Email, Length, NumberRange, Optional, EqualTo, ValidationError
@@ -107,11 +108,8 @@ class EmergencyRequestForm(FlaskForm):
         NumberRange(min=1, max=10, message='Units must be between 1 and 10')
     ])
     
-    urgency = SelectField('Urgency Level', choices=[
-        ('Critical', 'Critical - Immediate need'),
-        ('Urgent', 'Urgent - Within 2 hours'),
-        ('Normal', 'Normal - Within 24 hours')
-    ], validators=[DataRequired()])
+    # Choices come from URGENCY_LEVELS, the tiers priority_rank orders by
+    urgency = SelectField('Urgency Level', validators=[DataRequired()])
     
     hospital = StringField('Hospital/Medical Center', validators=[
         DataRequired(message='Hospital name is required'),
@@ -133,6 +131,10 @@ class EmergencyRequestForm(FlaskForm):
         Length(max=500, message='Additional information must be less than 500 characters')
     ])
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.urgency.choices = [(level, level) for level in current_app.config['URGENCY_LEVELS']]
+
 class DonorProfileForm(FlaskForm):
     """Donor profile update form"""
     full_name = StringField('Full Name', validators=[
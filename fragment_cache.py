@@ -0,0 +1,118 @@
+"""
+Template fragment cache for LifeLink Blood Bank Management System
+
+Large card grids are wrapped in a ``{% call cached(...) %}`` block:
+
+    {% call cached('emergency-cards', 'emergencies', vary=request.full_path) %}
+        ... expensive loop ...
+    {% endcall %}
+
+The rendered HTML is stored under the fragment name, the current version
+stamps of the listed resources (see versions.py) and any ``vary`` values.
+A write to a resource bumps its stamp, so the next render misses and the
+old entry simply ages out of the LRU. Entries also expire after
+``FRAGMENT_CACHE_TTL`` seconds, which bounds staleness when several
+processes share a database. The cache is bounded by the total size of
+the stored HTML (``FRAGMENT_CACHE_MAX_BYTES``).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from markupsafe import Markup
+from versions import versions
+
+
+class FragmentStats:
+    """Per-fragment hit/miss counts and render times"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.render_ms = 0.0
+
+    def as_dict(self):
+        average = self.render_ms / self.misses if self.misses else 0.0
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'avg_render_ms': round(average, 3),
+            # Every hit skipped one render of roughly the average cost
+            'saved_ms': round(average * self.hits, 1)
+        }
+
+
+class FragmentCache:
+    """Size-bounded LRU of rendered template fragments keyed by version stamps"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._stats = {}
+        self.enabled = True
+        self.max_bytes = 32 * 1024 * 1024
+        self.ttl = 60
+        self.evictions = 0
+
+    def init_app(self, app):
+        self.enabled = app.config.get('FRAGMENT_CACHE_ENABLED', True)
+        self.max_bytes = app.config.get('FRAGMENT_CACHE_MAX_BYTES', self.max_bytes)
+        self.ttl = app.config.get('FRAGMENT_CACHE_TTL', self.ttl)
+        app.jinja_env.globals['cached'] = self.cached
+
+    def key(self, name, resources, vary):
+        return (name, tuple((resource, versions.get(resource)) for resource in resources), vary)
+
+    def cached(self, name, *resources, vary=None, caller=None):
+        """Jinja ``{% call %}`` target: return the cached body or render and store it"""
+        if not self.enabled:
+            return caller()
+        key = self.key(name, resources, vary)
+        now = time.monotonic()
+        with self._lock:
+            stats = self._stats.setdefault(name, FragmentStats())
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(key)
+                stats.hits += 1
+                return entry[0]
+
+        start = time.perf_counter()
+        html = Markup(caller())
+        elapsed = (time.perf_counter() - start) * 1000
+        size = len(html)
+        with self._lock:
+            stats.misses += 1
+            stats.render_ms += elapsed
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[0])
+            if size <= self.max_bytes:
+                self._entries[key] = (html, now + self.ttl)
+                self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+        return html
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            fragments = {name: stats.as_dict() for name, stats in self._stats.items()}
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'evictions': self.evictions,
+                'saved_ms': round(sum(f['saved_ms'] for f in fragments.values()), 1),
+                'fragments': fragments
+            }
+
+
+# Global fragment cache instance
+fragment_cache = FragmentCache()
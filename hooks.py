@@ -0,0 +1,115 @@
+"""
+Model change hooks for LifeLink Blood Bank Management System
+
+In-process caches (match snapshots, counters, version stamps) register a
+callback per model here. Row changes are captured when the session flushes
+and handed to the callbacks only after the transaction commits, so a
+rolled-back write never leaks into a cache. Bulk loads bypass the ORM, so
+they call ``bulk_changed(model)`` afterwards and caches registered with
+``on_bulk_change`` rebuild from scratch.
+"""
+
+from collections import defaultdict
+from sqlalchemy import and_, event, inspect, select
+from sqlalchemy.orm import Session
+
+_callbacks = defaultdict(list)
+_bulk_callbacks = defaultdict(list)
+_PENDING_KEY = 'lifelink_pending_changes'
+_PREVIOUS_KEY = 'lifelink_previous_values'
+
+
+def _row(target):
+    """Snapshot the column values of a mapped instance as a plain dict"""
+    mapper = inspect(target).mapper
+    return {attr.key: getattr(target, attr.key) for attr in mapper.column_attrs}
+
+
+def _previous(connection, target):
+    """Old values of the columns changed in the current flush"""
+    state = inspect(target)
+    mapper = state.mapper
+    previous, unloaded = {}, []
+    for attr in mapper.column_attrs:
+        history = state.attrs[attr.key].history
+        if not history.has_changes():
+            continue
+        if history.deleted:
+            previous[attr.key] = history.deleted[0]
+        else:
+            unloaded.append(attr)
+    if unloaded:
+        # Assigning to an expired attribute does not load its old value, so
+        # read it from the row, which the flush has not updated yet
+        key = mapper.primary_key_from_instance(target)
+        stored = connection.execute(
+            select(*(attr.columns[0] for attr in unloaded))
+            .where(and_(*(column == value for column, value in zip(mapper.primary_key, key))))
+        ).first()
+        if stored is not None:
+            previous.update(zip((attr.key for attr in unloaded), stored))
+    return previous
+
+
+def _remember_previous(mapper, connection, target):
+    inspect(target).info[_PREVIOUS_KEY] = _previous(connection, target)
+
+
+def _record(operation):
+    def listener(mapper, connection, target):
+        session = Session.object_session(target)
+        if session is None:
+            return
+        row = _row(target)
+        previous = inspect(target).info.pop(_PREVIOUS_KEY, {}) if operation == 'update' else {}
+        session.info.setdefault(_PENDING_KEY, []).append(
+            (mapper.class_, operation, row, previous)
+        )
+    return listener
+
+
+def on_commit(model):
+    """Register ``fn(operation, row, previous)`` for committed writes to ``model``
+
+    ``operation`` is ``'insert'``, ``'update'`` or ``'delete'``; ``row`` holds
+    the column values after the write and ``previous`` the old values of any
+    columns the update changed.
+    """
+    def decorator(fn):
+        if model not in _callbacks:
+            event.listen(model, 'after_insert', _record('insert'))
+            event.listen(model, 'before_update', _remember_previous)
+            event.listen(model, 'after_update', _record('update'))
+            event.listen(model, 'after_delete', _record('delete'))
+        _callbacks[model].append(fn)
+        return fn
+    return decorator
+
+
+def on_bulk_change(model):
+    """Register ``fn()`` to run after rows of ``model`` are written in bulk"""
+    def decorator(fn):
+        _bulk_callbacks[model].append(fn)
+        return fn
+    return decorator
+
+
+def bulk_changed(model):
+    """Tell registered caches that ``model`` changed outside the ORM"""
+    for fn in _bulk_callbacks.get(model, ()):
+        fn()
+
+
+@event.listens_for(Session, 'after_commit')
+def _dispatch(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    for model, operation, row, previous in pending:
+        for fn in _callbacks.get(model, ()):
+            fn(operation, row, previous)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,237 @@
+"""
+Bulk ingestion for LifeLink Blood Bank Management System
+
+Partner rosters are written a chunk at a time: every row in the chunk is
+validated, the valid ones go to the database with a single ``executemany``
+in one transaction, and invalid rows are reported with their position in
+the input. If the batch hits a constraint (e.g. a duplicate email) the
+chunk is retried row by row inside savepoints so only the offending rows
+are rejected. Account index rows are added in the same transaction, so an
+email already registered as the other user type is rejected too.
+
+Imported accounts get an unusable password (``IMPORTED_PASSWORD``) unless
+the caller passes a hash; the owner sets a real one through the password
+reset flow.
+"""
+
+from collections import namedtuple
+from contextlib import contextmanager, nullcontext
+from sqlalchemy import func, inspect, text
+from sqlalchemy.exc import IntegrityError
+from models import db, Donor, Patient
+from compatibility import BLOOD_TYPES
+from donor_search import create_fts_index
+from hooks import bulk_changed
+from accounts import index_users
+
+IMPORTED_PASSWORD = '!'  # never matches a password hash
+
+RowError = namedtuple('RowError', ['row', 'message'])
+
+
+class BulkResult:
+    """Running totals for a bulk load"""
+
+    def __init__(self):
+        self.inserted = 0
+        self.errors = []
+
+    def add(self, inserted, errors):
+        self.inserted += inserted
+        self.errors.extend(errors)
+
+
+def _text(raw, field, required=True, max_length=None):
+    value = raw.get(field)
+    value = str(value).strip() if value is not None else ''
+    if not value:
+        if required:
+            raise ValueError(f'{field} is required')
+        return None
+    if max_length and len(value) > max_length:
+        raise ValueError(f'{field} is longer than {max_length} characters')
+    return value
+
+
+def _number(raw, field, kind, required=True):
+    value = raw.get(field)
+    if value is None or str(value).strip() == '':
+        if required:
+            raise ValueError(f'{field} is required')
+        return None
+    try:
+        return kind(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{field} must be a number')
+
+
+def _flag(raw, field, default=True):
+    value = raw.get(field)
+    if value is None or str(value).strip() == '':
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'y', 'on')
+
+
+def _person(raw, address_required):
+    blood_type = _text(raw, 'blood_type').upper()
+    if blood_type not in BLOOD_TYPES:
+        raise ValueError(f'unknown blood type {blood_type!r}')
+    email = _text(raw, 'email', max_length=120).lower()
+    if '@' not in email:
+        raise ValueError('email is not valid')
+    return {
+        'name': _text(raw, 'name', max_length=120),
+        'email': email,
+        'phone': _text(raw, 'phone', max_length=30),
+        'age': _number(raw, 'age', int),
+        'blood_type': blood_type,
+        'address': _text(raw, 'address', required=address_required, max_length=255),
+        'medical_conditions': _text(raw, 'medical_conditions', required=False),
+        'emergency_contact': _text(raw, 'emergency_contact', required=False, max_length=255),
+    }
+
+
+def clean_donor(raw):
+    """Validate a raw donor record and return the column values to insert"""
+    row = _person(raw, address_required=False)
+    row['latitude'] = _number(raw, 'latitude', float, required=False)
+    row['longitude'] = _number(raw, 'longitude', float, required=False)
+    row['is_available'] = _flag(raw, 'is_available')
+    return row
+
+
+def clean_patient(raw):
+    """Validate a raw patient record and return the column values to insert"""
+    return _person(raw, address_required=True)
+
+
+CLEANERS = {Donor: clean_donor, Patient: clean_patient}
+COLUMNS = {
+    Donor: ('name', 'email', 'phone', 'age', 'password', 'blood_type', 'address', 'medical_conditions',
+            'emergency_contact', 'latitude', 'longitude', 'is_available'),
+    Patient: ('name', 'email', 'phone', 'age', 'password', 'blood_type', 'address', 'medical_conditions',
+              'emergency_contact'),
+}
+
+
+def _insert_sql(model, dialect):
+    """Plain positional INSERT for ``model``, executed straight on the DBAPI cursor"""
+    quote = dialect.identifier_preparer.quote
+    marker = '?' if dialect.paramstyle == 'qmark' else '%s'
+    columns = COLUMNS[model]
+    return (f'INSERT INTO {quote(model.__table__.name)} ({", ".join(quote(c) for c in columns)}) '
+            f'VALUES ({", ".join([marker] * len(columns))})')
+
+
+def bulk_insert(model, records, start=1, password=IMPORTED_PASSWORD):
+    """Insert one chunk of raw records into ``model``'s table
+
+    ``start`` is the input position of the first record, used in error
+    reports; ``password`` is the hash stored for every row. Returns
+    ``(inserted, errors)`` where ``errors`` is a list of ``RowError``.
+    Commits before returning.
+    """
+    clean, columns = CLEANERS[model], COLUMNS[model]
+    rows, positions, errors = [], [], []
+    for position, raw in enumerate(records, start):
+        try:
+            row = clean(raw)
+        except ValueError as e:
+            errors.append(RowError(position, str(e)))
+            continue
+        row['password'] = password
+        rows.append(tuple(row[c] for c in columns))
+        positions.append(position)
+    if not rows:
+        return 0, errors
+
+    # Bypass per-row parameter processing: the rows are already clean tuples
+    insert = _insert_sql(model, db.engine.dialect)
+    id_column, email_column = model.__table__.c.id, model.__table__.c.email
+    try:
+        last_id = db.session.query(func.max(model.id)).scalar() or 0
+        connection = db.session.connection()
+        connection.exec_driver_sql(insert, rows)
+        index_users(connection, model, id_column > last_id)
+        db.session.commit()
+        return len(rows), errors
+    except IntegrityError:
+        db.session.rollback()
+
+    # Something in the batch violated a constraint: retry row by row
+    inserted = 0
+    email_index = columns.index('email')
+    for position, row in zip(positions, rows):
+        savepoint = db.session.begin_nested()
+        try:
+            connection = db.session.connection()
+            connection.exec_driver_sql(insert, row)
+            index_users(connection, model, email_column == row[email_index])
+            savepoint.commit()
+            inserted += 1
+        except IntegrityError as e:
+            savepoint.rollback()
+            errors.append(RowError(position, str(e.orig)))
+    db.session.commit()
+    errors.sort()
+    return inserted, errors
+
+
+@contextmanager
+def deferred_indexes(model):
+    """Drop ``model``'s secondary indexes for the duration of a bulk load
+
+    Non-unique indexes (and, on SQLite, the donor full-text triggers) are
+    rebuilt once at the end instead of being maintained row by row. Unique
+    indexes stay in place because they enforce constraints.
+    """
+    table = model.__table__
+    engine = db.engine
+    quote = engine.dialect.identifier_preparer.quote
+    indexes = [
+        index for index in inspect(engine).get_indexes(table.name)
+        if not index.get('unique') and None not in index['column_names']
+    ]
+    fts = model is Donor and engine.dialect.name == 'sqlite' and db.session.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'donor_fts'"
+    )).first() is not None
+    db.session.commit()
+
+    with engine.begin() as conn:
+        for index in indexes:
+            conn.execute(text(f'DROP INDEX {quote(index["name"])}'))
+        if fts:
+            conn.execute(text('DROP TRIGGER IF EXISTS donor_fts_ai'))
+    try:
+        yield
+    finally:
+        db.session.commit()
+        with engine.begin() as conn:
+            for index in indexes:
+                columns = ', '.join(quote(name) for name in index['column_names'])
+                conn.execute(text(f'CREATE INDEX {quote(index["name"])} ON {quote(table.name)} ({columns})'))
+            if fts:
+                create_fts_index(conn)
+
+
+def ingest(model, chunks, defer=False, on_chunk=None, password=IMPORTED_PASSWORD):
+    """Load an iterable of record chunks into ``model``; returns a BulkResult
+
+    ``on_chunk(result)`` is called after each chunk commits, e.g. to report
+    progress.
+    """
+    result = BulkResult()
+    position = 1
+    manager = deferred_indexes(model) if defer else nullcontext()
+    try:
+        with manager:
+            for chunk in chunks:
+                result.add(*bulk_insert(model, chunk, start=position, password=password))
+                position += len(chunk)
+                if on_chunk:
+                    on_chunk(result)
+    finally:
+        bulk_changed(model)
+    return result
@@ -0,0 +1,164 @@
+"""
+Donor matching engine for LifeLink Blood Bank Management System
+
+Keeps a column-oriented numpy snapshot of every donor (id, blood type,
+coordinates, availability, next eligible date) so that ranking donors for
+an emergency request is a handful of vectorized array operations instead
+of a Python loop over ORM objects.
+
+Writes in this process mark the snapshot dirty. Writes made by other
+workers or CLI commands are never seen by those hooks, so the snapshot is
+also rebuilt once it is older than ``MATCH_SNAPSHOT_MAX_AGE`` seconds.
+"""
+
+import threading
+import time
+from datetime import datetime
+import numpy as np
+from flask import current_app
+from models import db, Donor, NEVER_DONATED
+from hooks import on_commit, on_bulk_change
+from compatibility import BLOOD_TYPES, BLOOD_TYPE_BITS, RECEIVES_FROM
+
+EARTH_RADIUS_KM = 6371
+
+
+def haversine_km(lat, lon, lats, lons):
+    """Vectorized Haversine distance from one point to arrays of points"""
+    lat1 = np.radians(lat)
+    lat2 = np.radians(lats)
+    dlat = lat2 - lat1
+    dlon = np.radians(lons) - np.radians(lon)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class DonorSnapshot:
+    """Immutable array view of the donor table"""
+
+    def __init__(self, ids, codes, lats, lons, available, eligible_from):
+        self.ids = ids
+        self.codes = codes
+        self.lats = lats
+        self.lons = lons
+        self.available = available
+        self.eligible_from = eligible_from  # next_eligible_date as seconds since NEVER_DONATED
+        self.built_at = time.monotonic()
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class DonorMatcher:
+    """Ranks donors for a recipient blood type using a cached donor snapshot"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._dirty = True
+
+    def invalidate(self):
+        """Mark the snapshot stale; it is rebuilt on the next match"""
+        self._dirty = True
+
+    def _stale(self, snapshot):
+        if snapshot is None:
+            return True
+        config = current_app.config
+        age = time.monotonic() - snapshot.built_at
+        return (age >= config.get('MATCH_SNAPSHOT_MAX_AGE', 300)
+                or (self._dirty and age >= config.get('MATCH_SNAPSHOT_REFRESH_SECONDS', 30)))
+
+    def snapshot(self):
+        """Return the current snapshot, rebuilding it if stale"""
+        snapshot = self._snapshot
+        if not self._stale(snapshot):
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if self._stale(snapshot):
+                self._dirty = False
+                snapshot = self._snapshot = self._build()
+        return snapshot
+
+    def _build(self):
+        type_codes = {bt: code for code, bt in enumerate(BLOOD_TYPES)}
+        rows = db.session.query(
+            Donor.id, Donor.blood_type, Donor.latitude, Donor.longitude, Donor.is_available,
+            Donor.next_eligible_date
+        ).all()
+        count = len(rows)
+        return DonorSnapshot(
+            np.fromiter((r[0] for r in rows), dtype=np.int64, count=count),
+            np.fromiter((type_codes.get(r[1], -1) for r in rows), dtype=np.int8, count=count),
+            np.fromiter((np.nan if r[2] is None else r[2] for r in rows), dtype=np.float64, count=count),
+            np.fromiter((np.nan if r[3] is None else r[3] for r in rows), dtype=np.float64, count=count),
+            np.fromiter((bool(r[4]) for r in rows), dtype=bool, count=count),
+            np.fromiter(((r[5] - NEVER_DONATED).total_seconds() for r in rows), dtype=np.float64, count=count),
+        )
+
+    def rank(self, blood_type, lat=None, lon=None, k=50, include_unavailable=False):
+        """Return up to ``k`` ``(donor_id, distance_km, exact_match)`` tuples, best first
+
+        Donors are ordered by a score in kilometres: the distance to the
+        request, plus a penalty for compatible-but-different blood types (to
+        spare universal donors) and for unknown locations. Unavailable donors
+        and donors still inside their donation interval are excluded unless
+        ``include_unavailable`` is set, in which case they rank after every
+        available, eligible donor.
+        """
+        config = current_app.config
+        if blood_type not in BLOOD_TYPE_BITS:
+            return []
+        snapshot = self.snapshot()
+
+        # Lookup table indexed by blood type code; the trailing False entry
+        # is hit by code -1 (unknown blood type).
+        accepts = RECEIVES_FROM[blood_type]
+        compatible = np.array([bool(accepts & BLOOD_TYPE_BITS[bt]) for bt in BLOOD_TYPES] + [False])
+        mask = compatible[snapshot.codes]
+        ready = snapshot.available & (snapshot.eligible_from <= (datetime.utcnow() - NEVER_DONATED).total_seconds())
+        if not include_unavailable:
+            mask &= ready
+        candidates = np.flatnonzero(mask)
+        if candidates.size == 0 or k <= 0:
+            return []
+
+        if lat is not None and lon is not None:
+            distance = haversine_km(lat, lon, snapshot.lats[candidates], snapshot.lons[candidates])
+        else:
+            distance = np.full(candidates.size, np.nan)
+        exact = snapshot.codes[candidates] == BLOOD_TYPES.index(blood_type)
+
+        score = np.where(np.isnan(distance), config.get('MATCH_UNKNOWN_DISTANCE_KM', 10000.0), distance)
+        score = score + np.where(exact, 0.0, config.get('MATCH_TYPE_PENALTY_KM', 10.0))
+        if include_unavailable:
+            score = score + np.where(ready[candidates], 0.0, 1e9)
+
+        if k < candidates.size:
+            top = np.argpartition(score, k - 1)[:k]
+        else:
+            top = np.arange(candidates.size)
+        ids = snapshot.ids[candidates[top]]
+        order = top[np.lexsort((ids, score[top]))]
+
+        return [
+            (int(snapshot.ids[candidates[i]]),
+             None if np.isnan(distance[i]) else round(float(distance[i]), 2),
+             bool(exact[i]))
+            for i in order
+        ]
+
+
+# Global matcher instance
+donor_matcher = DonorMatcher()
+
+
+@on_commit(Donor)
+def _invalidate_on_donor_change(operation, row, previous):
+    donor_matcher.invalidate()
+
+
+@on_bulk_change(Donor)
+def _invalidate_on_bulk_load():
+    donor_matcher.invalidate()
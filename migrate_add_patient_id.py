@@ -17,7 +17,7 @@ def migrate():
                 
                 if 'patient_id' not in columns:
                     print("Adding patient_id column to emergency_request table...")
-                    conn.execute(text("ALTER TABLE emergency_request ADD COLUMN patient_id INTEGER"))
+                    conn.execute(text("ALTER TABLE emergency_request ADD COLUMN patient_id INTEGER REFERENCES patient(id)"))
                     conn.commit()
                     print("✅ Migration completed successfully!")
                 else:
@@ -0,0 +1,53 @@
+"""Add FTS5 index over donor name and address
+
+Revision ID: 3f6a2c1d9b7e
+Revises: deba53b47464
+Create Date: 2026-10-17 09:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f6a2c1d9b7e'
+down_revision = 'deba53b47464'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # FTS5 is SQLite-only; other backends keep using ILIKE in donor_search.py
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("""
+        CREATE VIRTUAL TABLE donor_fts USING fts5(
+            name, address, content='donor', content_rowid='id', prefix='1 2 3'
+        )
+    """)
+    op.execute("""
+        CREATE TRIGGER donor_fts_ai AFTER INSERT ON donor BEGIN
+            INSERT INTO donor_fts(rowid, name, address) VALUES (new.id, new.name, new.address);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER donor_fts_ad AFTER DELETE ON donor BEGIN
+            INSERT INTO donor_fts(donor_fts, rowid, name, address) VALUES ('delete', old.id, old.name, old.address);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER donor_fts_au AFTER UPDATE OF name, address ON donor BEGIN
+            INSERT INTO donor_fts(donor_fts, rowid, name, address) VALUES ('delete', old.id, old.name, old.address);
+            INSERT INTO donor_fts(rowid, name, address) VALUES (new.id, new.name, new.address);
+        END
+    """)
+    op.execute("INSERT INTO donor_fts(donor_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute('DROP TRIGGER IF EXISTS donor_fts_au')
+    op.execute('DROP TRIGGER IF EXISTS donor_fts_ad')
+    op.execute('DROP TRIGGER IF EXISTS donor_fts_ai')
+    op.execute('DROP TABLE IF EXISTS donor_fts')
@@ -0,0 +1,37 @@
+"""Add emergency_demand_rollup table
+
+Revision ID: 5c1d8e2f4a90
+Revises: 8b2e4f7a1c03
+Create Date: 2026-10-17 14:21:40.118302
+
+Existing requests are not counted here; run ``flask rollups backfill``
+once after upgrading.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c1d8e2f4a90'
+down_revision = '8b2e4f7a1c03'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('emergency_demand_rollup',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('grain', sa.String(length=8), nullable=False),
+    sa.Column('bucket', sa.DateTime(), nullable=False),
+    sa.Column('blood_type', sa.String(length=5), nullable=False),
+    sa.Column('city', sa.String(length=120), nullable=False),
+    sa.Column('urgency', sa.String(length=20), nullable=False),
+    sa.Column('requests', sa.Integer(), nullable=False),
+    sa.Column('units', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('grain', 'bucket', 'blood_type', 'city', 'urgency', name='uq_emergency_demand_rollup_key')
+    )
+
+
+def downgrade():
+    op.drop_table('emergency_demand_rollup')
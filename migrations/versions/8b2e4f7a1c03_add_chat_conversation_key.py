@@ -0,0 +1,61 @@
+"""Add conversation_key and (conversation_key, id) index to chat_message
+
+Revision ID: 8b2e4f7a1c03
+Revises: 3f6a2c1d9b7e
+Create Date: 2026-10-17 10:03:11.562930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b2e4f7a1c03'
+down_revision = '3f6a2c1d9b7e'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+
+def conversation_key(user1, type1, user2, type2):
+    # Same rule as ChatMessage.make_conversation_key
+    first, second = sorted([f'{type1}:{user1}', f'{type2}:{user2}'])
+    return f'{first}|{second}'
+
+
+def upgrade():
+    op.add_column('chat_message', sa.Column('conversation_key', sa.String(length=64), nullable=True))
+
+    # Backfill existing messages in id order, one batch at a time
+    bind = op.get_bind()
+    chat_message = sa.table(
+        'chat_message',
+        sa.column('id', sa.Integer), sa.column('sender_id', sa.Integer),
+        sa.column('sender_type', sa.String), sa.column('receiver_id', sa.Integer),
+        sa.column('receiver_type', sa.String), sa.column('conversation_key', sa.String),
+    )
+    update = chat_message.update().where(chat_message.c.id == sa.bindparam('_id')) \
+        .values(conversation_key=sa.bindparam('_key'))
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(chat_message.c.id, chat_message.c.sender_id, chat_message.c.sender_type,
+                      chat_message.c.receiver_id, chat_message.c.receiver_type)
+            .where(chat_message.c.id > last_id).order_by(chat_message.c.id).limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        bind.execute(update, [
+            {'_id': row.id, '_key': conversation_key(row.sender_id, row.sender_type, row.receiver_id, row.receiver_type)}
+            for row in rows
+        ])
+        last_id = rows[-1].id
+
+    op.create_index('ix_chat_message_conversation_key_id', 'chat_message', ['conversation_key', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_chat_message_conversation_key_id', table_name='chat_message')
+    with op.batch_alter_table('chat_message') as batch_op:
+        batch_op.drop_column('conversation_key')
@@ -0,0 +1,45 @@
+"""Add account table indexing donor and patient logins by email
+
+Revision ID: 9e4b7c3a2d15
+Revises: 5c1d8e2f4a90
+Create Date: 2026-10-17 15:02:18.447120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e4b7c3a2d15'
+down_revision = '5c1d8e2f4a90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('account',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(length=120), nullable=False),
+    sa.Column('user_type', sa.String(length=20), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('password', sa.String(length=255), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('email'),
+    sa.UniqueConstraint('user_type', 'user_id', name='uq_account_user')
+    )
+
+    # Backfill donors first: login used to check the donor table before the
+    # patient table, so a patient reusing a donor's email stays unreachable.
+    op.execute(
+        "INSERT INTO account (email, user_type, user_id, password) "
+        "SELECT email, 'donor', id, password FROM donor"
+    )
+    op.execute(
+        "INSERT INTO account (email, user_type, user_id, password) "
+        "SELECT email, 'patient', id, password FROM patient "
+        "WHERE email NOT IN (SELECT email FROM account)"
+    )
+
+
+def downgrade():
+    op.drop_table('account')
@@ -0,0 +1,31 @@
+"""Add last_donation_date and indexed next_eligible_date to donor
+
+Revision ID: b7f2d9e4c6a1
+Revises: 9e4b7c3a2d15
+Create Date: 2026-10-17 15:47:05.902214
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7f2d9e4c6a1'
+down_revision = '9e4b7c3a2d15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('donor', sa.Column('last_donation_date', sa.DateTime(), nullable=True))
+    # Existing donors have no recorded donations, so they are all eligible now
+    op.add_column('donor', sa.Column('next_eligible_date', sa.DateTime(), nullable=False,
+                                     server_default='1970-01-01 00:00:00'))
+    op.create_index('ix_donor_next_eligible_date', 'donor', ['next_eligible_date'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_donor_next_eligible_date', table_name='donor')
+    with op.batch_alter_table('donor') as batch_op:
+        batch_op.drop_column('next_eligible_date')
+        batch_op.drop_column('last_donation_date')
@@ -0,0 +1,69 @@
+"""Add priority_rank/priority_at and the priority index to emergency_request
+
+Revision ID: c3a8e5f1b2d7
+Revises: b7f2d9e4c6a1
+Create Date: 2026-10-17 16:30:52.377415
+
+"""
+from datetime import datetime, timedelta
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3a8e5f1b2d7'
+down_revision = 'b7f2d9e4c6a1'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+# Same rule and defaults as priority.priority_key
+URGENCY_LEVELS = ('Critical', 'High', 'Moderate', 'Low')
+UNIT_SECONDS = 3600
+
+
+def priority_key(urgency, units_needed, created_at):
+    rank = URGENCY_LEVELS.index(urgency) if urgency in URGENCY_LEVELS else len(URGENCY_LEVELS)
+    return rank, created_at - timedelta(seconds=(units_needed or 0) * UNIT_SECONDS)
+
+
+def upgrade():
+    op.add_column('emergency_request', sa.Column('priority_rank', sa.SmallInteger(), nullable=True))
+    op.add_column('emergency_request', sa.Column('priority_at', sa.DateTime(), nullable=True))
+
+    bind = op.get_bind()
+    emergency_request = sa.table(
+        'emergency_request',
+        sa.column('id', sa.Integer), sa.column('urgency', sa.String),
+        sa.column('units_needed', sa.Integer), sa.column('created_at', sa.DateTime),
+        sa.column('priority_rank', sa.SmallInteger), sa.column('priority_at', sa.DateTime),
+    )
+    update = emergency_request.update().where(emergency_request.c.id == sa.bindparam('_id')) \
+        .values(created_at=sa.bindparam('_created'), priority_rank=sa.bindparam('_rank'),
+                priority_at=sa.bindparam('_at'))
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(emergency_request.c.id, emergency_request.c.urgency,
+                      emergency_request.c.units_needed, emergency_request.c.created_at)
+            .where(emergency_request.c.id > last_id).order_by(emergency_request.c.id).limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        params = []
+        for row in rows:
+            created_at = row.created_at or datetime.utcnow()
+            rank, at = priority_key(row.urgency, row.units_needed, created_at)
+            params.append({'_id': row.id, '_created': created_at, '_rank': rank, '_at': at})
+        bind.execute(update, params)
+        last_id = rows[-1].id
+
+    op.create_index('ix_emergency_request_priority', 'emergency_request',
+                    ['priority_rank', 'priority_at', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_emergency_request_priority', table_name='emergency_request')
+    with op.batch_alter_table('emergency_request') as batch_op:
+        batch_op.drop_column('priority_at')
+        batch_op.drop_column('priority_rank')
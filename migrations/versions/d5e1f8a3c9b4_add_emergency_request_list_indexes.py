@@ -0,0 +1,43 @@
+"""Add emergency_request indexes for the filtered, paginated views
+
+Revision ID: d5e1f8a3c9b4
+Revises: c3a8e5f1b2d7
+Create Date: 2026-10-17 17:12:36.840551
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5e1f8a3c9b4'
+down_revision = 'c3a8e5f1b2d7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # patient_id was added outside Alembic (migrate_add_patient_id.py, without
+    # a foreign key), so databases built only from these migrations may not
+    # have it yet; either way it ends up referencing patient.id like the model
+    inspector = sa.inspect(op.get_bind())
+    columns = {column['name'] for column in inspector.get_columns('emergency_request')}
+    foreign_keys = [fk['constrained_columns'] for fk in inspector.get_foreign_keys('emergency_request')]
+    with op.batch_alter_table('emergency_request') as batch_op:
+        if 'patient_id' not in columns:
+            batch_op.add_column(sa.Column('patient_id', sa.Integer(), nullable=True))
+        if ['patient_id'] not in foreign_keys:
+            batch_op.create_foreign_key('fk_emergency_request_patient_id', 'patient', ['patient_id'], ['id'])
+
+    op.create_index('ix_emergency_request_patient_id_created_at', 'emergency_request',
+                    ['patient_id', 'created_at'], unique=False)
+    op.create_index('ix_emergency_request_created_at', 'emergency_request', ['created_at'], unique=False)
+    op.create_index('ix_emergency_request_blood_type_city', 'emergency_request',
+                    ['blood_type', 'city'], unique=False)
+
+
+def downgrade():
+    # patient_id is left in place: older code paths depend on it
+    op.drop_index('ix_emergency_request_blood_type_city', table_name='emergency_request')
+    op.drop_index('ix_emergency_request_created_at', table_name='emergency_request')
+    op.drop_index('ix_emergency_request_patient_id_created_at', table_name='emergency_request')
@@ -0,0 +1,48 @@
+"""Store emergency_request.city in its normalized spelling
+
+Revision ID: e7c2a4b9d1f6
+Revises: d5e1f8a3c9b4
+Create Date: 2026-10-17 18:05:14.227903
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7c2a4b9d1f6'
+down_revision = 'd5e1f8a3c9b4'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+
+# Same rule as emergency_search.normalize_city
+def normalize_city(city):
+    return (city or '').strip().title()
+
+
+def upgrade():
+    bind = op.get_bind()
+    emergency_request = sa.table('emergency_request', sa.column('id', sa.Integer), sa.column('city', sa.String))
+    update = emergency_request.update().where(emergency_request.c.id == sa.bindparam('_id')) \
+        .values(city=sa.bindparam('_city'))
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(emergency_request.c.id, emergency_request.c.city)
+            .where(emergency_request.c.id > last_id).order_by(emergency_request.c.id).limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        params = [{'_id': row.id, '_city': normalize_city(row.city)}
+                  for row in rows if row.city != normalize_city(row.city)]
+        if params:
+            bind.execute(update, params)
+        last_id = rows[-1].id
+
+
+def downgrade():
+    # The original spellings are not kept; normalized cities stay valid
+    pass
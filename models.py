@@ -7,6 +7,10 @@ from datetime import datetime
 
 db = SQLAlchemy()
 
+# next_eligible_date of donors who never donated: always in the past, so
+# "eligible now" is a plain range over the index with no NULL case
+NEVER_DONATED = datetime(1970, 1, 1)
+
 class Donor(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(120), nullable=False)
@@ -21,6 +25,9 @@ class Donor(db.Model):
     medical_conditions = db.Column(db.Text, nullable=True)
     emergency_contact = db.Column(db.String(255), nullable=True)
     is_available = db.Column(db.Boolean, nullable=False, default=True)
+    last_donation_date = db.Column(db.DateTime, nullable=True)
+    next_eligible_date = db.Column(db.DateTime, nullable=False, default=NEVER_DONATED,
+                                   server_default='1970-01-01 00:00:00', index=True)  # see eligibility.py
 
 class Patient(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -34,7 +41,26 @@ class Patient(db.Model):
     medical_conditions = db.Column(db.Text, nullable=True)
     emergency_contact = db.Column(db.String(255), nullable=True)
 
+class Account(db.Model):
+    """Login index: one row per donor or patient email (see accounts.py)"""
+    __table_args__ = (
+        db.UniqueConstraint('user_type', 'user_id', name='uq_account_user'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    email = db.Column(db.String(120), unique=True, nullable=False)
+    user_type = db.Column(db.String(20), nullable=False)  # 'donor' or 'patient'
+    user_id = db.Column(db.Integer, nullable=False)
+    password = db.Column(db.String(255), nullable=False)
+
 class EmergencyRequest(db.Model):
+    __table_args__ = (
+        db.Index('ix_emergency_request_priority', 'priority_rank', 'priority_at', 'id'),
+        db.Index('ix_emergency_request_patient_id_created_at', 'patient_id', 'created_at'),
+        db.Index('ix_emergency_request_created_at', 'created_at'),
+        db.Index('ix_emergency_request_blood_type_city', 'blood_type', 'city'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     patient_id = db.Column(db.Integer, db.ForeignKey('patient.id'), nullable=True)  # Link to patient who created it
     patient_name = db.Column(db.String(120), nullable=False)
@@ -45,8 +71,30 @@ class EmergencyRequest(db.Model):
     contact = db.Column(db.String(120), nullable=False)
     city = db.Column(db.String(120), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow) 
+    priority_rank = db.Column(db.SmallInteger, nullable=True)  # set on every write, see priority.py
+    priority_at = db.Column(db.DateTime, nullable=True)
+
+class EmergencyDemandRollup(db.Model):
+    """Emergency request counts per time bucket, blood type, city and urgency (see rollups.py)"""
+    __table_args__ = (
+        db.UniqueConstraint('grain', 'bucket', 'blood_type', 'city', 'urgency',
+                            name='uq_emergency_demand_rollup_key'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    grain = db.Column(db.String(8), nullable=False)  # 'hour', 'day' or 'month'
+    bucket = db.Column(db.DateTime, nullable=False)  # start of the bucket (UTC)
+    blood_type = db.Column(db.String(5), nullable=False)
+    city = db.Column(db.String(120), nullable=False)
+    urgency = db.Column(db.String(20), nullable=False)
+    requests = db.Column(db.Integer, nullable=False, default=0)
+    units = db.Column(db.Integer, nullable=False, default=0)
 
 class ChatMessage(db.Model):
+    __table_args__ = (
+        db.Index('ix_chat_message_conversation_key_id', 'conversation_key', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     sender_id = db.Column(db.Integer, nullable=False)
     sender_type = db.Column(db.String(20), nullable=False)  # 'donor' or 'patient'
@@ -54,6 +102,19 @@ class ChatMessage(db.Model):
     receiver_type = db.Column(db.String(20), nullable=False)  # 'donor' or 'patient'
     message = db.Column(db.Text, nullable=False)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow) 
+    conversation_key = db.Column(db.String(64), nullable=True)  # same for both directions of a chat
+
+    @staticmethod
+    def make_conversation_key(user1, type1, user2, type2):
+        """Canonical key for the conversation between two users, independent of direction"""
+        first, second = sorted([f'{type1}:{user1}', f'{type2}:{user2}'])
+        return f'{first}|{second}'
+
+@db.event.listens_for(ChatMessage, 'before_insert')
+def set_conversation_key(mapper, connection, target):
+    target.conversation_key = ChatMessage.make_conversation_key(
+        target.sender_id, target.sender_type, target.receiver_id, target.receiver_type
+    )
 
 class Feedback(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -0,0 +1,49 @@
+"""
+Emergency request priority for LifeLink Blood Bank Management System
+
+Requests are served by urgency tier first (``URGENCY_LEVELS`` order), then
+by how long they have waited, where every unit still needed counts as
+``EMERGENCY_PRIORITY_UNIT_SECONDS`` of extra waiting. All requests age at
+the same rate, so this order never changes with time and can be stored
+once per write: ``priority_rank`` (the tier) and ``priority_at`` (creation
+time moved back by the unit bonus), indexed together with the id. The top
+N requests are the first N entries of ``ix_emergency_request_priority``,
+so inserts and top-N reads cost O(log n) however large the table grows.
+"""
+
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import event
+from models import EmergencyRequest
+
+PRIORITY_ORDER = (EmergencyRequest.priority_rank, EmergencyRequest.priority_at, EmergencyRequest.id)
+
+
+def priority_key(urgency, units_needed, created_at):
+    """``(priority_rank, priority_at)`` for a request; smaller sorts first"""
+    config = current_app.config
+    levels = config.get('URGENCY_LEVELS', ())
+    rank = levels.index(urgency) if urgency in levels else len(levels)
+    bonus = timedelta(seconds=(units_needed or 0) * config.get('EMERGENCY_PRIORITY_UNIT_SECONDS', 3600))
+    return rank, created_at - bonus
+
+
+def by_priority(query=None):
+    """Order a request query most urgent first"""
+    return (query if query is not None else EmergencyRequest.query).order_by(*PRIORITY_ORDER)
+
+
+def top_requests(limit, blood_types=None):
+    """The ``limit`` most urgent requests, optionally for some blood types only"""
+    query = EmergencyRequest.query
+    if blood_types is not None:
+        query = query.filter(EmergencyRequest.blood_type.in_(blood_types))
+    return by_priority(query).limit(limit).all()
+
+
+@event.listens_for(EmergencyRequest, 'before_insert')
+@event.listens_for(EmergencyRequest, 'before_update')
+def _set_priority(mapper, connection, target):
+    if target.created_at is None:
+        target.created_at = datetime.utcnow()
+    target.priority_rank, target.priority_at = priority_key(target.urgency, target.units_needed, target.created_at)
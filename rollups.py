@@ -0,0 +1,173 @@
+"""
+Emergency demand rollups for LifeLink Blood Bank Management System
+
+Request volume is kept pre-aggregated in ``emergency_demand_rollup``: one
+row per hour, day and month bucket, blood type, city and urgency. Every
+EmergencyRequest insert upserts its three buckets on the flush connection,
+so the counts commit or roll back together with the request. An ORM update
+that changes a counted column moves the request from its old buckets to
+its new ones, and an ORM delete takes it out. Writes that bypass the ORM
+(bulk ``UPDATE``/``DELETE`` statements) are not tracked; run ``flask
+rollups backfill`` after them. Trend queries read only these rows.
+"""
+
+from collections import Counter
+from datetime import datetime, timedelta
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db, EmergencyRequest, EmergencyDemandRollup
+from emergency_search import normalize_city
+
+GRAINS = ('hour', 'day', 'month')
+DIMENSIONS = ('blood_type', 'city', 'urgency')
+BACKFILL_BATCH_SIZE = 10000
+COUNTED = ('blood_type', 'city', 'urgency', 'units_needed', 'created_at')
+
+
+def bucket_start(value, grain):
+    """Start of the ``grain`` bucket containing ``value``"""
+    if grain == 'hour':
+        return value.replace(minute=0, second=0, microsecond=0)
+    if grain == 'day':
+        return value.replace(hour=0, minute=0, second=0, microsecond=0)
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def shift_buckets(bucket, grain, count):
+    """Move a bucket start ``count`` buckets forward (negative for back)"""
+    if grain == 'hour':
+        return bucket + timedelta(hours=count)
+    if grain == 'day':
+        return bucket + timedelta(days=count)
+    months = bucket.year * 12 + bucket.month - 1 + count
+    return bucket.replace(year=months // 12, month=months % 12 + 1)
+
+
+def rollup_keys(blood_type, city, urgency, created_at):
+    """Rollup keys (grain, bucket, blood type, city, urgency) a request counts towards"""
+    created_at = created_at or datetime.utcnow()
+    city = normalize_city(city) or 'Unknown'
+    return [(grain, bucket_start(created_at, grain), blood_type, city, urgency) for grain in GRAINS]
+
+
+def _upsert(connection, counts):
+    """Add ``{key: (requests, units)}`` to the rollup rows, creating missing ones"""
+    dialect_insert = postgresql.insert if connection.dialect.name == 'postgresql' else sqlite.insert
+    table = EmergencyDemandRollup.__table__
+    stmt = dialect_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['grain', 'bucket', 'blood_type', 'city', 'urgency'],
+        set_={'requests': table.c.requests + stmt.excluded.requests,
+              'units': table.c.units + stmt.excluded.units}
+    )
+    connection.execute(stmt, [
+        {'grain': grain, 'bucket': bucket, 'blood_type': blood_type, 'city': city, 'urgency': urgency,
+         'requests': requests, 'units': units}
+        for (grain, bucket, blood_type, city, urgency), (requests, units) in counts.items()
+    ])
+
+
+def _deltas(counts, sign, blood_type, city, urgency, units_needed, created_at):
+    for key in rollup_keys(blood_type, city, urgency, created_at):
+        requests, units = counts.get(key, (0, 0))
+        counts[key] = (requests + sign, units + sign * (units_needed or 0))
+
+
+def _stored(connection, request_id):
+    """The counted columns of a request as currently stored"""
+    table = EmergencyRequest.__table__
+    return connection.execute(
+        select(*(table.c[name] for name in COUNTED)).where(table.c.id == request_id)
+    ).first()
+
+
+@event.listens_for(EmergencyRequest, 'after_insert')
+def _count_request(mapper, connection, target):
+    counts = {}
+    _deltas(counts, 1, *(getattr(target, name) for name in COUNTED))
+    _upsert(connection, counts)
+
+
+@event.listens_for(EmergencyRequest, 'before_update')
+def _move_request(mapper, connection, target):
+    state = inspect(target)
+    if not any(state.attrs[name].history.has_changes() for name in COUNTED):
+        return
+    # Read the old values from the row: they may not be loaded on the object
+    old = _stored(connection, target.id)
+    counts = {}
+    if old is not None:
+        _deltas(counts, -1, *old)
+    _deltas(counts, 1, *(getattr(target, name) for name in COUNTED))
+    counts = {key: delta for key, delta in counts.items() if delta != (0, 0)}
+    if counts:
+        _upsert(connection, counts)
+
+
+@event.listens_for(EmergencyRequest, 'before_delete')
+def _uncount_request(mapper, connection, target):
+    old = _stored(connection, target.id)
+    if old is not None:
+        counts = {}
+        _deltas(counts, -1, *old)
+        _upsert(connection, counts)
+
+
+def backfill(batch_size=BACKFILL_BATCH_SIZE):
+    """Rebuild every rollup row from ``emergency_request``; returns (requests, rollup rows)"""
+    requests, units = Counter(), Counter()
+    scanned = 0
+    query = db.session.query(
+        EmergencyRequest.blood_type, EmergencyRequest.city, EmergencyRequest.urgency,
+        EmergencyRequest.units_needed, EmergencyRequest.created_at
+    ).execution_options(yield_per=batch_size)
+    for blood_type, city, urgency, units_needed, created_at in query:
+        for key in rollup_keys(blood_type, city, urgency, created_at):
+            requests[key] += 1
+            units[key] += units_needed or 0
+        scanned += 1
+
+    try:
+        db.session.query(EmergencyDemandRollup).delete()
+        connection = db.session.connection()
+        keys = list(requests)
+        for start in range(0, len(keys), batch_size):
+            _upsert(connection, {key: (requests[key], units[key]) for key in keys[start:start + batch_size]})
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return scanned, len(requests)
+
+
+def demand_series(grain, start, end, blood_type=None, city=None, urgency=None, group_by=None):
+    """Request and unit totals per bucket in ``[start, end)``, read from the rollups only
+
+    Optional filters narrow to one blood type, city or urgency; ``group_by``
+    (one of ``DIMENSIONS``) splits each bucket by that column.
+    """
+    columns = [EmergencyDemandRollup.bucket]
+    if group_by:
+        columns.append(getattr(EmergencyDemandRollup, group_by))
+    query = db.session.query(
+        *columns, func.sum(EmergencyDemandRollup.requests), func.sum(EmergencyDemandRollup.units)
+    ).filter(
+        EmergencyDemandRollup.grain == grain,
+        EmergencyDemandRollup.bucket >= start,
+        EmergencyDemandRollup.bucket < end
+    )
+    if blood_type:
+        query = query.filter(EmergencyDemandRollup.blood_type == blood_type)
+    if city:
+        query = query.filter(EmergencyDemandRollup.city == normalize_city(city))
+    if urgency:
+        query = query.filter(EmergencyDemandRollup.urgency == urgency)
+    query = query.group_by(*columns).order_by(*columns)
+
+    series = []
+    for row in query:
+        point = {'bucket': row[0].isoformat(), 'requests': int(row[-2]), 'units': int(row[-1] or 0)}
+        if group_by:
+            point[group_by] = row[1]
+        series.append(point)
+    return series
@@ -10,6 +10,7 @@ from .main import main_bp
 from .dashboard import dashboard_bp
 from .emergency import emergency_bp
 from .api import api_bp
+from .admin import admin_bp
 
 # Register blueprints
 def init_app(app):
@@ -17,4 +18,5 @@ def init_app(app):
     app.register_blueprint(main_bp)
     app.register_blueprint(dashboard_bp)
     app.register_blueprint(emergency_bp)
-    app.register_blueprint(api_bp) 
\ No newline at end of file
+    app.register_blueprint(api_bp)
+    app.register_blueprint(admin_bp) 
\ No newline at end of file
@@ -0,0 +1,85 @@
+"""
+Admin routes for LifeLink Blood Bank Management System
+"""
+
+from datetime import datetime
+from functools import wraps
+from flask import Blueprint, Response, jsonify, request, session, stream_with_context
+from models import db, Donor
+from export import DATASETS, FORMATS, iter_export, export_filename
+from aggregates import admin_aggregates
+from eligibility import record_donation, record_donations
+
+admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
+
+def require_admin(f):
+    """Decorator to restrict a route to the admin session"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if session.get('user_type') != 'admin':
+            return jsonify({'error': 'Admin access required'}), 403
+        return f(*args, **kwargs)
+    return decorated_function
+
+@admin_bp.route('/api/stats')
+@require_admin
+def api_admin_stats():
+    """Dashboard aggregates as JSON (served from the TTL cache)"""
+    aggregates = dict(admin_aggregates.get())
+    aggregates['recent_emergencies'] = [
+        dict(e, created_at=e['created_at'].isoformat() if e['created_at'] else None)
+        for e in aggregates['recent_emergencies']
+    ]
+    return jsonify({'success': True, 'stats': aggregates})
+
+def _donation_time(value):
+    if not value:
+        return datetime.utcnow()
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+
+@admin_bp.route('/api/donors/<int:donor_id>/donations', methods=['POST'])
+@require_admin
+def api_record_donation(donor_id):
+    """Record a donation and move the donor's next eligible date"""
+    donor = db.session.get(Donor, donor_id)
+    if not donor:
+        return jsonify({'error': 'Donor not found'}), 404
+    try:
+        donated_at = _donation_time((request.get_json(silent=True) or {}).get('donated_at'))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'donated_at must be an ISO timestamp'}), 400
+    record_donation(donor, donated_at)
+    db.session.commit()
+    return jsonify({
+        'success': True,
+        'donor_id': donor.id,
+        'last_donation_date': donor.last_donation_date.isoformat(),
+        'next_eligible_date': donor.next_eligible_date.isoformat()
+    })
+
+@admin_bp.route('/api/donations', methods=['POST'])
+@require_admin
+def api_record_donations():
+    """Record many donations at once: {"donations": [{"donor_id": 1, "donated_at": "..."}]}"""
+    donations = (request.get_json(silent=True) or {}).get('donations')
+    if not isinstance(donations, list):
+        return jsonify({'error': 'donations must be a list'}), 400
+    try:
+        pairs = [(int(d['donor_id']), _donation_time(d.get('donated_at'))) for d in donations]
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return jsonify({'error': 'each donation needs a donor_id and an optional ISO donated_at'}), 400
+    return jsonify({'success': True, 'updated': record_donations(pairs)})
+
+@admin_bp.route('/export/<dataset>.<fmt>')
+@require_admin
+def export_dataset(dataset, fmt):
+    """Stream a full table as NDJSON or CSV; add ?gzip=1 to compress on the fly"""
+    if dataset not in DATASETS or fmt not in FORMATS:
+        return jsonify({'error': f"Unknown export; datasets: {', '.join(DATASETS)}; formats: {', '.join(FORMATS)}"}), 404
+    compress = request.args.get('gzip', '').lower() in ['1', 'true', 'yes']
+    filename = export_filename(dataset, fmt, compress)
+    return Response(
+        stream_with_context(iter_export(dataset, fmt, compress)),
+        mimetype='application/gzip' if compress else FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
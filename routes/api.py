@@ -2,12 +2,27 @@
 API routes for LifeLink Blood Bank Management System
 """
 
-from flask import Blueprint, jsonify, request, session
+from flask import Blueprint, jsonify, request, session, current_app, abort, make_response
 from functools import wraps
 from flask import request, jsonify
 from models import ChatMessage
 from flask_login import login_required
-from models import Donor
+from models import db, Donor, EmergencyRequest
+from matching import donor_matcher
+from compatibility import BLOOD_TYPE_BITS, donor_types_for, recipient_types_for, donor_type_index
+from donor_search import filter_by_text
+from user_cache import user_cache
+from stats import site_stats
+from fanout import notification_fanout
+from database import db_manager
+from versions import versions, conditional, chat_resource
+from aggregates import admin_aggregates
+from fragment_cache import fragment_cache
+from eligibility import eligible_now
+from priority import top_requests
+from emergency_feed import serialize_emergency
+from rollups import GRAINS, DIMENSIONS, bucket_start, shift_buckets, demand_series
+from datetime import datetime
 
 api_bp = Blueprint('api', __name__)
 
@@ -72,6 +87,74 @@ def get_emergency_requests():
         'count': 0
     })
 
+def _parse_time(value):
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+
+@api_bp.route('/api/emergency/trends')
+@conditional('emergencies')
+def get_emergency_trends():
+    """Emergency request volume per hour, day or month, read from the demand rollups
+
+    Query args: ``grain`` (hour/day/month), optional ``start``/``end`` ISO
+    timestamps (default: the last ``TREND_DEFAULT_BUCKETS`` buckets),
+    ``blood_type``, ``city``, ``urgency`` filters and ``group_by``.
+    """
+    grain = request.args.get('grain', 'day').strip()
+    group_by = request.args.get('group_by', '').strip() or None
+    if grain not in GRAINS:
+        return jsonify({'success': False, 'error': f"grain must be one of {', '.join(GRAINS)}"}), 400
+    if group_by and group_by not in DIMENSIONS:
+        return jsonify({'success': False, 'error': f"group_by must be one of {', '.join(DIMENSIONS)}"}), 400
+    try:
+        end = request.args.get('end', '').strip()
+        end = shift_buckets(bucket_start(_parse_time(end) if end else datetime.utcnow(), grain), grain, 1)
+        start = request.args.get('start', '').strip()
+        start = bucket_start(_parse_time(start), grain) if start else \
+            shift_buckets(end, grain, -current_app.config['TREND_DEFAULT_BUCKETS'][grain])
+    except ValueError:
+        return jsonify({'success': False, 'error': 'start and end must be ISO timestamps'}), 400
+    if start >= end:
+        return jsonify({'success': False, 'error': 'start must be before end'}), 400
+    if shift_buckets(start, grain, current_app.config['TREND_MAX_BUCKETS']) < end:
+        return jsonify({'success': False, 'error': 'Requested range has too many buckets; use a coarser grain'}), 400
+
+    series = demand_series(
+        grain, start, end,
+        blood_type=request.args.get('blood_type', '').strip() or None,
+        city=request.args.get('city', '').strip() or None,
+        urgency=request.args.get('urgency', '').strip() or None,
+        group_by=group_by
+    )
+    return jsonify({
+        'success': True,
+        'grain': grain,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'group_by': group_by,
+        'series': series,
+        'total_requests': sum(point['requests'] for point in series)
+    })
+
+@api_bp.route('/api/emergency/queue')
+@conditional('emergencies')
+def get_emergency_queue():
+    """The most urgent open requests, highest priority first (see priority.py)"""
+    limit = request.args.get('limit', current_app.config['EMERGENCY_QUEUE_LIMIT'], type=int)
+    limit = max(1, min(limit, current_app.config['EMERGENCY_QUEUE_MAX_LIMIT']))
+    blood_type = request.args.get('blood_type', '').strip()
+    compatible_with = request.args.get('compatible_with', '').strip()
+    blood_types = None
+    if blood_type:
+        blood_types = [blood_type]
+    elif compatible_with in BLOOD_TYPE_BITS:
+        # Requests a donor of this blood type can serve
+        blood_types = recipient_types_for(compatible_with)
+    queue = [
+        dict(serialize_emergency(e), position=position)
+        for position, e in enumerate(top_requests(limit, blood_types), 1)
+    ]
+    return jsonify({'success': True, 'queue': queue, 'count': len(queue)})
+
 @api_bp.route('/api/emergency/<int:request_id>')
 def get_emergency_request(request_id):
     """Get specific emergency request by ID"""
@@ -83,6 +166,52 @@ def get_emergency_request(request_id):
         'emergency': {}
     })
 
+@api_bp.route('/api/emergency/<int:request_id>/matches')
+@require_auth
+def get_emergency_matches(request_id):
+    """Get the top-k donors for an emergency request, best match first"""
+    emergency = db.session.get(EmergencyRequest, request_id)
+    if not emergency:
+        return jsonify({'error': 'Emergency request not found'}), 404
+
+    k = request.args.get('k', 50, type=int)
+    k = max(1, min(k, current_app.config['MATCH_MAX_RESULTS']))
+    lat = request.args.get('lat', type=float)
+    lon = request.args.get('lon', type=float)
+    include_unavailable = request.args.get('include_unavailable', '').lower() in ['1', 'true', 'yes']
+
+    ranked = donor_matcher.rank(emergency.blood_type, lat=lat, lon=lon, k=k,
+                                include_unavailable=include_unavailable)
+    ids = [donor_id for donor_id, _, _ in ranked]
+    rows = {
+        row.id: row for row in db.session.query(
+            Donor.id, Donor.name, Donor.phone, Donor.blood_type, Donor.address, Donor.is_available
+        ).filter(Donor.id.in_(ids))
+    } if ids else {}
+
+    matches = []
+    for donor_id, distance_km, exact_match in ranked:
+        row = rows.get(donor_id)
+        if row is None:
+            continue  # deleted since the snapshot was taken
+        matches.append({
+            'id': row.id,
+            'name': row.name,
+            'phone': row.phone,
+            'blood_type': row.blood_type,
+            'address': row.address,
+            'is_available': row.is_available,
+            'distance_km': distance_km,
+            'exact_match': exact_match
+        })
+    return jsonify({
+        'success': True,
+        'emergency_id': emergency.id,
+        'blood_type': emergency.blood_type,
+        'matches': matches,
+        'count': len(matches)
+    })
+
 @api_bp.route('/api/emergency', methods=['POST'])
 def create_emergency_request():
     """Create new emergency request"""
@@ -106,17 +235,17 @@ def create_emergency_request():
 @api_bp.route('/api/stats')
 def get_stats():
     """Get system statistics"""
-    # TODO: Replace all mock_db, BloodType, and EmergencyUrgency usage with real database queries
+    counts = site_stats.get()
     return jsonify({
         'success': True,
         'stats': {
-            'total_donors': 0,
-            'active_donors': 0,
-            'total_emergencies': 0,
-            'active_emergencies': 0,
+            'total_donors': counts['total_donors'],
+            'active_donors': counts['active_donors'],
+            'total_emergencies': counts['total_emergencies'],
+            'active_emergencies': counts['total_emergencies'],  # no fulfillment state yet
             'fulfilled_emergencies': 0,
             'lives_saved': 0,  # Mock calculation
-            'cities_covered': 0  # Mock data
+            'cities_covered': counts['cities_covered']
         }
     })
 
@@ -138,42 +267,63 @@ def get_urgency_levels():
         'urgency_levels': []
     })
 
+# Columns returned by the donor search; never load password or medical data
+DONOR_SEARCH_COLUMNS = (
+    Donor.id, Donor.name, Donor.email, Donor.phone, Donor.age,
+    Donor.blood_type, Donor.address, Donor.is_available
+)
+
+def _eligibility_clock():
+    # Eligibility changes with time as well as with writes; key the ETag to the minute
+    if request.args.get('availability', '').strip().lower() == 'eligible':
+        return f"clock:{datetime.utcnow():%Y-%m-%dT%H:%M}"
+    return 'clock'
+
 @api_bp.route('/api/search/donors')
+@conditional('donors', _eligibility_clock)
 def search_donors():
+    """Search donors, one keyset page at a time ordered by donor ID"""
     query = request.args.get('q', '').strip().lower()
     blood_type = request.args.get('blood_type', '').strip()
     city = request.args.get('city', '').strip().lower()
     availability = request.args.get('availability', '').strip().lower()
+    compatible_with = request.args.get('compatible_with', '').strip()
+    limit = request.args.get('limit', current_app.config['ITEMS_PER_PAGE'], type=int)
+    limit = max(1, min(limit, current_app.config['SEARCH_MAX_PAGE_SIZE']))
+    after = request.args.get('after', type=int)
 
-    print(f"[DEBUG] Donor search: q='{query}', blood_type='{blood_type}', city='{city}', availability='{availability}'")
-
-    donors_query = Donor.query
-    if query:
-        donors_query = donors_query.filter(Donor.name.ilike(f'%{query}%'))
+    donors_query, key = filter_by_text(db.session.query(*DONOR_SEARCH_COLUMNS), name=query, city=city)
     if blood_type:
         donors_query = donors_query.filter(Donor.blood_type == blood_type)
-    if city:
-        donors_query = donors_query.filter(Donor.address.ilike(f'%{city}%'))
+    if compatible_with in BLOOD_TYPE_BITS:
+        donors_query = donors_query.filter(Donor.blood_type.in_(donor_types_for(compatible_with)))
     if availability == 'available':
         donors_query = donors_query.filter(Donor.is_available == True)
     elif availability == 'unavailable':
         donors_query = donors_query.filter(Donor.is_available == False)
+    elif availability == 'eligible':
+        donors_query = donors_query.filter(Donor.is_available == True, eligible_now())
+    if after is not None:
+        donors_query = donors_query.filter(key > after)
 
-    donors = donors_query.all()
-    print(f"[DEBUG] Donor search results: {len(donors)} donors found")
-    donor_list = [
-        {
-            'id': getattr(d, 'id', None),
-            'name': getattr(d, 'name', ''),
-            'email': getattr(d, 'email', ''),
-            'phone': getattr(d, 'phone', ''),
-            'age': getattr(d, 'age', ''),
-            'blood_type': getattr(d, 'blood_type', ''),
-            'address': getattr(d, 'address', ''),
-            'is_available': getattr(d, 'is_available', False)
-        } for d in donors
-    ]
-    return jsonify({'success': True, 'donors': donor_list, 'count': len(donor_list)})
+    # Fetch one extra row to learn whether another page exists
+    donors = donors_query.order_by(key).limit(limit + 1).all()
+    has_more = len(donors) > limit
+    donors = donors[:limit]
+    current_app.logger.debug('donor search q=%r blood_type=%r city=%r availability=%r compatible_with=%r '
+                             'after=%s limit=%s: %d donors', query, blood_type, city, availability,
+                             compatible_with, after, limit, len(donors))
+    donor_list = [d._asdict() for d in donors]
+    response = {
+        'success': True,
+        'donors': donor_list,
+        'count': len(donor_list),
+        'has_more': has_more,
+        'next_cursor': donor_list[-1]['id'] if has_more else None
+    }
+    if compatible_with in BLOOD_TYPE_BITS:
+        response['compatible_available'] = donor_type_index.count_for(compatible_with)
+    return jsonify(response)
 
 @api_bp.route('/api/user/profile', methods=['GET', 'PUT'])
 @require_auth
@@ -210,27 +360,98 @@ def user_profile():
 @require_auth
 def get_notifications():
     """Get user notifications"""
+    # Notifications are addressed by donor id (see fanout.py)
+    if session.get('user_type') != 'donor':
+        return jsonify({'success': True, 'notifications': [], 'unread_count': 0})
+    user_id = session.get('user_id')
+    limit = request.args.get('limit', 20, type=int)
+    limit = max(1, min(limit, current_app.config['SEARCH_MAX_PAGE_SIZE']))
+    
+    return jsonify({
+        'success': True,
+        'notifications': db_manager.get_notifications_by_user(user_id, limit),
+        'unread_count': db_manager.get_unread_notification_count(user_id)
+    })
+
+@api_bp.route('/api/notifications/read', methods=['POST'])
+@require_auth
+def mark_notifications_read():
+    """Mark notifications as read: {"ids": [...]} for specific ones or {"all": true}"""
+    if session.get('user_type') != 'donor':
+        return jsonify({'success': True, 'marked': 0, 'unread_count': 0})
     user_id = session.get('user_id')
+    data = request.get_json(silent=True) or {}
+    if data.get('all'):
+        marked = db_manager.mark_all_notifications_read(user_id)
+    else:
+        ids = data.get('ids') or []
+        if not isinstance(ids, list) or len(ids) > current_app.config['SEARCH_MAX_PAGE_SIZE']:
+            return jsonify({'error': 'ids must be a list of at most '
+                                     f"{current_app.config['SEARCH_MAX_PAGE_SIZE']} notification ids"}), 400
+        try:
+            ids = [int(i) for i in ids]
+        except (TypeError, ValueError):
+            return jsonify({'error': 'ids must be integers'}), 400
+        marked = db_manager.mark_notifications_read(ids, user_id=user_id)
     
-    # Mock notifications
     return jsonify({
         'success': True,
-        'notifications': [],
-        'unread_count': 0
-    }) 
+        'marked': marked,
+        'unread_count': db_manager.get_unread_notification_count(user_id)
+    })
+
+@api_bp.route('/api/metrics')
+@require_auth
+def get_metrics():
+    """Get in-process cache metrics"""
+    return jsonify({
+        'success': True,
+        'metrics': {
+            'user_cache': user_cache.stats(),
+            'notification_fanout': notification_fanout.stats(),
+            'conditional_get': versions.stats(),
+            'admin_aggregates': admin_aggregates.stats(),
+            'fragment_cache': fragment_cache.stats()
+        }
+    })
+
+CHAT_USER_TYPES = ('donor', 'patient')
+
+def _conversation_args():
+    """``(user1, type1, user2, type2)`` from the query string; aborts with 400 if invalid"""
+    args = request.args
+    try:
+        user1, user2 = int(args['user1']), int(args['user2'])
+    except (KeyError, ValueError):
+        abort(make_response(jsonify({'error': 'user1 and user2 must be integer ids'}), 400))
+    type1, type2 = args.get('type1'), args.get('type2')
+    if type1 not in CHAT_USER_TYPES or type2 not in CHAT_USER_TYPES:
+        abort(make_response(jsonify({'error': 'type1 and type2 must be donor or patient'}), 400))
+    return user1, type1, user2, type2
+
+def _requested_conversation():
+    # Same parsed ids as the view, so '05' and '5' share one version stamp
+    return chat_resource(ChatMessage.make_conversation_key(*_conversation_args()))
 
 @api_bp.route('/chat/history')
+@conditional(_requested_conversation)
 def chat_history():
-    user1 = int(request.args.get('user1'))
-    user2 = int(request.args.get('user2'))
-    type1 = request.args.get('type1')
-    type2 = request.args.get('type2')
-    messages = ChatMessage.query.filter(
-        (((ChatMessage.sender_id==user1) & (ChatMessage.sender_type==type1) & (ChatMessage.receiver_id==user2) & (ChatMessage.receiver_type==type2)) |
-         ((ChatMessage.sender_id==user2) & (ChatMessage.sender_type==type2) & (ChatMessage.receiver_id==user1) & (ChatMessage.receiver_type==type1)))
-    ).order_by(ChatMessage.timestamp).all()
+    """Latest page of a conversation; pass before_id to scroll further back"""
+    user1, type1, user2, type2 = _conversation_args()
+    limit = request.args.get('limit', current_app.config['CHAT_HISTORY_PAGE_SIZE'], type=int)
+    limit = max(1, min(limit, current_app.config['CHAT_HISTORY_MAX_PAGE_SIZE']))
+    before_id = request.args.get('before_id', type=int)
+
+    conversation_key = ChatMessage.make_conversation_key(user1, type1, user2, type2)
+    messages_query = ChatMessage.query.filter(ChatMessage.conversation_key == conversation_key)
+    if before_id is not None:
+        messages_query = messages_query.filter(ChatMessage.id < before_id)
+    # Walk the (conversation_key, id) index backwards, then return oldest first
+    messages = messages_query.order_by(ChatMessage.id.desc()).limit(limit).all()
+    messages.reverse()
     return jsonify([
         {
+            'id': m.id,
             'sender_id': m.sender_id,
             'sender_type': m.sender_type,
             'receiver_id': m.receiver_id,
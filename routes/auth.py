@@ -4,7 +4,7 @@ Authentication routes for LifeLink Blood Bank Management System
 
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session
 from models import db, Donor, Patient
-from werkzeug.security import generate_password_hash, check_password_hash
+from accounts import authenticate, email_registered, hash_password
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -23,12 +23,9 @@ def login():
         if not email or not password:
             flash('Please enter both email and password', 'error')
             return render_template('login.html')
-        user = Donor.query.filter_by(email=email).first()
-        user_type = 'donor'
-        if not user:
-            user = Patient.query.filter_by(email=email).first()
-            user_type = 'patient'
-        if user and check_password_hash(user.password, password):
+        account = authenticate(email, password)
+        if account:
+            user_type, user = account
             session['user_id'] = user.id
             session['user_type'] = user_type
             session['user_name'] = user.name
@@ -60,10 +57,10 @@ def register():
         if not (user_type and full_name and email and phone and age and blood_group and address and password):
             flash('Please fill all required fields', 'error')
             return render_template('register.html')
-        if Donor.query.filter_by(email=email).first() or Patient.query.filter_by(email=email).first():
+        if email_registered(email):
             flash('Email already registered', 'error')
             return render_template('register.html')
-        hashed_password = generate_password_hash(password)
+        hashed_password = hash_password(password)
         if user_type == 'donor':
             donor = Donor(
                 name=full_name,
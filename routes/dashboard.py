@@ -2,8 +2,12 @@
 Dashboard routes for LifeLink Blood Bank Management System
 """
 
-from flask import Blueprint, render_template, redirect, url_for, session, flash, request, jsonify
+from flask import Blueprint, render_template, redirect, url_for, session, flash, request, jsonify, current_app
 from models import Donor, EmergencyRequest, Patient
+from compatibility import recipient_types_for
+from stats import site_stats
+from aggregates import admin_aggregates
+from emergency_search import read_filters, filter_requests, paginate, capped_count
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
@@ -19,8 +23,22 @@ def donor_dashboard():
     if not donor:
         flash('Donor not found.', 'error')
         return redirect(url_for('auth.login'))
-    emergency_requests = EmergencyRequest.query.order_by(EmergencyRequest.created_at.desc()).all()
-    return render_template('dashboard/donor.html', donor_data=donor, emergency_requests=emergency_requests)
+    # Only show requests this donor's blood type can serve, most urgent first
+    filters = read_filters(request.args)
+    filters.pop('compatible_with', None)
+    query = filter_requests(EmergencyRequest.query, compatible_with=donor.blood_type, **filters)
+    try:
+        emergency_requests, next_cursor = paginate(
+            query, 'priority', request.args.get('after'), current_app.config['EMERGENCY_PAGE_SIZE']
+        )
+    except ValueError:
+        return redirect(url_for('dashboard.donor_dashboard', **filters))
+    emergency_cap = current_app.config['EMERGENCY_COUNT_CAP']
+    emergency_total = capped_count(query, emergency_cap)
+    return render_template('dashboard/donor.html', donor_data=donor, emergency_requests=emergency_requests,
+                           emergency_total=emergency_total, emergency_cap=emergency_cap, filters=filters, next_cursor=next_cursor,
+                           blood_types=recipient_types_for(donor.blood_type),
+                           urgency_levels=current_app.config['URGENCY_LEVELS'])
 
 @dashboard_bp.route('/dashboard/admin')
 def admin_dashboard():
@@ -31,83 +49,12 @@ def admin_dashboard():
     # Mock admin access for testing - allow any logged in user to access admin dashboard
     # In production, this should check for actual admin privileges
     
-    # Mock admin data for testing
-    admin_stats = {
-        'total_donors': 1250,
-        'active_donors': 847,
-        'total_emergencies': 156,
-        'fulfilled_emergencies': 142,
-        'pending_emergencies': 14,
-        'total_donations': 3247,
-        'lives_saved': 2847,
-        'response_time_avg': '2.3 min',
-        'success_rate': '98.7%'
-    }
-    
-    recent_emergencies = [
-        {
-            'id': 1,
-            'patient_name': 'Sarah Johnson',
-            'blood_type': 'O+',
-            'urgency': 'Critical',
-            'hospital': 'City General Hospital',
-            'status': 'Active',
-            'created_at': '2 hours ago'
-        },
-        {
-            'id': 2,
-            'patient_name': 'Michael Chen',
-            'blood_type': 'A+',
-            'urgency': 'Urgent',
-            'hospital': 'St. Mary\'s Medical Center',
-            'status': 'Fulfilled',
-            'created_at': '4 hours ago'
-        },
-        {
-            'id': 3,
-            'patient_name': 'Omar Abdullah',
-            'blood_type': 'B+',
-            'urgency': 'Normal',
-            'hospital': 'Memorial Hospital',
-            'status': 'Active',
-            'created_at': '6 hours ago'
-        }
-    ]
-    
-    recent_donors = [
-        {
-            'id': 1,
-            'name': 'John Smith',
-            'blood_type': 'O+',
-            'city': 'New York',
-            'total_donations': 12,
-            'last_donation': '2 weeks ago',
-            'status': 'Available'
-        },
-        {
-            'id': 2,
-            'name': 'Fatima Ali',
-            'blood_type': 'A+',
-            'city': 'Los Angeles',
-            'total_donations': 8,
-            'last_donation': '1 month ago',
-            'status': 'Available'
-        },
-        {
-            'id': 3,
-            'name': 'Ahmed Hassan',
-            'blood_type': 'B+',
-            'city': 'Chicago',
-            'total_donations': 15,
-            'last_donation': '3 weeks ago',
-            'status': 'Unavailable'
-        }
-    ]
-    
+    aggregates = admin_aggregates.get()
     return render_template('dashboard/admin.html', 
-                         admin_stats=admin_stats,
-                         recent_emergencies=recent_emergencies,
-                         recent_donors=recent_donors)
+                         admin_stats=aggregates['totals'],
+                         aggregates=aggregates,
+                         recent_emergencies=aggregates['recent_emergencies'],
+                         recent_donors=aggregates['recent_donors'])
 
 @dashboard_bp.route('/dashboard/profile')
 def profile():
@@ -155,7 +102,7 @@ def patient_landing():
         return redirect(url_for('dashboard.donor_dashboard'))
     
     print("DEBUG: User is patient, loading patient dashboard")
-    from models import Donor
-    active_donors = Donor.query.filter_by(is_available=True).all()
-    active_donor_count = Donor.query.filter_by(is_available=True).count()
+    # Left as a query: it only runs when the cached donor cards fragment misses
+    active_donors = Donor.query.filter_by(is_available=True)
+    active_donor_count = site_stats.get()['active_donors']
     return render_template('dashboard/patient_landing.html', donors=active_donors, active_donor_count=active_donor_count) 
\ No newline at end of file
@@ -2,24 +2,42 @@
 Emergency routes for LifeLink Blood Bank Management System
 """
 
-from flask import Blueprint, render_template, request, jsonify, session, flash, redirect, url_for
+from datetime import datetime
+from flask import Blueprint, render_template, request, jsonify, session, flash, redirect, url_for, current_app
 from models import db, EmergencyRequest, Donor
+from stats import site_stats
+from emergency_feed import serialize_emergency
+from versions import conditional
+from compatibility import BLOOD_TYPES
+from emergency_search import read_filters, filter_requests, paginate
 
 emergency_bp = Blueprint('emergency', __name__, url_prefix='/emergency')
 
 @emergency_bp.route('/')
 def emergency_list():
-    """Emergency requests listing page"""
+    """Emergency requests listing page, filtered and one keyset page at a time"""
+    filters = read_filters(request.args)
     # If user is a patient, show only their requests
     if session.get('user_type') == 'patient' and session.get('user_id'):
-        emergency_requests = EmergencyRequest.query.filter_by(patient_id=session['user_id']).order_by(EmergencyRequest.created_at.desc()).all()
+        query = EmergencyRequest.query.filter_by(patient_id=session['user_id'])
+        sort = 'newest'
     else:
-        # For donors and non-logged-in users, show all requests
-        emergency_requests = EmergencyRequest.query.order_by(EmergencyRequest.created_at.desc()).all()
+        # For donors and non-logged-in users, show all requests, most urgent first by default
+        query = EmergencyRequest.query
+        sort = 'newest' if request.args.get('sort') == 'newest' else 'priority'
+    try:
+        emergency_requests, next_cursor = paginate(
+            filter_requests(query, **filters), sort, request.args.get('after'),
+            current_app.config['EMERGENCY_PAGE_SIZE']
+        )
+    except ValueError:
+        flash('That page link is no longer valid.', 'error')
+        return redirect(url_for('emergency.emergency_list', **filters))
     
-    total_donors = Donor.query.count()
-    active_donors = Donor.query.filter_by(is_available=True).count()
-    return render_template('emergency.html', emergency_requests=emergency_requests, total_donors=total_donors, active_donors=active_donors)
+    counts = site_stats.get()
+    return render_template('emergency.html', emergency_requests=emergency_requests, total_donors=counts['total_donors'], active_donors=counts['active_donors'],
+                           filters=filters, sort=sort, next_cursor=next_cursor,
+                           blood_types=BLOOD_TYPES, urgency_levels=current_app.config['URGENCY_LEVELS'])
 
 @emergency_bp.route('/create', methods=['GET', 'POST'])
 def create_emergency():
@@ -95,33 +113,58 @@ def fulfill_emergency(request_id):
     })
 
 @emergency_bp.route('/api/emergency/active')
+@conditional('emergencies')
 def api_active_emergencies():
-    """API endpoint for active emergency requests"""
-    # TODO: Replace all mock_db, EmergencyUrgency, and BloodType usage with real database queries
-    emergency_requests = [] # Placeholder for emergency requests
+    """API endpoint for active emergency requests
+
+    Without ``since`` returns the newest requests first. With ``since=<id>``
+    or ``since=<ISO timestamp>`` returns only requests created after it,
+    oldest first, so a reconnecting client can fetch just what it missed.
+    """
+    limit = current_app.config.get('EMERGENCY_FEED_LIMIT', 100)
+    since = request.args.get('since', '').strip()
+    # Requests have no fulfillment state yet, so every request is active
+    query = EmergencyRequest.query
+    if since:
+        if since.isdigit():
+            query = query.filter(EmergencyRequest.id > int(since))
+        else:
+            try:
+                since_time = datetime.fromisoformat(since.replace('Z', '+00:00')).replace(tzinfo=None)
+            except ValueError:
+                return jsonify({'success': False, 'error': 'since must be a request id or ISO timestamp'}), 400
+            query = query.filter(EmergencyRequest.created_at > since_time)
+        rows = query.order_by(EmergencyRequest.id.asc()).limit(limit + 1).all()
+    else:
+        rows = query.order_by(EmergencyRequest.id.desc()).limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    emergency_requests = [serialize_emergency(e) for e in rows[:limit]]
+    ids = [e['id'] for e in emergency_requests]
+    latest_id = max(ids) if ids else (int(since) if since.isdigit() else None)
     return jsonify({
         'success': True,
         'emergencies': emergency_requests,
-        'count': len(emergency_requests)
+        'count': len(emergency_requests),
+        'has_more': has_more,
+        'latest_id': latest_id
     })
 
 @emergency_bp.route('/api/emergency/stats')
 def api_emergency_stats():
     """API endpoint for emergency statistics"""
-    # TODO: Replace all mock_db, EmergencyUrgency, and BloodType usage with real database queries
-    all_requests = [] # Placeholder for all requests
-    active_requests = [] # Placeholder for active requests
-    fulfilled_requests = [] # Placeholder for fulfilled requests
-    
-    stats = {
-        'total_requests': len(all_requests),
-        'active_requests': len(active_requests),
-        'fulfilled_requests': len(fulfilled_requests),
+    counts = site_stats.get()
+    # Requests have no fulfillment state yet, so every request counts as active
+    emergency_stats = {
+        'total_requests': counts['total_emergencies'],
+        'active_requests': counts['total_emergencies'],
+        'fulfilled_requests': 0,
+        'requests_by_urgency': counts['emergencies_by_urgency'],
         'response_time_avg': '2.3 min',
         'success_rate': '98.7%'
     }
     
     return jsonify({
         'success': True,
-        'stats': stats
+        'stats': emergency_stats
     }) 
\ No newline at end of file
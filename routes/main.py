@@ -5,15 +5,14 @@ Main routes for LifeLink Blood Bank Management System
 from flask import Blueprint, render_template, flash, redirect, url_for
 from models import Donor, Feedback, db
 from forms import FeedbackForm
+from stats import site_stats
 
 main_bp = Blueprint('main', __name__)
 
 @main_bp.route('/')
 def home():
     """Homepage route"""
-    # Query the actual number of active donors
-    from models import Donor
-    active_donors_count = Donor.query.filter_by(is_available=True).count()
+    active_donors_count = site_stats.get()['active_donors']
     stats = [
         {"label": "Active Donors", "value": str(active_donors_count), "icon": "users", "gradient": "from-blue-500 to-blue-600"},
         {"label": "Emergency Support", "value": "24/7", "icon": "clock", "gradient": "from-purple-500 to-violet-600"}
@@ -22,11 +21,9 @@ def home():
 
 @main_bp.route('/donors')
 def donors():
-    """Donors listing page"""
-    donors_list = Donor.query.all()
-    total_donors = Donor.query.count()
-    active_donors = Donor.query.filter_by(is_available=True).count()
-    return render_template('donors.html', donors=donors_list, total_donors=total_donors, active_donors=active_donors)
+    """Donors listing page (cards are loaded page by page from /api/search/donors)"""
+    counts = site_stats.get()
+    return render_template('donors.html', total_donors=counts['total_donors'], active_donors=counts['active_donors'])
 
 @main_bp.route('/about')
 def about():
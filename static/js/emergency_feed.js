@@ -0,0 +1,76 @@
+// Live emergency request feed for LifeLink (see emergency_feed.py)
+// Joins the emergency_feed room on the shared window.socket, catches up on
+// requests missed while disconnected, and keeps #emergency-count current.
+// Pages can listen for the 'lifelink:emergency-update' DOM event.
+
+(function () {
+    const signedIn = document.currentScript.dataset.signedIn === 'true';
+    const seen = new Set();
+    let lastEmergencyId = null;
+
+    function updateEmergencyCount() {
+        const countElement = document.getElementById('emergency-count');
+        if (countElement) {
+            countElement.textContent = seen.size;
+            countElement.classList.toggle('hidden', seen.size === 0);
+        }
+    }
+
+    function announce(text) {
+        if (signedIn && typeof toastr !== 'undefined') {
+            toastr.warning(text, 'Emergency request');
+        }
+    }
+
+    // On load, then only the delta after a reconnect
+    async function catchUp() {
+        try {
+            const since = lastEmergencyId !== null ? `?since=${lastEmergencyId}` : '';
+            const response = await fetch(`/emergency/api/emergency/active${since}`);
+            const data = await response.json();
+            if (!data.success) return;
+
+            const missed = data.emergencies.filter(e => !seen.has(e.id));
+            // Only announce requests missed while disconnected, not the initial list
+            if (lastEmergencyId !== null && missed.length > 0) {
+                announce(`${missed.length} new emergency request(s)`);
+            }
+            missed.forEach(e => seen.add(e.id));
+            if (data.latest_id !== null) {
+                lastEmergencyId = data.latest_id;
+            }
+            updateEmergencyCount();
+            if (data.has_more && lastEmergencyId !== null) {
+                await catchUp();
+            }
+        } catch (error) {
+            console.error('Failed to check emergencies:', error);
+        }
+    }
+
+    function handleEmergencyUpdate(data) {
+        const emergency = data.emergency;
+        if (data.operation === 'delete') {
+            seen.delete(emergency.id);
+        } else if (!seen.has(emergency.id)) {
+            seen.add(emergency.id);
+            announce(`New ${emergency.urgency} request: ${emergency.blood_type} at ${emergency.hospital}`);
+        }
+        lastEmergencyId = Math.max(lastEmergencyId || 0, emergency.id);
+        updateEmergencyCount();
+        document.dispatchEvent(new CustomEvent('lifelink:emergency-update', { detail: data }));
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        if (typeof io === 'undefined') return;
+        const socket = window.socket || (window.socket = io());
+        const join = () => {
+            // Runs again after every reconnect: rejoin and fetch what was missed
+            socket.emit('join_room', { room: 'emergency_feed' });
+            catchUp();
+        };
+        socket.on('connect', join);
+        if (socket.connected) join();
+        socket.on('emergency_update', handleEmergencyUpdate);
+    });
+})();
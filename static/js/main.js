@@ -5,7 +5,6 @@
 // Global variables
 let currentUser = null;
 let notifications = [];
-let emergencyRequests = [];
 
 // DOM Content Loaded
 document.addEventListener('DOMContentLoaded', function() {
@@ -580,12 +579,8 @@ function updateEmergencyStatus(requestId, status) {
  * Initialize real-time updates
  */
 function initializeRealTimeUpdates() {
-    // Poll for new emergency requests
-    setInterval(async () => {
-        if (currentUser) {
-            await checkNewEmergencies();
-        }
-    }, 30000); // Check every 30 seconds
+    // Emergency requests are pushed over Socket.IO by emergency_feed.js,
+    // which base.html loads on every page
     
     // Poll for notifications
     setInterval(async () => {
@@ -595,31 +590,6 @@ function initializeRealTimeUpdates() {
     }, 60000); // Check every minute
 }
 
-/**
- * Check for new emergencies
- */
-async function checkNewEmergencies() {
-    try {
-        const response = await fetch('/api/emergency/active');
-        const data = await response.json();
-        
-        if (data.success && data.emergencies.length > 0) {
-            // Update emergency count in UI
-            updateEmergencyCount(data.emergencies.length);
-            
-            // Show notification for new emergencies
-            const newEmergencies = data.emergencies.filter(e => !emergencyRequests.includes(e.id));
-            if (newEmergencies.length > 0) {
-                showNotification(`${newEmergencies.length} new emergency request(s)`, 'warning');
-            }
-            
-            emergencyRequests = data.emergencies.map(e => e.id);
-        }
-    } catch (error) {
-        console.error('Failed to check emergencies:', error);
-    }
-}
-
 /**
  * Check for notifications
  */
@@ -641,17 +611,6 @@ async function checkNotifications() {
     }
 }
 
-/**
- * Update emergency count
- */
-function updateEmergencyCount(count) {
-    const countElement = document.getElementById('emergency-count');
-    if (countElement) {
-        countElement.textContent = count;
-        countElement.classList.toggle('hidden', count === 0);
-    }
-}
-
 /**
  * Update notification count
  */
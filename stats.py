@@ -0,0 +1,139 @@
+"""
+Statistics counters for LifeLink Blood Bank Management System
+
+Donor and emergency counts are loaded once, then kept current from
+committed Donor / EmergencyRequest writes, so reading them costs O(1).
+A background job recounts everything every ``STATS_RECONCILE_INTERVAL``
+seconds to correct any drift (e.g. from writes made outside the ORM).
+"""
+
+import threading
+import time
+from collections import Counter
+from sqlalchemy import func
+from models import db, Donor, EmergencyRequest
+from hooks import on_commit, on_bulk_change
+
+
+class StatsCounters:
+    """In-process counters with periodic reconciliation against the database"""
+
+    def __init__(self):
+        self.app = None
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._reconciler = None
+        self.total_donors = 0
+        self.active_donors = 0
+        self.emergencies_by_urgency = Counter()
+        self.emergencies_by_city = Counter()
+        self.reconciled_at = None
+
+    def init_app(self, app):
+        self.app = app
+
+    def reconcile(self):
+        """Recount everything from the database (needs an app context)"""
+        total_donors = db.session.query(func.count(Donor.id)).scalar()
+        active_donors = db.session.query(func.count(Donor.id)).filter(Donor.is_available == True).scalar()
+        by_urgency = Counter(dict(
+            db.session.query(EmergencyRequest.urgency, func.count(EmergencyRequest.id))
+            .group_by(EmergencyRequest.urgency)
+        ))
+        by_city = Counter(dict(
+            db.session.query(EmergencyRequest.city, func.count(EmergencyRequest.id))
+            .group_by(EmergencyRequest.city)
+        ))
+        with self._lock:
+            self.total_donors = total_donors
+            self.active_donors = active_donors
+            self.emergencies_by_urgency = by_urgency
+            self.emergencies_by_city = by_city
+            self.reconciled_at = time.time()
+            self._loaded = True
+
+    def invalidate(self):
+        """Force a full recount on the next read"""
+        with self._lock:
+            self._loaded = False
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.reconcile()
+        if self._reconciler is None and self.app is not None:
+            self._start_reconciler()
+
+    def _start_reconciler(self):
+        with self._lock:
+            if self._reconciler is not None:
+                return
+            self._reconciler = threading.Thread(target=self._reconcile_forever, name='stats-reconciler', daemon=True)
+            self._reconciler.start()
+
+    def _reconcile_forever(self):
+        while True:
+            time.sleep(self.app.config.get('STATS_RECONCILE_INTERVAL', 300))
+            with self.app.app_context():
+                try:
+                    self.reconcile()
+                except Exception:
+                    self.app.logger.exception('stats reconciliation failed')
+
+    def get(self):
+        """Return the current counters as a dict"""
+        self._ensure_loaded()
+        with self._lock:
+            total_emergencies = sum(self.emergencies_by_urgency.values())
+            return {
+                'total_donors': self.total_donors,
+                'active_donors': self.active_donors,
+                'total_emergencies': total_emergencies,
+                'emergencies_by_urgency': {k: v for k, v in self.emergencies_by_urgency.items() if v},
+                'cities_covered': sum(1 for v in self.emergencies_by_city.values() if v),
+                'reconciled_at': self.reconciled_at
+            }
+
+    def apply_donor(self, operation, row, previous):
+        if not self._loaded:
+            return
+        with self._lock:
+            was_available = previous.get('is_available', row['is_available'])
+            if operation == 'insert':
+                self.total_donors += 1
+                self.active_donors += bool(row['is_available'])
+            elif operation == 'delete':
+                self.total_donors -= 1
+                self.active_donors -= bool(row['is_available'])
+            else:
+                self.active_donors += bool(row['is_available']) - bool(was_available)
+
+    def apply_emergency(self, operation, row, previous):
+        if not self._loaded:
+            return
+        with self._lock:
+            if operation in ('update', 'delete'):
+                self.emergencies_by_urgency[previous.get('urgency', row['urgency'])] -= 1
+                self.emergencies_by_city[previous.get('city', row['city'])] -= 1
+            if operation in ('insert', 'update'):
+                self.emergencies_by_urgency[row['urgency']] += 1
+                self.emergencies_by_city[row['city']] += 1
+
+
+# Global statistics instance
+site_stats = StatsCounters()
+
+
+@on_commit(Donor)
+def _count_donor_change(operation, row, previous):
+    site_stats.apply_donor(operation, row, previous)
+
+
+@on_commit(EmergencyRequest)
+def _count_emergency_change(operation, row, previous):
+    site_stats.apply_emergency(operation, row, previous)
+
+
+@on_bulk_change(Donor)
+@on_bulk_change(EmergencyRequest)
+def _recount_on_bulk_load():
+    site_stats.invalidate()
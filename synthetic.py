@@ -0,0 +1,331 @@
+"""
+Synthetic data generator for LifeLink Blood Bank Management System
+
+Fills a database with realistic donors, patients, emergency requests, chat
+messages and feedback for load and scale testing:
+
+    flask generate --donors 1000000 --patients 200000 --emergencies 100000
+
+Output depends only on the seed, the requested counts and the anchor
+date ``now`` (a fixed date unless given), so two runs into empty databases
+write identical rows. Rows are drawn in fixed blocks of ``BLOCK_SIZE``, so
+``chunk_size`` only changes transaction boundaries, and each table has its
+own random stream, so changing one count leaves the other tables
+unchanged. Password hashes are salted, so a ``password`` other than the
+default is the one exception. Blood types follow their population
+frequencies, people live in weighted cities with jittered coordinates, and
+requests, donations and messages are spread over the ``days`` days before
+``now``.
+
+Donors and patients go through the regular bulk ingestion path (see
+ingest.py), which also indexes their accounts; the other tables are
+written with one ``executemany`` per chunk. Emergency priorities are set
+on every row and the demand rollups are rebuilt at the end. Emails are
+derived from the row number, so generate into an empty database: rerunning
+with the same seed only produces rejected duplicates.
+"""
+
+import random
+import time
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from itertools import islice
+from models import db, Donor, Patient, EmergencyRequest, ChatMessage, Feedback
+from ingest import ingest, deferred_indexes, IMPORTED_PASSWORD
+from eligibility import record_donations
+from priority import priority_key
+from rollups import backfill
+from hooks import bulk_changed
+
+# Approximate frequencies in Pakistan, per cent
+BLOOD_TYPE_WEIGHTS = {'O+': 29.5, 'B+': 29.4, 'A+': 22.2, 'AB+': 7.3, 'O-': 4.1, 'B-': 3.7, 'A-': 2.7, 'AB-': 1.1}
+# City: (latitude, longitude, weight by population)
+CITIES = {
+    'Karachi': (24.8607, 67.0011, 17.2), 'Lahore': (31.5204, 74.3587, 13.0),
+    'Faisalabad': (31.4504, 73.1350, 3.7), 'Rawalpindi': (33.5651, 73.0169, 2.4),
+    'Gujranwala': (32.1877, 74.1945, 2.3), 'Peshawar': (34.0151, 71.5249, 2.1),
+    'Multan': (30.1575, 71.5249, 2.0), 'Hyderabad': (25.3960, 68.3578, 1.8),
+    'Islamabad': (33.6844, 73.0479, 1.2), 'Quetta': (30.1798, 66.9750, 1.1),
+    'Sialkot': (32.4945, 74.5229, 0.7), 'Bahawalpur': (29.3956, 71.6836, 0.8),
+}
+COORDINATE_SPREAD = 0.06  # degrees, roughly 6 km
+AREAS = ['Model Town', 'Gulberg', 'Saddar', 'Cantt', 'Satellite Town', 'Civil Lines', 'Garden Town',
+         'Johar Town', 'Township', 'DHA Phase 5', 'Bahria Town', 'Gulshan-e-Iqbal', 'Wapda Town']
+FIRST_NAMES = ['Ahmed', 'Ali', 'Fatima', 'Ayesha', 'Omar', 'Hassan', 'Zainab', 'Bilal', 'Sara', 'Usman',
+               'Hina', 'Imran', 'Maryam', 'Kamran', 'Nadia', 'Tariq', 'Amna', 'Hamza', 'Sana', 'Faisal',
+               'Rabia', 'Asad', 'Mehwish', 'Junaid', 'Iqra', 'Saad', 'Noor', 'Waqas', 'Khadija', 'Danish']
+LAST_NAMES = ['Khan', 'Ahmed', 'Hussain', 'Malik', 'Sheikh', 'Qureshi', 'Butt', 'Raza', 'Chaudhry',
+              'Siddiqui', 'Iqbal', 'Javed', 'Aslam', 'Farooq', 'Mirza', 'Abbasi', 'Awan', 'Baig']
+MEDICAL_CONDITIONS = ['Thalassemia major', 'Anemia', 'Dengue fever', 'Surgery scheduled', 'Road accident',
+                      'Pregnancy complications', 'Leukemia', 'Kidney failure', 'Burn injuries']
+HOSPITALS = ['Civil Hospital', 'Combined Military Hospital', 'Services Hospital', 'General Hospital',
+             'Children Hospital', 'Shaukat Khanum Memorial', 'Aga Khan University Hospital',
+             'District Headquarters Hospital', 'Mayo Hospital', 'Holy Family Hospital']
+URGENCY_WEIGHTS = {'Critical': 10, 'High': 25, 'Moderate': 40, 'Low': 25}
+UNITS_WEIGHTS = {1: 35, 2: 30, 3: 15, 4: 10, 5: 5, 6: 5}
+CHAT_LINES = ['Hello, I saw your emergency request.', 'Thank you so much for reaching out!',
+              'Which hospital should I come to?', 'Is the blood still needed?',
+              'Yes, please come as soon as you can.', 'I can be there in an hour.',
+              'Please bring your CNIC for registration.', 'I have donated before, no problem.',
+              'Ward 4, second floor. Ask for the blood bank counter.', 'May Allah reward you.']
+FEEDBACK_SUBJECTS = ['Great service', 'Donor search', 'Registration problem', 'Suggestion', 'Chat not loading',
+                     'Thank you', 'Notification issue']
+DONATED_SHARE = 0.35  # donors with a recorded donation
+AVAILABLE_SHARE = 0.8
+CONVERSATION_SIZE = 25  # average messages per conversation
+BLOCK_SIZE = 1000  # rows drawn per batch of random values
+ANCHOR = datetime(2025, 1, 1)  # default ``now``, so timestamps do not depend on the wall clock
+
+
+def _stream(seed, table):
+    return random.Random(f'{seed}:{table}')
+
+
+def _weighted(rng, weights, count):
+    """Draw ``count`` values at once (much faster than one ``choices`` call per row)"""
+    return rng.choices(list(weights), weights=list(weights.values()), k=count)
+
+
+def _chunks(count, chunk_size, make_rows):
+    """Yield lists of ``chunk_size`` rows covering rows ``0..count``
+
+    ``make_rows(start, stop)`` is always called for the same fixed blocks,
+    whatever the chunk size, so the random draws happen in the same order.
+    """
+    def blocks():
+        for start in range(0, count, BLOCK_SIZE):
+            yield from make_rows(start, min(start + BLOCK_SIZE, count))
+
+    rows = blocks()
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _name(rng):
+    return f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+
+
+def _phone(rng):
+    return f'03{rng.randint(0, 4)}{rng.randint(0, 9)}{rng.randint(1000000, 9999999)}'
+
+
+def _address(rng, city):
+    return f'House {rng.randint(1, 999)}, Street {rng.randint(1, 60)}, {rng.choice(AREAS)}, {city}'
+
+
+def _email(name, kind, index):
+    return f'{name.lower().replace(" ", ".")}.{kind}{index}@example.com'
+
+
+def _people(rng, kind, start, stop, min_age, max_age):
+    cities = _weighted(rng, {city: weight for city, (_, _, weight) in CITIES.items()}, stop - start)
+    blood_types = _weighted(rng, BLOOD_TYPE_WEIGHTS, stop - start)
+    rows = []
+    for index, city, blood_type in zip(range(start, stop), cities, blood_types):
+        name = _name(rng)
+        rows.append({
+            'name': name,
+            'email': _email(name, kind, index),
+            'phone': _phone(rng),
+            'age': rng.randint(min_age, max_age),
+            'blood_type': blood_type,
+            'address': _address(rng, city),
+            'emergency_contact': _phone(rng) if rng.random() < 0.5 else None,
+            '_city': city,
+        })
+    return rows
+
+
+def donor_rows(rng, start, stop):
+    """Raw donor records, as ``ingest`` expects them"""
+    rows = _people(rng, 'd', start, stop, 18, 65)
+    for row in rows:
+        latitude, longitude, _ = CITIES[row.pop('_city')]
+        # A few donors never shared a location
+        if rng.random() < 0.9:
+            row['latitude'] = round(rng.gauss(latitude, COORDINATE_SPREAD), 6)
+            row['longitude'] = round(rng.gauss(longitude, COORDINATE_SPREAD), 6)
+        row['is_available'] = rng.random() < AVAILABLE_SHARE
+    return rows
+
+
+def patient_rows(rng, start, stop):
+    """Raw patient records, as ``ingest`` expects them"""
+    rows = _people(rng, 'p', start, stop, 1, 85)
+    for row in rows:
+        del row['_city']
+        row['medical_conditions'] = rng.choice(MEDICAL_CONDITIONS)
+    return rows
+
+
+def emergency_rows(rng, start, stop, patient_ids, now, days):
+    cities = _weighted(rng, {city: weight for city, (_, _, weight) in CITIES.items()}, stop - start)
+    blood_types = _weighted(rng, BLOOD_TYPE_WEIGHTS, stop - start)
+    urgencies = _weighted(rng, URGENCY_WEIGHTS, stop - start)
+    units = _weighted(rng, UNITS_WEIGHTS, stop - start)
+    rows = []
+    for city, blood_type, urgency, units_needed in zip(cities, blood_types, urgencies, units):
+        created_at = now - timedelta(seconds=rng.randrange(days * 86400))
+        rank, at = priority_key(urgency, units_needed, created_at)
+        rows.append({
+            'patient_id': rng.choice(patient_ids) if patient_ids else None,
+            'patient_name': _name(rng),
+            'blood_type': blood_type,
+            'units_needed': units_needed,
+            'urgency': urgency,
+            'hospital': f'{rng.choice(HOSPITALS)} {city}',
+            'contact': _phone(rng),
+            'city': city,
+            'created_at': created_at,
+            'priority_rank': rank,
+            'priority_at': at,
+        })
+    return rows
+
+
+def conversations(rng, count, donor_ids, patient_ids):
+    """``count`` distinct (donor_id, patient_id) pairs, or fewer if there are not enough users"""
+    count = min(count, len(donor_ids) * len(patient_ids))
+    pairs = set()
+    while len(pairs) < count:
+        pairs.add((rng.choice(donor_ids), rng.choice(patient_ids)))
+    return sorted(pairs)
+
+
+def message_rows(rng, start, stop, pairs, first, step):
+    rows = []
+    for index in range(start, stop):
+        # Skewed: a few busy conversations hold most of the messages
+        donor_id, patient_id = pairs[int(len(pairs) * rng.random() ** 3)]
+        sender, receiver = ((donor_id, 'donor'), (patient_id, 'patient'))
+        if rng.random() < 0.5:
+            sender, receiver = receiver, sender
+        rows.append({
+            'sender_id': sender[0], 'sender_type': sender[1],
+            'receiver_id': receiver[0], 'receiver_type': receiver[1],
+            'message': rng.choice(CHAT_LINES),
+            'timestamp': first + step * index,
+            'conversation_key': ChatMessage.make_conversation_key(donor_id, 'donor', patient_id, 'patient'),
+        })
+    return rows
+
+
+def feedback_rows(rng, start, stop, now, days):
+    rows = []
+    for index in range(start, stop):
+        name = _name(rng)
+        rows.append({
+            'name': name,
+            'email': _email(name, 'f', index),
+            'subject': rng.choice(FEEDBACK_SUBJECTS),
+            'message': ' '.join(rng.sample(CHAT_LINES, 3)),
+            'created_at': now - timedelta(seconds=rng.randrange(days * 86400)),
+        })
+    return rows
+
+
+def _new_ids(model, after):
+    return [id for id, in db.session.query(model.id).filter(model.id > after).order_by(model.id)]
+
+
+def _max_id(model):
+    return db.session.query(db.func.max(model.id)).scalar() or 0
+
+
+def _load(model, chunks, defer, on_chunk):
+    """Write pre-built row chunks to ``model``'s table; returns the row count"""
+    table = model.__table__
+    inserted = 0
+    try:
+        with deferred_indexes(model) if defer else nullcontext():
+            for rows in chunks:
+                try:
+                    db.session.connection().execute(table.insert(), rows)
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                    raise
+                inserted += len(rows)
+                if on_chunk:
+                    on_chunk(inserted)
+    finally:
+        bulk_changed(model)
+    return inserted
+
+
+def generate(donors=0, patients=0, emergencies=0, messages=0, feedback=0, seed=42, days=365, now=None,
+             chunk_size=10000, defer=False, password=IMPORTED_PASSWORD, on_table=None, on_chunk=None):
+    """Generate the requested number of rows per table
+
+    ``now`` anchors every timestamp (default ``ANCHOR``). ``password`` is
+    the hash stored for every donor and patient.
+    ``on_table(label, inserted, rejected, seconds)`` is called as each table
+    finishes and ``on_chunk(inserted)`` after each chunk commits. Returns
+    ``{label: inserted}``.
+    """
+    now = now or ANCHOR
+    totals = {}
+
+    def finish(label, inserted, rejected, started):
+        totals[label] = inserted
+        if on_table:
+            on_table(label, inserted, rejected, time.perf_counter() - started)
+
+    def progress(result):
+        if on_chunk:
+            on_chunk(result.inserted)
+
+    started = time.perf_counter()
+    rng = _stream(seed, 'donors')
+    before = _max_id(Donor)
+    result = ingest(Donor, _chunks(donors, chunk_size, lambda a, b: donor_rows(rng, a, b)),
+                    defer=defer, on_chunk=progress, password=password)
+    donor_ids = _new_ids(Donor, before)
+    window = days * 86400
+    record_donations(
+        (donor_id, now - timedelta(seconds=rng.randrange(window)))
+        for donor_id in donor_ids if rng.random() < DONATED_SHARE
+    )
+    finish('donors', result.inserted, len(result.errors), started)
+
+    started = time.perf_counter()
+    rng = _stream(seed, 'patients')
+    before = _max_id(Patient)
+    result = ingest(Patient, _chunks(patients, chunk_size, lambda a, b: patient_rows(rng, a, b)),
+                    defer=defer, on_chunk=progress, password=password)
+    patient_ids = _new_ids(Patient, before)
+    finish('patients', result.inserted, len(result.errors), started)
+
+    # Requests and chats link to this run's users, or to existing ones
+    donor_ids = donor_ids or _new_ids(Donor, 0)
+    patient_ids = patient_ids or _new_ids(Patient, 0)
+
+    started = time.perf_counter()
+    rng = _stream(seed, 'emergencies')
+    inserted = _load(EmergencyRequest, _chunks(
+        emergencies, chunk_size, lambda a, b: emergency_rows(rng, a, b, patient_ids, now, days)
+    ), defer, on_chunk)
+    if inserted:
+        backfill()
+    finish('emergencies', inserted, 0, started)
+
+    started = time.perf_counter()
+    rng = _stream(seed, 'messages')
+    inserted = 0
+    if messages and donor_ids and patient_ids:
+        pairs = conversations(rng, max(1, messages // CONVERSATION_SIZE), donor_ids, patient_ids)
+        step = timedelta(seconds=window / messages)
+        inserted = _load(ChatMessage, _chunks(
+            messages, chunk_size, lambda a, b: message_rows(rng, a, b, pairs, now - timedelta(days=days), step)
+        ), defer, on_chunk)
+    finish('messages', inserted, 0, started)
+
+    started = time.perf_counter()
+    rng = _stream(seed, 'feedback')
+    inserted = _load(Feedback, _chunks(feedback, chunk_size, lambda a, b: feedback_rows(rng, a, b, now, days)),
+                     defer, on_chunk)
+    finish('feedback', inserted, 0, started)
+    return totals
@@ -0,0 +1,94 @@
+"""
+Shared test fixtures for LifeLink Blood Bank Management System
+
+Tests run against the ``testing`` config: an in-memory SQLite database
+created fresh for every test, with the in-process caches emptied so no
+state leaks from one test into the next.
+"""
+
+import os
+import sys
+from datetime import datetime
+
+os.environ['FLASK_ENV'] = 'testing'
+os.environ.pop('TEST_DATABASE_URL', None)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from app import app as flask_app
+from models import db, Donor, Patient, EmergencyRequest, ChatMessage
+from user_cache import user_cache
+from fragment_cache import fragment_cache
+
+
+@pytest.fixture
+def app(monkeypatch):
+    # The fan-out worker thread would share the single in-memory connection
+    monkeypatch.setitem(flask_app.config, 'FANOUT_ENABLED', False)
+    with flask_app.app_context():
+        db.create_all()
+        user_cache.clear()
+        fragment_cache.clear()
+        try:
+            yield flask_app
+        finally:
+            db.session.remove()
+            db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def _add(model, **fields):
+    row = model(**fields)
+    db.session.add(row)
+    db.session.commit()
+    return row
+
+
+@pytest.fixture
+def make_donor(app):
+    counter = iter(range(1, 1000000))
+
+    def make(**fields):
+        n = next(counter)
+        values = {'name': f'Donor {n}', 'email': f'donor{n}@example.com', 'phone': f'0300{n:07d}',
+                  'age': 30, 'password': 'x', 'blood_type': 'O+', 'address': 'Gulberg, Lahore'}
+        values.update(fields)
+        return _add(Donor, **values)
+    return make
+
+
+@pytest.fixture
+def make_patient(app):
+    counter = iter(range(1, 1000000))
+
+    def make(**fields):
+        n = next(counter)
+        values = {'name': f'Patient {n}', 'email': f'patient{n}@example.com', 'phone': f'0311{n:07d}',
+                  'age': 40, 'password': 'x', 'blood_type': 'A+', 'address': 'Saddar, Karachi'}
+        values.update(fields)
+        return _add(Patient, **values)
+    return make
+
+
+@pytest.fixture
+def make_emergency(app):
+    def make(**fields):
+        values = {'patient_name': 'Patient', 'blood_type': 'O+', 'units_needed': 1, 'urgency': 'High',
+                  'hospital': 'Civil Hospital', 'contact': '03001234567', 'city': 'Lahore',
+                  'created_at': datetime(2025, 1, 1)}
+        values.update(fields)
+        return _add(EmergencyRequest, **values)
+    return make
+
+
+@pytest.fixture
+def make_message(app):
+    def make(sender, receiver, text='hello'):
+        (sender_type, sender_id), (receiver_type, receiver_id) = sender, receiver
+        return _add(ChatMessage, sender_id=sender_id, sender_type=sender_type, receiver_id=receiver_id,
+                    receiver_type=receiver_type, message=text)
+    return make
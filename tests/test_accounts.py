@@ -0,0 +1,70 @@
+"""
+Tests for the account index and password rehashing
+"""
+
+from werkzeug.security import generate_password_hash
+from models import db
+from accounts import authenticate, email_registered, find_account, hash_password, needs_rehash
+
+OLD_METHOD = 'pbkdf2:sha256:500'
+
+
+def test_index_follows_user_writes(make_donor, make_patient):
+    donor = make_donor(email='a@example.com')
+    patient = make_patient(email='b@example.com')
+    assert (find_account('a@example.com').user_type, find_account('a@example.com').user_id) == ('donor', donor.id)
+    assert find_account('b@example.com').user_id == patient.id
+
+    donor.email = 'c@example.com'
+    db.session.commit()
+    assert not email_registered('a@example.com') and email_registered('c@example.com')
+    db.session.delete(patient)
+    db.session.commit()
+    assert find_account('b@example.com') is None
+
+
+def test_rolled_back_user_leaves_no_account(make_donor):
+    donor = make_donor(email='a@example.com')
+    donor.email = 'b@example.com'
+    db.session.flush()
+    db.session.rollback()
+    assert email_registered('a@example.com') and not email_registered('b@example.com')
+
+
+def test_authenticate(make_donor):
+    donor = make_donor(email='a@example.com', password=hash_password('secret'))
+    user_type, user = authenticate('a@example.com', 'secret')
+    assert (user_type, user.id) == ('donor', donor.id)
+    assert authenticate('a@example.com', 'wrong') is None
+    assert authenticate('nobody@example.com', 'secret') is None
+
+
+def test_outdated_hash_rehashed_on_login(make_donor):
+    donor = make_donor(email='a@example.com', password=generate_password_hash('secret', method=OLD_METHOD))
+    assert needs_rehash(donor.password)
+    authenticate('a@example.com', 'secret')
+    assert not needs_rehash(donor.password)
+    assert not needs_rehash(find_account('a@example.com').password)
+    assert authenticate('a@example.com', 'secret')[1].id == donor.id
+
+
+def test_failed_rehash_still_logs_in(app, make_donor, monkeypatch, caplog):
+    donor = make_donor(email='a@example.com', password=generate_password_hash('secret', method=OLD_METHOD))
+    old_hash = donor.password
+
+    def fail():
+        raise RuntimeError('database is locked')
+    with monkeypatch.context() as patch:
+        patch.setattr(db.session, 'commit', fail)
+        assert authenticate('a@example.com', 'secret')[1].id == donor.id
+    db.session.expire_all()
+    assert find_account('a@example.com').password == old_hash
+    assert 'password rehash for donor' in caplog.text
+
+
+def test_login_route(client, make_donor):
+    make_donor(email='a@example.com', password=hash_password('secret'))
+    response = client.post('/login', data={'email': 'a@example.com', 'password': 'secret'})
+    assert response.status_code == 302 and response.location.endswith('/dashboard/donor')
+    response = client.post('/login', data={'email': 'a@example.com', 'password': 'nope'})
+    assert response.status_code == 200 and b'Invalid credentials' in response.data
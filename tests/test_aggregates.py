@@ -0,0 +1,93 @@
+"""
+Tests for the cached admin dashboard aggregates
+"""
+
+import threading
+import time
+import pytest
+from aggregates import AdminAggregates
+
+
+@pytest.fixture
+def aggregates(app):
+    return AdminAggregates()
+
+
+def test_compute(aggregates, make_donor, make_patient, make_emergency):
+    make_donor(blood_type='O-', is_available=True)
+    make_donor(blood_type='O-', is_available=False)
+    make_patient()
+    make_emergency(blood_type='O-', urgency='Critical', city='lahore')
+    make_emergency(blood_type='A+', urgency='High', city='Lahore ')
+    make_emergency(blood_type='A+', urgency='High', city='Karachi')
+    data = aggregates.compute()
+    assert data['totals'] | {'computed_at': None} == {
+        'total_donors': 2, 'active_donors': 1, 'total_patients': 1, 'total_emergencies': 3,
+        'active_emergencies': 3, 'fulfilled_emergencies': 0, 'cities_covered': 2, 'computed_at': None}
+    assert data['requests_by_urgency'] == {'High': 2, 'Critical': 1}
+    assert data['blood_types']['O-'] == {'donors': 2, 'available_donors': 1, 'requests': 1}
+    assert data['top_cities'] == [('Lahore', 2), ('Karachi', 1)]
+    assert len(data['recent_emergencies']) == 3 and len(data['recent_donors']) == 2
+
+
+def test_cached_for_ttl(aggregates, make_donor):
+    first = aggregates.get()
+    make_donor()
+    assert aggregates.get() is first
+    assert aggregates.stats()['cached'] and aggregates.computations == 1
+    aggregates.invalidate()
+    assert aggregates.get()['totals']['total_donors'] == 1
+    assert aggregates.computations == 2
+
+
+def test_first_load_waits_for_one_computation(app, aggregates, monkeypatch):
+    started = threading.Event()
+
+    def compute():
+        started.set()
+        time.sleep(0.05)
+        return {'value': 1}
+    monkeypatch.setattr(aggregates, 'compute', compute)
+    results = []
+
+    def get():
+        with app.app_context():
+            results.append(aggregates.get())
+    threads = [threading.Thread(target=get) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [{'value': 1}] * 8
+    assert aggregates.computations == 1
+
+
+def test_expired_value_served_while_one_caller_refreshes(app, aggregates, monkeypatch):
+    values = iter([{'value': 1}, {'value': 2}])
+    release = threading.Event()
+    refreshing = threading.Event()
+
+    def compute():
+        value = next(values)
+        if value['value'] == 2:
+            refreshing.set()
+            release.wait(5)
+        return value
+    monkeypatch.setattr(aggregates, 'compute', compute)
+    assert aggregates.get() == {'value': 1}
+    aggregates.invalidate()
+
+    def refresh():
+        with app.app_context():
+            aggregates.get()
+    refresher = threading.Thread(target=refresh)
+    refresher.start()
+    refreshing.wait(5)
+    try:
+        # Another caller does not wait for the refresh or start a second one
+        assert aggregates.get() == {'value': 1}
+    finally:
+        release.set()
+        refresher.join()
+    assert aggregates.get() == {'value': 2}
+    assert aggregates.computations == 2
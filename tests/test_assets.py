@@ -0,0 +1,107 @@
+"""
+Tests for the fingerprinted static asset pipeline
+"""
+
+import gzip
+import json
+import os
+import pytest
+from flask import Flask
+from assets import MANIFEST, AssetPipeline, asset_pipeline
+
+SCRIPT = 'console.log("lifelink");\n' * 40
+
+
+@pytest.fixture
+def static(tmp_path):
+    (tmp_path / 'js').mkdir()
+    (tmp_path / 'js' / 'app.js').write_text(SCRIPT)
+    (tmp_path / 'css').mkdir()
+    (tmp_path / 'css' / 'tiny.css').write_text('body{}')
+    (tmp_path / 'uploads').mkdir()
+    (tmp_path / 'uploads' / 'report.pdf').write_bytes(b'%PDF')
+    return tmp_path
+
+
+@pytest.fixture
+def pipeline(app, static, monkeypatch):
+    # Point the app's pipeline (and its /assets/ route) at the temporary folder
+    monkeypatch.setattr(asset_pipeline, 'static_folder', str(static))
+    monkeypatch.setattr(asset_pipeline, 'output_dir', str(static / 'dist'))
+    monkeypatch.setattr(asset_pipeline, 'skip', {'dist', 'uploads'})
+    monkeypatch.setattr(asset_pipeline, 'manifest', {})
+    monkeypatch.setattr(asset_pipeline, '_served', set())
+    return asset_pipeline
+
+
+def outputs(static):
+    dist = static / 'dist'
+    return sorted(str(path.relative_to(dist)).replace(os.sep, '/') for path in dist.rglob('*') if path.is_file())
+
+
+def test_build_writes_hashed_copies_and_manifest(pipeline, static):
+    manifest = pipeline.build()
+    assert set(manifest) == {'js/app.js', 'css/tiny.css'}
+    hashed = manifest['js/app.js']
+    assert hashed.startswith('js/app.') and hashed.endswith('.js') and len(hashed) == len('js/app.js') + 11
+    assert (static / 'dist' / hashed).read_text() == SCRIPT
+    assert gzip.decompress((static / 'dist' / (hashed + '.gz')).read_bytes()).decode() == SCRIPT
+    # Too small to be worth compressing
+    assert not (static / 'dist' / (manifest['css/tiny.css'] + '.gz')).exists()
+    assert json.loads((static / 'dist' / MANIFEST).read_text()) == manifest
+
+
+def test_build_prunes_all_but_previous_generation(pipeline, static):
+    first = pipeline.build()['js/app.js']
+    (static / 'js' / 'app.js').write_text(SCRIPT + '// v2\n')
+    second = pipeline.build()['js/app.js']
+    assert first in outputs(static) and second in outputs(static)
+    (static / 'js' / 'app.js').write_text(SCRIPT + '// v3\n')
+    third = pipeline.build()['js/app.js']
+    files = outputs(static)
+    assert first not in files and first + '.gz' not in files
+    assert second in files and third in files
+    # Rebuilding unchanged files leaves only the current generation
+    pipeline.build()
+    assert all(name.startswith(third) for name in outputs(static) if name.startswith('js/'))
+
+
+def test_startup_builds_only_when_asked(static):
+    site = Flask('site', static_folder=str(static))
+    pipeline = AssetPipeline()
+    pipeline.init_app(site)
+    assert pipeline.manifest == {} and not (static / 'dist').exists()
+
+    site = Flask('site', static_folder=str(static))
+    site.config['ASSETS_AUTO_BUILD'] = True
+    pipeline = AssetPipeline()
+    pipeline.init_app(site)
+    assert set(pipeline.manifest) == {'js/app.js', 'css/tiny.css'}
+
+
+def test_testing_config_does_not_build(app):
+    assert not app.config['ASSETS_AUTO_BUILD']
+
+
+def test_url_falls_back_to_static(app, pipeline):
+    with app.test_request_context():
+        assert pipeline.url('js/app.js') == '/static/js/app.js'
+        pipeline.build()
+        assert pipeline.url('js/app.js') == '/assets/' + pipeline.manifest['js/app.js']
+
+
+def test_serve_precompressed_and_immutable(pipeline, client):
+    hashed = pipeline.build()['js/app.js']
+    response = client.get('/assets/' + hashed, headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert {'public', 'immutable', 'max-age=31536000'} <= set(response.headers['Cache-Control'].split(', '))
+    assert gzip.decompress(response.data).decode() == SCRIPT
+    response.close()
+
+    response = client.get('/assets/' + hashed, headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in response.headers and response.get_data(as_text=True) == SCRIPT
+    response.close()
+    assert client.get('/assets/js/app.js').status_code == 404
+    assert client.get('/assets/' + MANIFEST).status_code == 404
@@ -0,0 +1,61 @@
+"""
+Tests for the chat history pages
+"""
+
+import pytest
+
+DONOR, PATIENT = ('donor', 1), ('patient', 1)
+ARGS = {'user1': 1, 'type1': 'donor', 'user2': 1, 'type2': 'patient'}
+
+
+def history(client, **args):
+    response = client.get('/chat/history', query_string={**ARGS, **args})
+    assert response.status_code == 200
+    return [m['id'] for m in response.get_json()]
+
+
+@pytest.fixture
+def conversation(make_message):
+    return [make_message(*((DONOR, PATIENT) if n % 2 else (PATIENT, DONOR)), text=f'message {n}').id
+            for n in range(5)]
+
+
+def test_latest_page_oldest_first(client, conversation):
+    assert history(client, limit=2) == conversation[-2:]
+
+
+def test_before_id_walks_back_to_the_start(client, conversation):
+    seen, before = [], None
+    while True:
+        page = history(client, limit=2, **({'before_id': before} if before else {}))
+        if not page:
+            break
+        seen[:0] = page
+        before = page[0]
+    assert seen == conversation
+
+
+def test_before_id_is_exclusive(client, conversation):
+    assert history(client, before_id=conversation[2]) == conversation[:2]
+    assert history(client, before_id=conversation[0]) == []
+
+
+def test_direction_and_other_conversations(client, conversation, make_message):
+    make_message(DONOR, ('patient', 2))
+    make_message(('donor', 2), PATIENT)
+    swapped = {'user1': 1, 'type1': 'patient', 'user2': 1, 'type2': 'donor'}
+    assert history(client, **swapped) == conversation
+    assert history(client, user1='01') == conversation
+
+
+@pytest.mark.parametrize('args', [
+    {'user1': 'x'},
+    {'user2': ''},
+    {'type1': 'admin'},
+    {'type2': None},
+])
+def test_invalid_conversation_is_rejected(client, args):
+    query = {key: value for key, value in {**ARGS, **args}.items() if value is not None}
+    response = client.get('/chat/history', query_string=query)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
@@ -0,0 +1,89 @@
+"""
+Tests for write-behind chat persistence
+"""
+
+from datetime import datetime
+import pytest
+from models import db, ChatMessage
+from chat_writer import ChatWriter, _STOP
+
+
+@pytest.fixture
+def writer(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'CHAT_WRITE_QUEUE_SIZE', 10)
+    monkeypatch.setitem(app.config, 'CHAT_WRITE_BATCH_SIZE', 4)
+    monkeypatch.setitem(app.config, 'CHAT_WRITE_FLUSH_INTERVAL', 0)
+    monkeypatch.setitem(app.config, 'CHAT_WRITE_RETRY_DELAY', 0)
+    writer = ChatWriter()
+    writer.init_app(app)
+    yield writer
+    # Nothing left for the exit-time flush once the database is gone
+    writer._queue.queue.clear()
+
+
+def row(n, **fields):
+    values = {'sender_id': 1, 'sender_type': 'donor', 'receiver_id': 2, 'receiver_type': 'patient',
+              'message': f'message {n}', 'timestamp': datetime(2025, 1, 1),
+              'conversation_key': ChatMessage.make_conversation_key(1, 'donor', 2, 'patient')}
+    values.update(fields)
+    return values
+
+
+def stored():
+    return [message.message for message in ChatMessage.query.order_by(ChatMessage.id)]
+
+
+def test_next_batch_stops_at_batch_size_and_stop(writer):
+    for n in range(1, 6):
+        writer._queue.put(row(n))
+    batch, stop = writer._next_batch(row(0))
+    assert [r['message'] for r in batch] == ['message 0', 'message 1', 'message 2', 'message 3']
+    assert not stop
+    writer._queue.put(_STOP)
+    batch, stop = writer._next_batch(row(9))
+    assert [r['message'] for r in batch] == ['message 9', 'message 4', 'message 5'] and stop
+
+
+def test_flush_writes_one_batch(writer, monkeypatch):
+    inserts = []
+    insert = writer._insert
+    monkeypatch.setattr(writer, '_insert', lambda rows: (inserts.append(len(rows)), insert(rows)))
+    for n in range(3):
+        writer._queue.put(row(n))
+    writer.flush()
+    assert inserts == [3]
+    assert stored() == ['message 0', 'message 1', 'message 2']
+    assert writer.written == 3 and writer.failed == 0
+
+
+def test_submit_reports_full_queue(writer, monkeypatch):
+    monkeypatch.setattr(writer, '_ensure_started', lambda: None)
+    assert all(writer.submit(row(n)) for n in range(10))
+    assert not writer.submit(row(10))
+
+
+def test_failed_batch_falls_back_to_single_rows(app, writer, monkeypatch):
+    monkeypatch.setitem(app.config, 'CHAT_WRITE_RETRIES', 1)
+    attempts = []
+    insert = writer._insert
+    monkeypatch.setattr(writer, '_insert', lambda rows: (attempts.append(len(rows)), insert(rows)))
+    writer._write([row(0), row(1, message=None), row(2)])
+    assert attempts == [3, 3, 1, 1, 1]
+    assert stored() == ['message 0', 'message 2']
+    assert (writer.written, writer.failed) == (2, 1)
+
+
+def test_background_thread_persists_on_shutdown(writer):
+    for n in range(6):
+        assert writer.submit(row(n))
+    writer.shutdown()
+    db.session.expire_all()
+    assert stored() == [f'message {n}' for n in range(6)]
+    assert writer.written == 6
+
+
+def test_disabled_by_default(app):
+    writer = ChatWriter()
+    assert not writer.enabled
+    writer.init_app(app)
+    assert writer.enabled == app.config['CHAT_WRITE_BEHIND']
@@ -0,0 +1,75 @@
+"""
+Tests for the blood compatibility index
+"""
+
+import pytest
+from config import Config
+from models import db, Donor
+from hooks import bulk_changed
+from compatibility import (BLOOD_TYPES, can_donate, donor_types_for, recipient_types_for,
+                           donor_type_index)
+
+
+@pytest.fixture
+def index(app):
+    donor_type_index.reset()
+    yield donor_type_index
+    donor_type_index.reset()
+
+
+@pytest.mark.parametrize('donor_type', BLOOD_TYPES)
+def test_masks_match_config(donor_type):
+    recipients = Config.BLOOD_COMPATIBILITY[donor_type]
+    assert sorted(recipient_types_for(donor_type)) == sorted(recipients)
+    for recipient_type in BLOOD_TYPES:
+        assert can_donate(donor_type, recipient_type) == (recipient_type in recipients)
+        assert (donor_type in donor_types_for(recipient_type)) == (recipient_type in recipients)
+
+
+def test_unknown_types():
+    assert not can_donate('XX', 'O+')
+    assert not can_donate('O-', 'XX')
+    assert donor_types_for('XX') == [] and recipient_types_for('XX') == []
+
+
+def test_donors_for(index, make_donor):
+    o_neg = make_donor(blood_type='O-')
+    a_pos = make_donor(blood_type='A+')
+    make_donor(blood_type='B+')
+    resting = make_donor(blood_type='A-', is_available=False)
+    assert index.donors_for('A+') == {o_neg.id, a_pos.id}
+    assert index.donors_for('A+', available_only=False) == {o_neg.id, a_pos.id, resting.id}
+    assert index.count_for('O-') == 1
+
+
+def test_commits_update_loaded_index(index, make_donor):
+    donor = make_donor(blood_type='A+')
+    assert index.donors_for('A+') == {donor.id}
+    donor.blood_type = 'B+'
+    db.session.commit()
+    assert index.donors_for('A+') == set() and index.donors_for('B+') == {donor.id}
+    donor.is_available = False
+    db.session.commit()
+    assert index.donors_for('B+') == set()
+    db.session.delete(donor)
+    db.session.commit()
+    assert index.donors_for('B+', available_only=False) == set()
+
+
+def test_bulk_change_reloads(index, make_donor):
+    make_donor(blood_type='A+')
+    assert index.count_for('A+') == 1
+    db.session.execute(Donor.__table__.update().values(is_available=False))
+    db.session.commit()
+    assert index.count_for('A+') == 1
+    bulk_changed(Donor)
+    assert index.count_for('A+') == 0
+
+
+def test_ttl_reload(app, index, make_donor, monkeypatch):
+    make_donor(blood_type='A+')
+    assert index.count_for('A+') == 1
+    db.session.execute(Donor.__table__.update().values(is_available=False))
+    db.session.commit()
+    monkeypatch.setitem(app.config, 'DONOR_TYPE_INDEX_TTL', 0)
+    assert index.count_for('A+') == 0
@@ -0,0 +1,102 @@
+"""
+Tests for the DatabaseManager connection pool and transactions
+"""
+
+import sqlite3
+import threading
+import pytest
+from database import DatabaseManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = DatabaseManager(str(tmp_path / 'blood_bank.db'), pool_size=2)
+    yield manager
+    manager.close()
+
+
+def user(n, user_type='donor'):
+    return {'name': f'User {n}', 'email': f'user{n}@example.com', 'phone': f'0300{n:07d}',
+            'user_type': user_type, 'blood_type': 'O+', 'city': 'Lahore'}
+
+
+def test_schema_created_on_first_use(manager):
+    with manager.connection() as conn:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert {'users', 'donors', 'blood_donations', 'notifications', 'notification_counters'} <= tables
+
+
+def test_nested_blocks_share_a_connection(manager):
+    with manager.connection() as outer:
+        with manager.connection() as inner:
+            assert inner is outer
+    with manager.connection() as again:
+        assert again is outer
+    assert manager._opened == 1
+
+
+def test_pool_is_bounded(manager, monkeypatch):
+    monkeypatch.setattr(DatabaseManager, 'POOL_TIMEOUT', 0.05)
+    held, release = threading.Barrier(3), threading.Event()
+
+    def hold():
+        with manager.connection():
+            held.wait()
+            release.wait()
+
+    threads = [threading.Thread(target=hold) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    held.wait()
+    try:
+        with pytest.raises(sqlite3.OperationalError, match='timed out'):
+            with manager.connection():
+                pass
+    finally:
+        release.set()
+        for thread in threads:
+            thread.join()
+    assert manager._opened == 2
+
+
+def test_many_threads_reuse_pooled_connections(manager):
+    threads = [threading.Thread(target=manager.get_user_by_id, args=(1,)) for _ in range(50)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert manager._opened <= 2
+    manager.close()
+    assert manager._opened == 0
+
+
+def test_transaction_commits_and_creates_donor_row(manager):
+    user_id = manager.insert_user(user(1))
+    assert manager.get_user_by_id(user_id)['email'] == 'user1@example.com'
+    with manager.connection() as conn:
+        assert conn.execute('SELECT COUNT(*) FROM donors WHERE user_id = ?', (user_id,)).fetchone()[0] == 1
+
+
+def test_failed_transaction_rolls_back(manager):
+    with pytest.raises(RuntimeError):
+        with manager.transaction() as conn:
+            conn.execute("INSERT INTO users (name, email, phone, user_type) VALUES ('a', 'a@example.com', '0', 'donor')")
+            raise RuntimeError
+    assert manager.get_user_by_email('a@example.com') is None
+
+
+def test_nested_transaction_joins_outer(manager):
+    with pytest.raises(RuntimeError):
+        with manager.transaction():
+            manager.insert_user(user(1))
+            raise RuntimeError
+    assert manager.get_user_by_email('user1@example.com') is None
+
+
+def test_open_transaction_rolled_back_on_return(manager):
+    with manager.connection() as conn:
+        conn.execute('BEGIN')
+        conn.execute("INSERT INTO users (name, email, phone, user_type) VALUES ('a', 'a@example.com', '0', 'donor')")
+    with manager.connection() as conn:
+        assert not conn.in_transaction
+    assert manager.get_user_by_email('a@example.com') is None
@@ -0,0 +1,101 @@
+"""
+Tests for the donor full-text index and its migration
+"""
+
+import os
+import subprocess
+import sys
+import sqlite3
+import pytest
+from sqlalchemy import text
+from models import db, Donor
+from donor_search import create_fts_index, filter_by_text, fts_available, reset_fts_state
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def fts(app):
+    create_fts_index(db.session.connection())
+    db.session.commit()
+    reset_fts_state()
+    assert fts_available()
+    try:
+        yield
+    finally:
+        # The in-memory database outlives drop_all, so remove the index too
+        db.session.rollback()
+        db.session.execute(text('DROP TABLE IF EXISTS donor_fts'))
+        db.session.commit()
+        reset_fts_state()
+
+
+def search(name=None, city=None):
+    query, key = filter_by_text(db.session.query(Donor.id), name=name, city=city)
+    return sorted(row.id for row in query.order_by(key))
+
+
+def test_prefix_search(fts, make_donor):
+    ayesha = make_donor(name='Ayesha Khan', address='Gulberg, Lahore')
+    make_donor(name='Bilal Ahmed', address='Clifton, Karachi')
+    assert search(name='aye') == [ayesha.id]
+    assert search(name='khan ayesha') == [ayesha.id]
+    assert search(city='lah') == [ayesha.id]
+    assert search(name='ayesha', city='karachi') == []
+
+
+def test_triggers_follow_writes(fts, make_donor):
+    donor = make_donor(name='Ayesha Khan')
+    donor.name = 'Sara Malik'
+    db.session.commit()
+    assert search(name='ayesha') == []
+    assert search(name='sara') == [donor.id]
+    db.session.delete(donor)
+    db.session.commit()
+    assert search(name='sara') == []
+
+
+def test_index_built_over_existing_rows(app, make_donor):
+    donor = make_donor(name='Ayesha Khan')
+    create_fts_index(db.session.connection())
+    db.session.commit()
+    try:
+        assert db.session.execute(text(
+            "SELECT rowid FROM donor_fts WHERE donor_fts MATCH 'ayesha'")).scalars().all() == [donor.id]
+    finally:
+        db.session.execute(text('DROP TABLE donor_fts'))
+        db.session.commit()
+
+
+def test_value_without_terms_still_filters(fts, make_donor):
+    odd = make_donor(name='@@')
+    make_donor(name='Ayesha Khan')
+    assert search(name='@@') == [odd.id]
+
+
+def test_ilike_fallback_without_index(app, make_donor):
+    reset_fts_state()
+    assert not fts_available()
+    ayesha = make_donor(name='Ayesha Khan')
+    make_donor(name='Bilal Ahmed')
+    assert search(name='yesh') == [ayesha.id]
+
+
+def flask_db(database, *args):
+    env = dict(os.environ, FLASK_APP='app.py', FLASK_ENV='testing', TEST_DATABASE_URL=f'sqlite:///{database}')
+    return subprocess.run([sys.executable, '-m', 'flask', 'db', *args], cwd=ROOT, env=env,
+                          capture_output=True, text=True)
+
+
+def test_migration_creates_index_and_autogenerate_ignores_it(tmp_path):
+    database = tmp_path / 'migrated.db'
+    result = flask_db(database, 'upgrade')
+    assert result.returncode == 0, result.stderr
+    conn = sqlite3.connect(database)
+    try:
+        names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE name LIKE 'donor_fts%'")}
+        assert {'donor_fts', 'donor_fts_ai', 'donor_fts_ad', 'donor_fts_au'} <= names
+    finally:
+        conn.close()
+    result = flask_db(database, 'check')
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,64 @@
+"""
+Tests for the donor search keyset pages
+"""
+
+import pytest
+
+
+def search(client, **args):
+    response = client.get('/api/search/donors', query_string=args)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def walk(client, **args):
+    """Every page of a search as a list of id lists"""
+    pages, after = [], None
+    while True:
+        page = search(client, **args, **({'after': after} if after is not None else {}))
+        pages.append([d['id'] for d in page['donors']])
+        if not page['has_more']:
+            assert page['next_cursor'] is None
+            return pages
+        assert page['next_cursor'] == pages[-1][-1]
+        after = page['next_cursor']
+
+
+@pytest.mark.parametrize('limit', [1, 2, 3, 5, 6])
+def test_pages_cover_every_donor_once(client, make_donor, limit):
+    ids = [make_donor().id for _ in range(5)]
+    pages = walk(client, limit=limit)
+    assert [donor_id for page in pages for donor_id in page] == ids
+    assert all(len(page) == limit for page in pages[:-1])
+
+
+def test_exact_multiple_has_no_empty_last_page(client, make_donor):
+    for _ in range(4):
+        make_donor()
+    pages = walk(client, limit=2)
+    assert [len(page) for page in pages] == [2, 2]
+
+
+def test_after_is_exclusive(client, make_donor):
+    ids = [make_donor().id for _ in range(3)]
+    assert [d['id'] for d in search(client, after=ids[0])['donors']] == ids[1:]
+    assert search(client, after=ids[-1]) == {'success': True, 'donors': [], 'count': 0,
+                                              'has_more': False, 'next_cursor': None}
+
+
+def test_after_skips_filtered_out_gaps(client, make_donor):
+    a = make_donor(blood_type='A+')
+    make_donor(blood_type='B+')
+    make_donor(blood_type='B+')
+    c = make_donor(blood_type='A+')
+    page = search(client, blood_type='A+', limit=1)
+    assert [d['id'] for d in page['donors']] == [a.id] and page['next_cursor'] == a.id
+    page = search(client, blood_type='A+', limit=1, after=a.id)
+    assert [d['id'] for d in page['donors']] == [c.id] and not page['has_more']
+
+
+def test_cursor_walk_with_name_filter(client, make_donor):
+    ids = [make_donor(name=f'Sara Khan {n}').id for n in range(3)]
+    make_donor(name='Omar Butt')
+    pages = walk(client, q='sara', limit=2)
+    assert [donor_id for page in pages for donor_id in page] == ids
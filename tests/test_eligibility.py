@@ -0,0 +1,91 @@
+"""
+Tests for donor eligibility dates
+"""
+
+from datetime import datetime, timedelta
+
+from models import db, Donor, NEVER_DONATED
+from eligibility import record_donation, record_donations, check_eligibility, eligible_now
+from commands import _donation_dates
+
+INTERVAL = timedelta(days=56)
+DONATED = datetime(2025, 3, 1, 9, 30)
+
+
+def test_first_time_donor_is_eligible(make_donor):
+    donor = make_donor()
+    assert donor.next_eligible_date == NEVER_DONATED
+    assert Donor.query.filter(eligible_now(DONATED)).count() == 1
+
+
+def test_record_donation_sets_both_dates(make_donor):
+    donor = make_donor()
+    record_donation(donor, DONATED)
+    db.session.commit()
+    assert (donor.last_donation_date, donor.next_eligible_date) == (DONATED, DONATED + INTERVAL)
+    assert Donor.query.filter(eligible_now(DONATED + INTERVAL - timedelta(seconds=1))).count() == 0
+    assert Donor.query.filter(eligible_now(DONATED + INTERVAL)).count() == 1
+
+
+def test_record_donation_ignores_back_dated(make_donor):
+    donor = make_donor()
+    record_donation(donor, DONATED)
+    record_donation(donor, DONATED - timedelta(days=10))
+    assert donor.last_donation_date == DONATED
+
+
+def test_interval_follows_config(app, make_donor, monkeypatch):
+    monkeypatch.setitem(app.config, 'MIN_DONATION_INTERVAL_DAYS', 90)
+    donor = make_donor()
+    record_donation(donor, DONATED)
+    assert donor.next_eligible_date == DONATED + timedelta(days=90)
+
+
+def test_record_donations_keeps_latest_per_donor(make_donor):
+    first, second, untouched = make_donor(), make_donor(), make_donor()
+    updated = record_donations([
+        (first.id, DONATED), (first.id, DONATED + timedelta(days=3)), (first.id, DONATED - timedelta(days=3)),
+        (second.id, DONATED),
+    ])
+    assert updated == 2
+    db.session.expire_all()
+    assert first.last_donation_date == DONATED + timedelta(days=3)
+    assert first.next_eligible_date == DONATED + timedelta(days=3) + INTERVAL
+    assert second.next_eligible_date == DONATED + INTERVAL
+    assert (untouched.last_donation_date, untouched.next_eligible_date) == (None, NEVER_DONATED)
+
+
+def test_record_donations_never_moves_dates_backwards(make_donor):
+    donor = make_donor()
+    record_donations([(donor.id, DONATED)])
+    assert record_donations([(donor.id, DONATED - timedelta(days=1)), (donor.id, DONATED)]) == 0
+    db.session.expire_all()
+    assert donor.last_donation_date == DONATED
+
+
+def test_record_donations_empty_and_unknown(make_donor):
+    assert record_donations([]) == 0
+    assert record_donations([(999, DONATED)]) == 0
+
+
+def test_check_eligibility(app, make_donor):
+    recent, old, too_young = make_donor(), make_donor(), make_donor(age=16)
+    record_donations([(recent.id, DONATED), (old.id, DONATED - INTERVAL)])
+    results = check_eligibility([recent.id, old.id, too_young.id, 999], now=DONATED)
+    assert set(results) == {recent.id, old.id, too_young.id}
+    assert results[recent.id]['eligible'] is False and results[recent.id]['time_eligible'] is False
+    assert results[recent.id]['next_eligible_date'] == DONATED + INTERVAL
+    assert results[old.id]['eligible'] is True
+    assert results[too_young.id] == {'eligible': False, 'age_eligible': False, 'time_eligible': True,
+                                     'next_eligible_date': None}
+
+
+def test_ingested_donation_dates_skip_rejected_and_unparsable_rows():
+    chunk = [
+        {'donor_id': '1', 'donation_date': '2025-03-01T09:30:00'},
+        {'donor_id': '2', 'donation_date': '2025-03-02'},
+        {'donor_id': '3', 'donation_date': 'yesterday'},
+        {'donor_id': 'x', 'donation_date': '2025-03-03'},
+        {'donor_id': '5', 'donation_date': ' 2025-03-04 '},
+    ]
+    assert _donation_dates(chunk, [(1, 'rejected')]) == [(1, DONATED), (5, datetime(2025, 3, 4))]
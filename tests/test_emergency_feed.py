@@ -0,0 +1,90 @@
+"""
+Tests for the live emergency feed and its catch-up endpoint
+"""
+
+from datetime import datetime
+import pytest
+from app import socketio
+from models import db
+from emergency_feed import EMERGENCY_FEED_EVENT, EMERGENCY_FEED_ROOM, emergency_feed, serialize_emergency
+
+
+@pytest.fixture
+def listener(app, client):
+    socket = socketio.test_client(app, flask_test_client=client)
+    socket.emit('join_room', {'room': EMERGENCY_FEED_ROOM})
+    yield socket
+    socket.disconnect()
+
+
+def updates(socket):
+    return [(event['args'][0]['operation'], event['args'][0]['emergency']['id'])
+            for event in socket.get_received() if event['name'] == EMERGENCY_FEED_EVENT]
+
+
+def test_committed_changes_pushed_to_room(listener, make_emergency):
+    request = make_emergency(urgency='High')
+    request.urgency = 'Critical'
+    db.session.commit()
+    request_id = request.id
+    db.session.delete(request)
+    db.session.commit()
+    assert updates(listener) == [('insert', request_id), ('update', request_id), ('delete', request_id)]
+
+
+def test_rolled_back_changes_not_pushed(listener, make_emergency):
+    request = make_emergency()
+    listener.get_received()
+    request.urgency = 'Low'
+    db.session.flush()
+    db.session.rollback()
+    assert updates(listener) == []
+
+
+def test_publish_failure_logged(app, make_emergency, monkeypatch, caplog):
+    def fail(*args, **kwargs):
+        raise RuntimeError('socket down')
+    monkeypatch.setattr(emergency_feed.socketio, 'emit', fail)
+    make_emergency()
+    assert 'emergency feed publish failed' in caplog.text
+
+
+def test_serialize_emergency(make_emergency):
+    request = make_emergency(created_at=datetime(2025, 1, 2, 3, 4, 5))
+    data = serialize_emergency(request)
+    assert data['created_at'] == '2025-01-02T03:04:05'
+    assert serialize_emergency({'id': 1, 'city': 'Lahore'})['city'] == 'Lahore'
+
+
+def active(client, **args):
+    response = client.get('/emergency/api/emergency/active', query_string=args)
+    return response.status_code, response.get_json()
+
+
+def test_catch_up_since_id(app, client, make_emergency, monkeypatch):
+    monkeypatch.setitem(app.config, 'EMERGENCY_FEED_LIMIT', 2)
+    ids = [make_emergency().id for _ in range(5)]
+    _, newest = active(client)
+    assert [e['id'] for e in newest['emergencies']] == ids[:-3:-1] and newest['has_more']
+
+    _, page = active(client, since=ids[0])
+    assert [e['id'] for e in page['emergencies']] == ids[1:3]
+    assert page['has_more'] and page['latest_id'] == ids[2]
+    _, page = active(client, since=page['latest_id'])
+    assert [e['id'] for e in page['emergencies']] == ids[3:]
+    assert not page['has_more']
+    _, page = active(client, since=ids[-1])
+    assert page['emergencies'] == [] and page['latest_id'] == ids[-1]
+
+
+def test_catch_up_since_timestamp(client, make_emergency):
+    make_emergency(created_at=datetime(2025, 1, 1))
+    later = make_emergency(created_at=datetime(2025, 1, 3))
+    _, page = active(client, since='2025-01-02T00:00:00Z')
+    assert [e['id'] for e in page['emergencies']] == [later.id]
+    assert active(client, since='yesterday')[0] == 400
+
+
+def test_every_page_loads_the_feed_script(client):
+    html = client.get('/donors').get_data(as_text=True)
+    assert 'js/emergency_feed.' in html and 'data-signed-in="false"' in html
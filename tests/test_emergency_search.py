@@ -0,0 +1,96 @@
+"""
+Tests for emergency request filtering and keyset pagination
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from models import EmergencyRequest
+from emergency_search import (encode_cursor, decode_cursor, filter_requests, paginate, capped_count,
+                              SORTS)
+
+BASE = datetime(2025, 1, 1)
+
+
+@pytest.fixture
+def requests(make_emergency):
+    # Ties on every sort key except the id: same urgency, units and created_at
+    rows = []
+    for n in range(7):
+        rows.append(make_emergency(urgency='Critical' if n % 3 == 0 else 'High',
+                                   created_at=BASE + timedelta(hours=n // 2),
+                                   city='Lahore' if n % 2 else 'Karachi'))
+    return rows
+
+
+def walk(query, sort, limit):
+    pages, after = [], None
+    while True:
+        page, after = paginate(query, sort, after, limit)
+        pages.append([r.id for r in page])
+        if after is None:
+            return pages
+
+
+def expected(rows, sort):
+    columns, descending = SORTS[sort]
+    return [r.id for r in sorted(rows, key=lambda r: tuple(getattr(r, c.key) for c in columns),
+                                 reverse=descending)]
+
+
+@pytest.mark.parametrize('sort', list(SORTS))
+@pytest.mark.parametrize('limit', [1, 2, 3, 7, 8])
+def test_pages_follow_the_sort_without_gaps_or_repeats(requests, sort, limit):
+    pages = walk(EmergencyRequest.query, sort, limit)
+    assert [request_id for page in pages for request_id in page] == expected(requests, sort)
+    assert all(len(page) == limit for page in pages[:-1])
+    assert pages[-1]
+
+
+def test_exact_multiple_has_no_empty_last_page(make_emergency):
+    for _ in range(4):
+        make_emergency()
+    assert [len(page) for page in walk(EmergencyRequest.query, 'priority', 2)] == [2, 2]
+
+
+def test_filtered_pages(requests):
+    query = filter_requests(EmergencyRequest.query, city='lahore')
+    lahore = [r for r in requests if r.city == 'Lahore']
+    pages = walk(query, 'newest', 2)
+    assert [request_id for page in pages for request_id in page] == expected(lahore, 'newest')
+
+
+def test_city_is_stored_normalized(make_emergency):
+    request = make_emergency(city='  lAHORE ')
+    assert request.city == 'Lahore'
+    assert filter_requests(EmergencyRequest.query, city='LAHORE').all() == [request]
+
+
+@pytest.mark.parametrize('sort', list(SORTS))
+def test_cursor_round_trip(requests, sort):
+    columns = SORTS[sort][0]
+    values = [getattr(requests[3], column.key) for column in columns]
+    assert decode_cursor(encode_cursor(values), sort) == values
+
+
+@pytest.mark.parametrize('cursor', ['', 'not base64 !', encode_cursor([1]), encode_cursor({'a': 1}),
+                                    encode_cursor(['x', '2025-01-01T00:00:00'])])
+def test_malformed_cursor(app, cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, 'newest')
+
+
+def test_dashboard_redirects_on_bad_cursor(client, make_donor):
+    donor = make_donor()
+    with client.session_transaction() as session:
+        session['user_id'], session['user_type'] = donor.id, 'donor'
+    response = client.get('/dashboard/donor', query_string={'after': 'garbage', 'city': 'Lahore'})
+    assert response.status_code == 302
+    assert 'after' not in response.headers['Location']
+
+
+def test_capped_count(requests):
+    query = EmergencyRequest.query.order_by(EmergencyRequest.id)
+    assert capped_count(query, 3) == 4
+    assert capped_count(query, 7) == 7
+    assert capped_count(query, 100) == 7
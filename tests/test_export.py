@@ -0,0 +1,70 @@
+"""
+Tests for streaming data export
+"""
+
+import csv
+import gzip
+import io
+import json
+import pytest
+from export import gzip_stream, iter_csv, iter_export, iter_ndjson
+
+
+@pytest.fixture
+def admin(client):
+    with client.session_transaction() as session:
+        session['user_type'] = 'admin'
+    return client
+
+
+def test_ndjson_one_chunk_per_batch(make_donor):
+    donors = [make_donor() for _ in range(5)]
+    chunks = list(iter_ndjson('donors', batch_size=2))
+    assert [chunk.count('\n') for chunk in chunks] == [2, 2, 1]
+    rows = [json.loads(line) for line in ''.join(chunks).splitlines()]
+    assert [row['id'] for row in rows] == [donor.id for donor in donors]
+    assert 'password' not in rows[0]
+    assert rows[0]['next_eligible_date'].startswith('1970-01-01')
+
+
+def test_csv_header_then_batches(make_emergency):
+    requests = [make_emergency(city='Lahore') for _ in range(3)]
+    chunks = list(iter_csv('emergencies', batch_size=2))
+    assert len(chunks) == 2
+    rows = list(csv.DictReader(io.StringIO(''.join(chunks))))
+    assert [int(row['id']) for row in rows] == [request.id for request in requests]
+    assert rows[0]['created_at'] == '2025-01-01T00:00:00'
+
+
+def test_empty_csv_is_just_the_header(app):
+    assert ''.join(iter_csv('feedback')) == 'id,name,email,subject,message,created_at\r\n'
+
+
+def test_gzip_stream_is_one_member():
+    chunks = [b'a' * 1000, b'', b'b' * 1000]
+    assert gzip.decompress(b''.join(gzip_stream(iter(chunks)))) == b''.join(chunks)
+
+
+def test_compressed_export_round_trips(make_donor):
+    for _ in range(3):
+        make_donor()
+    plain = b''.join(iter_export('donors', 'ndjson'))
+    assert gzip.decompress(b''.join(iter_export('donors', 'ndjson', compress=True))) == plain
+
+
+def test_route_requires_admin(client):
+    assert client.get('/admin/export/donors.ndjson').status_code == 403
+
+
+def test_route_streams(admin, make_donor):
+    make_donor(name='Ayesha Khan')
+    response = admin.get('/admin/export/donors.csv')
+    assert response.is_streamed and response.mimetype == 'text/csv'
+    assert response.headers['Content-Disposition'] == 'attachment; filename=donors.csv'
+    assert 'Ayesha Khan' in response.get_data(as_text=True)
+
+    response = admin.get('/admin/export/donors.ndjson', query_string={'gzip': '1'})
+    assert response.mimetype == 'application/gzip'
+    assert response.headers['Content-Disposition'] == 'attachment; filename=donors.ndjson.gz'
+    assert json.loads(gzip.decompress(response.data))['name'] == 'Ayesha Khan'
+    assert admin.get('/admin/export/users.csv').status_code == 404
@@ -0,0 +1,108 @@
+"""
+Tests for the Critical emergency notification fan-out
+"""
+
+from datetime import datetime, timedelta
+import pytest
+from app import socketio
+from database import DatabaseManager
+from fanout import NOTIFICATION_EVENT, NotificationFanout, room_owner, user_room
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = DatabaseManager(str(tmp_path / 'blood_bank.db'))
+    yield manager
+    manager.close()
+
+
+@pytest.fixture
+def fanout(app, manager):
+    fanout = NotificationFanout(manager)
+    fanout.init_app(app, socketio)
+    return fanout
+
+
+def emergency(request_id=1, **fields):
+    values = {'id': request_id, 'blood_type': 'A+', 'units_needed': 2, 'urgency': 'Critical',
+              'hospital': 'Mayo Hospital', 'city': 'Lahore'}
+    values.update(fields)
+    return values
+
+
+def connect(app, user_type, user_id):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'], session['user_type'] = user_id, user_type
+    return socketio.test_client(app, flask_test_client=client)
+
+
+def test_room_owner():
+    assert room_owner(user_room('donor', 7)) == ('donor', 7)
+    assert room_owner('patient_12') == ('patient', 12)
+    assert room_owner('emergency_feed') is None
+    assert room_owner('donor_x') is None
+
+
+def test_recipients_are_compatible_available_local_and_eligible(fanout, make_donor):
+    match = make_donor(blood_type='O-', address='Model Town, Lahore')
+    make_donor(blood_type='B+', address='Model Town, Lahore')
+    make_donor(blood_type='A+', address='Clifton, Karachi')
+    make_donor(blood_type='A+', address='Gulberg, Lahore', is_available=False)
+    make_donor(blood_type='A+', address='Gulberg, Lahore', next_eligible_date=datetime.utcnow() + timedelta(days=5))
+    make_donor(blood_type='A+', address='Gulberg, Lahore', age=16)
+    assert fanout.recipients(emergency()) == [match.id]
+
+
+def test_fan_out_writes_notifications_and_pushes_online_donors(app, fanout, manager, make_donor):
+    online = make_donor(blood_type='A+')
+    offline = make_donor(blood_type='A+')
+    socket = connect(app, 'donor', online.id)
+    socket.emit('join_room', {'room': user_room('donor', online.id)})
+    try:
+        assert fanout.fan_out(emergency(request_id=9)) == 2
+        received = [event for event in socket.get_received() if event['name'] == NOTIFICATION_EVENT]
+    finally:
+        socket.disconnect()
+    assert [event['args'][0]['emergency_id'] for event in received] == [9]
+    assert manager.get_unread_notification_count(online.id) == 1
+    assert manager.get_unread_notification_count(offline.id) == 1
+    assert 'Lahore' in manager.get_notifications_by_user(offline.id)[0]['message']
+    assert fanout.stats() | {'last_latency_ms': None} == {
+        'requests': 1, 'notified': 2, 'pushed': 1, 'queued': 0, 'last_latency_ms': None}
+
+
+def test_only_owner_joins_personal_room(app, make_donor):
+    owner, other = make_donor(), make_donor()
+    room = user_room('donor', owner.id)
+    intruder = connect(app, 'donor', other.id)
+    also_intruder = connect(app, 'patient', owner.id)
+    member = connect(app, 'donor', owner.id)
+    try:
+        for socket in (intruder, also_intruder, member):
+            socket.emit('join_room', {'room': room})
+            socket.get_received()
+        socketio.emit(NOTIFICATION_EVENT, {'title': 'private'}, to=room)
+        assert [len(socket.get_received()) for socket in (intruder, also_intruder, member)] == [0, 0, 1]
+    finally:
+        for socket in (intruder, also_intruder, member):
+            socket.disconnect()
+
+
+def test_wants_critical_inserts_when_enabled(app, fanout, monkeypatch):
+    assert not fanout.wants(emergency())  # FANOUT_ENABLED is off in tests
+    monkeypatch.setitem(app.config, 'FANOUT_ENABLED', True)
+    assert fanout.wants(emergency())
+    assert not fanout.wants(emergency(urgency='High'))
+
+
+def test_full_queue_logged(app, monkeypatch, caplog):
+    monkeypatch.setitem(app.config, 'FANOUT_QUEUE_SIZE', 1)
+    fanout = NotificationFanout()
+    fanout.init_app(app, socketio)
+    monkeypatch.setattr(fanout, '_ensure_started', lambda: None)
+    fanout.submit(emergency(1))
+    fanout.submit(emergency(2))
+    assert 'emergency request 2 not notified' in caplog.text
+    assert fanout.stats()['queued'] == 1
+    fanout._queue.get_nowait()
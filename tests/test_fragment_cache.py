@@ -0,0 +1,73 @@
+"""
+Tests for the template fragment cache
+"""
+
+from fragment_cache import fragment_cache
+from versions import versions
+
+
+class Renderer:
+    """Stand-in for a Jinja caller that counts renders"""
+
+    def __init__(self, html='<p>cards</p>'):
+        self.html = html
+        self.renders = 0
+
+    def __call__(self):
+        self.renders += 1
+        return self.html
+
+
+def test_hit_until_resource_bumped(app):
+    caller = Renderer()
+    assert fragment_cache.cached('cards', 'donors', caller=caller) == '<p>cards</p>'
+    fragment_cache.cached('cards', 'donors', caller=caller)
+    assert caller.renders == 1
+    versions.bump('donors')
+    fragment_cache.cached('cards', 'donors', caller=caller)
+    assert caller.renders == 2
+
+
+def test_other_resource_does_not_invalidate(app):
+    caller = Renderer()
+    fragment_cache.cached('cards', 'donors', caller=caller)
+    versions.bump('emergencies')
+    fragment_cache.cached('cards', 'donors', caller=caller)
+    assert caller.renders == 1
+
+
+def test_vary_keys_separate_entries(app):
+    caller = Renderer()
+    fragment_cache.cached('cards', 'emergencies', vary='/emergency/?page=1', caller=caller)
+    fragment_cache.cached('cards', 'emergencies', vary='/emergency/?page=2', caller=caller)
+    fragment_cache.cached('cards', 'emergencies', vary='/emergency/?page=1', caller=caller)
+    assert caller.renders == 2
+
+
+def test_entries_expire(app, monkeypatch):
+    monkeypatch.setattr(fragment_cache, 'ttl', 0)
+    caller = Renderer()
+    fragment_cache.cached('cards', 'donors', caller=caller)
+    fragment_cache.cached('cards', 'donors', caller=caller)
+    assert caller.renders == 2
+
+
+def test_size_bound_evicts_oldest(app, monkeypatch):
+    monkeypatch.setattr(fragment_cache, 'max_bytes', 25)
+    first, second = Renderer('a' * 20), Renderer('b' * 20)
+    fragment_cache.cached('first', caller=first)
+    fragment_cache.cached('second', caller=second)
+    assert fragment_cache.stats()['bytes'] == 20
+    fragment_cache.cached('second', caller=second)
+    fragment_cache.cached('first', caller=first)
+    assert (first.renders, second.renders) == (2, 1)
+
+
+def test_donor_write_rerenders_page_fragment(client, make_donor, make_patient):
+    patient = make_patient()
+    with client.session_transaction() as session:
+        session['user_id'], session['user_type'] = patient.id, 'patient'
+    make_donor(name='Ayesha Khan')
+    assert b'Ayesha Khan' in client.get('/dashboard/patient').data
+    make_donor(name='Bilal Raza')
+    assert b'Bilal Raza' in client.get('/dashboard/patient').data
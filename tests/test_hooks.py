@@ -0,0 +1,42 @@
+"""
+Tests for the model change hooks
+"""
+
+import pytest
+from models import db, Donor
+from hooks import on_commit, _callbacks
+
+
+@pytest.fixture
+def changes(app):
+    seen = []
+    callback = on_commit(Donor)(lambda operation, row, previous: seen.append((operation, row, previous)))
+    yield seen
+    _callbacks[Donor].remove(callback)
+
+
+def test_dispatched_after_commit_only(changes, make_donor):
+    donor = make_donor(name='Ayesha Khan')
+    assert [(operation, row['name']) for operation, row, _ in changes] == [('insert', 'Ayesha Khan')]
+    donor.name = 'Sara Malik'
+    db.session.flush()
+    db.session.rollback()
+    assert len(changes) == 1
+
+
+def test_previous_values_of_loaded_and_expired_columns(changes, make_donor):
+    donor = make_donor(blood_type='A+', is_available=True)
+    donor.blood_type = 'B+'
+    db.session.commit()
+    # The commit expired the instance, so the old value is not loaded
+    donor.is_available = False
+    db.session.commit()
+    updates = [previous for operation, _, previous in changes if operation == 'update']
+    assert updates == [{'blood_type': 'A+'}, {'is_available': True}]
+
+
+def test_delete(changes, make_donor):
+    donor = make_donor()
+    db.session.delete(donor)
+    db.session.commit()
+    assert changes[-1][0] == 'delete' and changes[-1][1]['id'] == donor.id
@@ -0,0 +1,138 @@
+"""
+Tests for bulk ingestion of donors, patients and donations
+"""
+
+import pytest
+from sqlalchemy import inspect
+import commands
+from database import DatabaseManager
+from models import db, Donor, Patient
+from accounts import Account
+from ingest import IMPORTED_PASSWORD, bulk_insert, deferred_indexes, ingest
+
+
+def record(n, **fields):
+    values = {'name': f'Donor {n}', 'email': f'Donor{n}@Example.com', 'phone': f'0300{n:07d}', 'age': '30',
+              'blood_type': 'o+', 'address': 'Gulberg, Lahore', 'latitude': '31.52', 'longitude': '74.35'}
+    values.update(fields)
+    return values
+
+
+def index_names(table):
+    return {index['name'] for index in inspect(db.engine).get_indexes(table)}
+
+
+def test_valid_rows_inserted_and_invalid_reported(app):
+    inserted, errors = bulk_insert(Donor, [
+        record(1), record(2, blood_type='Q+'), record(3, age='old'), record(4, email='nobody'), record(5),
+    ], start=10)
+    assert inserted == 2
+    assert [(error.row, error.message) for error in errors] == [
+        (11, "unknown blood type 'Q+'"), (12, 'age must be a number'), (13, 'email is not valid'),
+    ]
+    donor = Donor.query.filter_by(email='donor1@example.com').one()
+    assert (donor.blood_type, donor.age, donor.latitude, donor.is_available) == ('O+', 30, 31.52, True)
+    assert donor.password == IMPORTED_PASSWORD
+    assert Account.query.filter_by(email='donor1@example.com', user_type='donor').one().user_id == donor.id
+
+
+def test_constraint_violation_rejects_only_offending_rows(app, make_donor):
+    make_donor(email='donor2@example.com')
+    inserted, errors = bulk_insert(Donor, [record(1), record(2), record(3), record(3, name='Copy')])
+    assert inserted == 2
+    assert [error.row for error in errors] == [2, 4]
+    assert Donor.query.count() == 3
+
+
+def test_email_of_other_user_type_rejected(app, make_patient):
+    make_patient(email='donor1@example.com')
+    inserted, errors = bulk_insert(Donor, [record(1), record(2)])
+    assert inserted == 1 and [error.row for error in errors] == [1]
+
+
+def test_patients_need_an_address(app):
+    inserted, errors = bulk_insert(Patient, [record(1, address=''), record(2)])
+    assert inserted == 1 and errors[0].message == 'address is required'
+
+
+def test_ingest_chunks_with_deferred_indexes(app):
+    before = index_names('donor')
+    progress = []
+    result = ingest(Donor, [[record(1), record(2)], [record(3, blood_type=''), record(4)]], defer=True,
+                    on_chunk=lambda result: progress.append(result.inserted))
+    assert progress == [2, 3]
+    assert result.inserted == 3 and [error.row for error in result.errors] == [3]
+    assert index_names('donor') == before
+
+
+def test_deferred_indexes_dropped_during_load(app):
+    before = index_names('donor')
+    with deferred_indexes(Donor):
+        remaining = index_names('donor')
+    assert remaining < before
+    assert index_names('donor') == before
+
+
+@pytest.fixture
+def legacy(tmp_path, monkeypatch):
+    manager = DatabaseManager(str(tmp_path / 'blood_bank.db'))
+    monkeypatch.setattr(commands, 'db_manager', manager)
+    yield manager
+    manager.close()
+
+
+def donation(donor_id, date, **fields):
+    values = {'donor_id': donor_id, 'blood_type': 'O+', 'units': 1, 'donation_date': date, 'location': 'Lahore'}
+    values.update(fields)
+    return values
+
+
+def test_bulk_donations_refresh_donor_totals(legacy):
+    donor_id = legacy.insert_user({'name': 'a', 'email': 'a@example.com', 'phone': '1', 'user_type': 'donor'})
+    inserted, errors = legacy.bulk_insert_donations([
+        donation(donor_id, '2025-01-01'),
+        donation(donor_id, '2025-03-01', units=None),
+        donation(donor_id, '2025-02-01'),
+    ])
+    assert inserted == 2 and errors == [(1, 'missing units')]
+    legacy.bulk_insert_donations([donation(donor_id, '2024-12-01')])
+    with legacy.connection() as conn:
+        row = conn.execute('SELECT * FROM donors WHERE user_id = ?', (donor_id,)).fetchone()
+    assert row['total_donations'] == 3
+    assert row['last_donation_date'] == '2025-02-01'
+    assert row['next_eligible_date'] == '2025-03-29 00:00:00'
+
+
+def test_legacy_deferred_indexes(legacy):
+    def indexes():
+        with legacy.connection() as conn:
+            return {row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'blood_donations' "
+                "AND sql IS NOT NULL")}
+    before = indexes()
+    assert 'ix_blood_donations_donor_date' in before
+    with legacy.deferred_indexes('blood_donations'):
+        assert indexes() == set()
+    assert indexes() == before
+
+
+def test_cli_loads_donors_and_donations(app, legacy, tmp_path):
+    donors = tmp_path / 'donors.csv'
+    donors.write_text('name,email,phone,age,blood_type\nAyesha,ayesha@example.com,0300,30,A+\n'
+                      'Bad,bad@example.com,0301,30,Z\n')
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=['ingest', 'donors', str(donors), '--defer-indexes'])
+    assert result.exit_code == 0, result.output
+    assert 'donors: 1 inserted, 1 rejected' in result.output
+    assert 'row 2: unknown blood type' in result.output
+
+    user_id = legacy.insert_user({'name': 'Ayesha', 'email': 'ayesha@example.com', 'phone': '0300',
+                                  'user_type': 'donor'})
+    donations = tmp_path / 'donations.ndjson'
+    donations.write_text(f'{{"donor_id": {user_id}, "blood_type": "A+", "units": 1, '
+                         f'"donation_date": "2025-01-01", "location": "Lahore"}}\n')
+    result = runner.invoke(args=['ingest', 'donations', str(donations)])
+    assert result.exit_code == 0, result.output
+    donor = Donor.query.filter_by(email='ayesha@example.com').one()
+    db.session.refresh(donor)
+    assert donor.last_donation_date.date().isoformat() == '2025-01-01'
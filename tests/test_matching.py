@@ -0,0 +1,113 @@
+"""
+Tests for the donor matching engine
+"""
+
+from datetime import datetime, timedelta
+import pytest
+from models import db
+from matching import DonorMatcher, donor_matcher, haversine_km
+
+# Gulberg, Lahore and two points roughly 5 km and 20 km from it
+LAHORE = (31.5204, 74.3587)
+NEAR = (31.5654, 74.3587)
+FAR = (31.6999, 74.3587)
+
+
+@pytest.fixture
+def matcher(app, monkeypatch):
+    # Rebuild on every dirty match, and never carry a snapshot between tests
+    monkeypatch.setitem(app.config, 'MATCH_SNAPSHOT_REFRESH_SECONDS', 0)
+    monkeypatch.setattr(donor_matcher, '_snapshot', None)
+    return donor_matcher
+
+
+def ids(ranked):
+    return [donor_id for donor_id, _, _ in ranked]
+
+
+def test_haversine_km():
+    assert haversine_km(*LAHORE, [LAHORE[0]], [LAHORE[1]])[0] == pytest.approx(0)
+    assert haversine_km(*LAHORE, [NEAR[0]], [NEAR[1]])[0] == pytest.approx(5.0, abs=0.1)
+
+
+def test_ranks_by_distance(matcher, make_donor):
+    far = make_donor(latitude=FAR[0], longitude=FAR[1])
+    near = make_donor(latitude=NEAR[0], longitude=NEAR[1])
+    unknown = make_donor()
+    ranked = matcher.rank('O+', *LAHORE)
+    assert ids(ranked) == [near.id, far.id, unknown.id]
+    assert ranked[0][1] == pytest.approx(5.0, abs=0.1)
+    assert ranked[2][1] is None
+
+
+def test_exact_type_beats_nearby_universal_donor(matcher, make_donor):
+    universal = make_donor(blood_type='O-', latitude=LAHORE[0], longitude=LAHORE[1])
+    exact = make_donor(blood_type='O+', latitude=NEAR[0], longitude=NEAR[1])
+    assert ids(matcher.rank('O+', *LAHORE)) == [exact.id, universal.id]
+    assert [exact_match for _, _, exact_match in matcher.rank('O+', *LAHORE)] == [True, False]
+
+
+def test_only_compatible_ready_donors(matcher, make_donor):
+    ready = make_donor(blood_type='A-')
+    make_donor(blood_type='B+')
+    resting = make_donor(blood_type='A-', is_available=False)
+    deferred = make_donor(blood_type='A-', next_eligible_date=datetime.utcnow() + timedelta(days=10))
+    assert ids(matcher.rank('A+')) == [ready.id]
+    assert ids(matcher.rank('A+', include_unavailable=True))[0] == ready.id
+    assert set(ids(matcher.rank('A+', include_unavailable=True))) == {ready.id, resting.id, deferred.id}
+
+
+def test_top_k(matcher, make_donor):
+    donors = [make_donor(latitude=LAHORE[0] + n * 0.01, longitude=LAHORE[1]) for n in range(10)]
+    assert ids(matcher.rank('O+', *LAHORE, k=3)) == [donor.id for donor in donors[:3]]
+    assert matcher.rank('O+', *LAHORE, k=0) == []
+    assert matcher.rank('XX') == []
+
+
+def test_commit_marks_snapshot_dirty(matcher, make_donor):
+    first = make_donor()
+    assert ids(matcher.rank('O+')) == [first.id]
+    second = make_donor()
+    assert ids(matcher.rank('O+')) == [first.id, second.id]
+    first.is_available = False
+    db.session.commit()
+    assert ids(matcher.rank('O+')) == [second.id]
+
+
+def test_snapshot_kept_until_refresh_interval(app, matcher, make_donor, monkeypatch):
+    monkeypatch.setitem(app.config, 'MATCH_SNAPSHOT_REFRESH_SECONDS', 3600)
+    first = make_donor()
+    snapshot = matcher.snapshot()
+    make_donor()
+    assert matcher.snapshot() is snapshot
+    assert ids(matcher.rank('O+')) == [first.id]
+
+
+def test_snapshot_rebuilt_after_max_age(app, make_donor, monkeypatch):
+    # Writes from other processes never mark the snapshot dirty
+    matcher = DonorMatcher()
+    first = make_donor()
+    snapshot = matcher.snapshot()
+    make_donor()
+    assert matcher.snapshot() is snapshot
+    monkeypatch.setitem(app.config, 'MATCH_SNAPSHOT_MAX_AGE', 0)
+    assert len(matcher.snapshot()) == 2
+    assert ids(matcher.rank('O+'))[0] == first.id
+
+
+def test_matches_endpoint(client, matcher, make_donor, make_emergency):
+    near = make_donor(name='Near', latitude=NEAR[0], longitude=NEAR[1])
+    far = make_donor(name='Far', latitude=FAR[0], longitude=FAR[1])
+    make_donor(blood_type='AB+')
+    emergency = make_emergency(blood_type='O+')
+    url = f'/api/emergency/{emergency.id}/matches'
+    assert client.get(url).status_code == 401
+
+    with client.session_transaction() as session:
+        session['user_id'], session['user_type'] = near.id, 'donor'
+    data = client.get(url, query_string={'lat': LAHORE[0], 'lon': LAHORE[1]}).get_json()
+    assert [match['id'] for match in data['matches']] == [near.id, far.id]
+    assert data['count'] == 2 and data['matches'][0]['name'] == 'Near'
+    assert data['matches'][0]['exact_match'] is True
+    assert len(client.get(url, query_string={'k': 1}).get_json()['matches']) == 1
+    assert client.get('/api/emergency/999999/matches').status_code == 404
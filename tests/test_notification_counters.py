@@ -0,0 +1,81 @@
+"""
+Tests for the per-user unread notification counters
+"""
+
+import threading
+import pytest
+from database import DatabaseManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = DatabaseManager(str(tmp_path / 'blood_bank.db'))
+    yield manager
+    manager.close()
+
+
+def notification(user_id, n=0):
+    return {'user_id': user_id, 'title': f'Title {n}', 'message': 'message', 'notification_type': 'emergency'}
+
+
+def recount(manager, user_id):
+    with manager.connection() as conn:
+        return conn.execute('SELECT COUNT(*) FROM notifications WHERE user_id = ? AND is_read = 0',
+                            (user_id,)).fetchone()[0]
+
+
+def test_counts_follow_inserts_and_reads(manager):
+    first = manager.insert_notification(notification(1))
+    manager.insert_notifications([notification(1, n) for n in range(3)] + [notification(2)])
+    assert manager.get_unread_notification_count(1) == 4
+    assert manager.get_unread_notification_count(2) == 1
+    assert manager.get_unread_notification_count(3) == 0
+
+    assert manager.mark_notification_read(first) == 1
+    assert manager.mark_notification_read(first) == 0
+    assert manager.get_unread_notification_count(1) == 3
+    assert manager.mark_all_notifications_read(1) == 3
+    assert manager.get_unread_notification_count(1) == 0
+    assert manager.get_unread_notification_count(2) == 1
+
+
+def test_mark_read_only_touches_owner(manager):
+    mine = manager.insert_notification(notification(1))
+    theirs = manager.insert_notification(notification(2))
+    assert manager.mark_notifications_read([mine, theirs], user_id=1) == 1
+    assert manager.get_unread_notification_count(2) == 1
+    assert manager.mark_notifications_read([]) == 0
+
+
+def test_counters_backfilled_for_existing_notifications(tmp_path):
+    path = str(tmp_path / 'blood_bank.db')
+    manager = DatabaseManager(path)
+    manager.insert_notifications([notification(1, n) for n in range(3)])
+    with manager.transaction() as conn:
+        conn.execute('DROP TABLE notification_counters')
+    manager.close()
+
+    reopened = DatabaseManager(path)
+    try:
+        assert reopened.get_unread_notification_count(1) == 3
+    finally:
+        reopened.close()
+
+
+def test_concurrent_writers_keep_counts_exact(manager):
+    ids = [manager.insert_notification(notification(1, n)) for n in range(40)]
+
+    def insert():
+        for n in range(20):
+            manager.insert_notification(notification(1, n))
+
+    def read(chunk):
+        manager.mark_notifications_read(chunk)
+
+    threads = [threading.Thread(target=insert) for _ in range(4)]
+    threads += [threading.Thread(target=read, args=(ids[n::4],)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert manager.get_unread_notification_count(1) == recount(manager, 1) == 80
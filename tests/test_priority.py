@@ -0,0 +1,66 @@
+"""
+Tests for emergency request priority ordering
+"""
+
+from datetime import datetime, timedelta
+from models import db
+from priority import by_priority, priority_key, top_requests
+from forms import EmergencyRequestForm
+
+BASE = datetime(2025, 1, 1, 12, 0)
+
+
+def test_priority_key(app):
+    assert priority_key('Critical', 0, BASE) == (0, BASE)
+    assert priority_key('Low', 2, BASE) == (3, BASE - timedelta(hours=2))
+    assert priority_key('Unknown', None, BASE) == (4, BASE)
+
+
+def test_urgency_first_then_waiting_time_with_unit_bonus(make_emergency):
+    low = make_emergency(urgency='Low', created_at=BASE - timedelta(days=3))
+    high_new = make_emergency(urgency='High', units_needed=1, created_at=BASE)
+    high_old = make_emergency(urgency='High', units_needed=1, created_at=BASE - timedelta(minutes=30))
+    # Created last, but three units outweigh half an hour of waiting
+    high_big = make_emergency(urgency='High', units_needed=4, created_at=BASE + timedelta(minutes=30))
+    critical = make_emergency(urgency='Critical', created_at=BASE + timedelta(days=1))
+    expected = [critical.id, high_big.id, high_old.id, high_new.id, low.id]
+    assert [e.id for e in by_priority().all()] == expected
+    assert [e.id for e in top_requests(2)] == expected[:2]
+
+
+def test_updates_reorder(make_emergency):
+    first = make_emergency(urgency='High')
+    second = make_emergency(urgency='Low')
+    second.urgency = 'Critical'
+    db.session.commit()
+    assert [e.id for e in top_requests(2)] == [second.id, first.id]
+    assert second.priority_rank == 0
+
+
+def test_top_requests_by_blood_type(make_emergency):
+    make_emergency(blood_type='A+', urgency='Critical')
+    wanted = make_emergency(blood_type='O-', urgency='Low')
+    assert top_requests(5, ['O-']) == [wanted]
+
+
+def test_unit_seconds_from_config(app, make_emergency, monkeypatch):
+    monkeypatch.setitem(app.config, 'EMERGENCY_PRIORITY_UNIT_SECONDS', 60)
+    request = make_emergency(units_needed=5, created_at=BASE)
+    assert request.priority_at == BASE - timedelta(minutes=5)
+
+
+def test_queue_endpoint(client, make_emergency):
+    low = make_emergency(blood_type='A+', urgency='Low')
+    critical = make_emergency(blood_type='O-', urgency='Critical')
+    data = client.get('/api/emergency/queue').get_json()
+    assert [(e['id'], e['position']) for e in data['queue']] == [(critical.id, 1), (low.id, 2)]
+    data = client.get('/api/emergency/queue', query_string={'compatible_with': 'O+'}).get_json()
+    assert [e['id'] for e in data['queue']] == [low.id]
+    assert client.get('/api/emergency/queue', query_string={'limit': 1}).get_json()['count'] == 1
+
+
+def test_form_urgency_choices_follow_config(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'URGENCY_LEVELS', ('Critical', 'Routine'))
+    with app.test_request_context():
+        form = EmergencyRequestForm()
+    assert form.urgency.choices == [('Critical', 'Critical'), ('Routine', 'Routine')]
@@ -0,0 +1,122 @@
+"""
+Tests for the emergency demand rollups
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func
+from models import db, EmergencyRequest, EmergencyDemandRollup
+from rollups import GRAINS, backfill, demand_series
+
+BUCKET_FORMATS = {'hour': '%Y-%m-%d %H:00:00', 'day': '%Y-%m-%d 00:00:00', 'month': '%Y-%m-01 00:00:00'}
+BASE = datetime(2025, 1, 30, 22, 15)
+
+
+def grouped():
+    """``{key: (requests, units)}`` computed with GROUP BY over the request table"""
+    result = {}
+    for grain, fmt in BUCKET_FORMATS.items():
+        bucket = func.strftime(fmt, EmergencyRequest.created_at)
+        rows = db.session.query(
+            bucket, EmergencyRequest.blood_type, EmergencyRequest.city, EmergencyRequest.urgency,
+            func.count(), func.sum(EmergencyRequest.units_needed)
+        ).group_by(bucket, EmergencyRequest.blood_type, EmergencyRequest.city, EmergencyRequest.urgency)
+        for bucket_value, blood_type, city, urgency, requests, units in rows:
+            result[(grain, bucket_value, blood_type, city, urgency)] = (requests, units)
+    return result
+
+
+def rolled_up():
+    """Non-empty rollup rows in the same shape as ``grouped()``"""
+    return {
+        (r.grain, r.bucket.strftime('%Y-%m-%d %H:%M:%S'), r.blood_type, r.city, r.urgency): (r.requests, r.units)
+        for r in EmergencyDemandRollup.query if r.requests or r.units
+    }
+
+
+@pytest.fixture
+def requests(make_emergency):
+    # Spans hour, day and month boundaries
+    return [
+        make_emergency(blood_type=blood_type, city=city, urgency=urgency, units_needed=units,
+                       created_at=BASE + timedelta(minutes=50 * n))
+        for n, (blood_type, city, urgency, units) in enumerate([
+            ('O+', 'Lahore', 'High', 2), ('O+', 'Lahore', 'High', 1), ('A-', 'Karachi', 'Critical', 4),
+            ('O+', 'Lahore', 'Low', 3), ('B+', 'Karachi', 'High', 1), ('O+', 'Lahore', 'High', 6),
+            ('AB+', 'Multan', 'Moderate', 2), ('O+', 'Karachi', 'High', 1),
+        ])
+    ]
+
+
+def test_inserts_match_group_by(requests):
+    assert rolled_up() == grouped()
+    assert {key[0] for key in rolled_up()} == set(GRAINS)
+
+
+def test_update_moves_request_between_buckets(requests):
+    requests[0].urgency = 'Critical'
+    requests[1].city = 'Karachi'
+    requests[2].units_needed = 1
+    requests[3].created_at = datetime(2024, 12, 31, 23, 59)
+    requests[4].blood_type = 'O-'
+    db.session.commit()
+    assert rolled_up() == grouped()
+
+
+def test_update_of_expired_instance(requests):
+    # Old values are read from the row, not the (expired) instance
+    request = requests[0]
+    db.session.expire(request)
+    request.urgency = 'Low'
+    db.session.commit()
+    assert rolled_up() == grouped()
+
+
+def test_unrelated_update_leaves_rollups_alone(requests):
+    before = rolled_up()
+    requests[0].hospital = 'Services Hospital'
+    db.session.commit()
+    assert rolled_up() == before
+
+
+def test_delete_removes_request(requests):
+    db.session.delete(requests[0])
+    db.session.delete(requests[6])
+    db.session.commit()
+    assert rolled_up() == grouped()
+
+
+def test_rolled_back_insert_is_not_counted(requests):
+    before = rolled_up()
+    db.session.add(EmergencyRequest(patient_name='p', blood_type='O+', units_needed=1, urgency='High',
+                                    hospital='h', contact='c', city='Lahore', created_at=BASE))
+    db.session.flush()
+    db.session.rollback()
+    assert rolled_up() == before
+
+
+def test_backfill_rebuilds_after_bulk_update(requests):
+    db.session.execute(EmergencyRequest.__table__.update().values(urgency='Critical'))
+    db.session.commit()
+    assert rolled_up() != grouped()
+    backfill(batch_size=3)
+    assert rolled_up() == grouped()
+
+
+def test_city_spellings_share_a_bucket(make_emergency):
+    make_emergency(city='lahore', created_at=BASE)
+    make_emergency(city=' LAHORE ', created_at=BASE)
+    assert {key[3] for key in rolled_up()} == {'Lahore'}
+
+
+def test_demand_series_reads_the_rollups(requests):
+    series = demand_series('day', datetime(2025, 1, 30), datetime(2025, 2, 2))
+    totals = {}
+    for request in requests:
+        day = request.created_at.replace(hour=0, minute=0)
+        count, units = totals.get(day, (0, 0))
+        totals[day] = (count + 1, units + request.units_needed)
+    assert {row['bucket']: (row['requests'], row['units']) for row in series} == {
+        day.isoformat(): value for day, value in totals.items()
+    }
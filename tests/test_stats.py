@@ -0,0 +1,98 @@
+"""
+Tests for the site statistics counters and their reconciler
+"""
+
+import pytest
+import stats
+from models import db, Donor, EmergencyRequest
+from hooks import bulk_changed
+from stats import StatsCounters, site_stats
+
+
+class Stop(Exception):
+    pass
+
+
+@pytest.fixture
+def counters(app, monkeypatch):
+    # No background reconciler; tests drive reconciliation themselves
+    monkeypatch.setattr(site_stats, 'app', None)
+    site_stats.invalidate()
+    yield site_stats
+    site_stats.invalidate()
+
+
+def test_counts_follow_commits(counters, make_donor, make_emergency):
+    assert counters.get()['total_donors'] == 0
+    donor = make_donor(is_available=True)
+    make_donor(is_available=False)
+    request = make_emergency(urgency='Critical', city='Lahore')
+    make_emergency(urgency='High', city='Karachi')
+    assert counters.get() | {'reconciled_at': None} == {
+        'total_donors': 2, 'active_donors': 1, 'total_emergencies': 2,
+        'emergencies_by_urgency': {'Critical': 1, 'High': 1}, 'cities_covered': 2, 'reconciled_at': None,
+    }
+
+    donor.is_available = False
+    request.urgency, request.city = 'High', 'Karachi'
+    db.session.commit()
+    current = counters.get()
+    assert current['active_donors'] == 0
+    assert current['emergencies_by_urgency'] == {'High': 2} and current['cities_covered'] == 1
+
+    db.session.delete(donor)
+    db.session.delete(request)
+    db.session.commit()
+    current = counters.get()
+    assert (current['total_donors'], current['total_emergencies']) == (1, 1)
+
+
+def test_incremental_counts_match_recount(counters, make_donor, make_emergency):
+    counters.get()
+    donors = [make_donor(is_available=n % 2 == 0) for n in range(5)]
+    requests = [make_emergency(urgency=u, city=c) for u, c in [('Low', 'Lahore'), ('High', 'Quetta')]]
+    donors[1].is_available = True
+    requests[0].city = 'Quetta'
+    db.session.delete(donors[2])
+    db.session.commit()
+    incremental = counters.get()
+    counters.reconcile()
+    assert counters.get() | {'reconciled_at': None} == incremental | {'reconciled_at': None}
+
+
+def test_bulk_change_forces_recount(counters, make_donor):
+    make_donor()
+    assert counters.get()['active_donors'] == 1
+    db.session.execute(Donor.__table__.update().values(is_available=False))
+    db.session.commit()
+    assert counters.get()['active_donors'] == 1
+    bulk_changed(Donor)
+    assert counters.get()['active_donors'] == 0
+
+
+def test_reconciler_corrects_drift_and_logs_failures(app, make_emergency, monkeypatch, caplog):
+    counters = StatsCounters()
+    counters.init_app(app)
+    monkeypatch.setattr(counters, '_start_reconciler', lambda: None)
+    assert counters.get()['total_emergencies'] == 0
+    db.session.execute(EmergencyRequest.__table__.insert(), [
+        {'patient_name': 'p', 'blood_type': 'O+', 'units_needed': 1, 'urgency': 'Low',
+         'hospital': 'h', 'contact': 'c', 'city': 'Lahore'}])
+    db.session.commit()
+    assert counters.get()['total_emergencies'] == 0
+
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) == 3:
+            raise Stop
+    monkeypatch.setattr(stats.time, 'sleep', sleep)
+    reconcile = counters.reconcile
+    calls = iter([reconcile, lambda: 1 / 0])
+    monkeypatch.setattr(counters, 'reconcile', lambda: next(calls)())
+    with pytest.raises(Stop):
+        counters._reconcile_forever()
+    assert sleeps == [app.config['STATS_RECONCILE_INTERVAL']] * 3
+    assert counters.get()['total_emergencies'] == 1
+    assert 'stats reconciliation failed' in caplog.text
@@ -0,0 +1,51 @@
+"""
+Tests for the synthetic data generator
+"""
+
+from datetime import datetime
+
+import pytest
+from models import db, Donor, Patient, EmergencyRequest, ChatMessage, Feedback
+from synthetic import generate
+
+MODELS = (Donor, Patient, EmergencyRequest, ChatMessage, Feedback)
+COUNTS = {'donors': 60, 'patients': 12, 'emergencies': 25, 'messages': 80, 'feedback': 9}
+
+
+def dump():
+    """Every generated row, in id order"""
+    tables = {}
+    for model in MODELS:
+        table = model.__table__
+        tables[table.name] = [tuple(row) for row in db.session.execute(table.select().order_by(table.c.id))]
+    return tables
+
+
+def run(**options):
+    """Generate into an empty database and return its contents"""
+    db.session.remove()
+    db.drop_all()
+    db.create_all()
+    totals = generate(**COUNTS, password='fixed-hash', **options)
+    assert totals == {label: COUNTS[label] for label in totals}
+    return dump()
+
+
+def test_same_seed_same_rows(app):
+    assert run(seed=7) == run(seed=7)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 1001])
+def test_rows_do_not_depend_on_chunk_size(app, chunk_size):
+    assert run(seed=7, chunk_size=chunk_size) == run(seed=7, chunk_size=10000)
+
+
+def test_other_seed_other_rows(app):
+    assert run(seed=7) != run(seed=8)
+
+
+def test_timestamps_follow_now(app):
+    now = datetime(2030, 6, 1)
+    run(seed=7, now=now, days=30)
+    created = [at for at, in db.session.query(EmergencyRequest.created_at)]
+    assert created and all(datetime(2030, 5, 2) <= at <= now for at in created)
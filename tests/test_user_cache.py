@@ -0,0 +1,76 @@
+"""
+Tests for the current-user cache
+"""
+
+from models import db, Donor
+from hooks import bulk_changed
+from user_cache import user_cache
+
+
+def test_second_lookup_is_a_hit(make_donor):
+    donor = make_donor(name='Ayesha Khan')
+    assert user_cache.get('donor', donor.id).name == 'Ayesha Khan'
+    hits = user_cache.hits
+    assert user_cache.get('donor', donor.id).name == 'Ayesha Khan'
+    assert user_cache.hits == hits + 1
+
+
+def test_committed_update_invalidates(make_donor):
+    donor = make_donor(name='Ayesha Khan', is_available=True)
+    user_cache.get('donor', donor.id)
+    donor.name = 'Ayesha Malik'
+    donor.is_available = False
+    db.session.commit()
+    snapshot = user_cache.get('donor', donor.id)
+    assert (snapshot.name, snapshot.is_available) == ('Ayesha Malik', False)
+
+
+def test_rolled_back_update_keeps_entry(make_donor):
+    donor = make_donor(name='Ayesha Khan')
+    user_cache.get('donor', donor.id)
+    donor.name = 'Ayesha Malik'
+    db.session.flush()
+    db.session.rollback()
+    hits = user_cache.hits
+    assert user_cache.get('donor', donor.id).name == 'Ayesha Khan'
+    assert user_cache.hits == hits + 1
+
+
+def test_delete_invalidates(make_donor):
+    donor = make_donor()
+    donor_id = donor.id
+    assert user_cache.get('donor', donor_id) is not None
+    db.session.delete(donor)
+    db.session.commit()
+    assert user_cache.get('donor', donor_id) is None
+
+
+def test_patient_write_does_not_touch_donor_with_same_id(make_donor, make_patient):
+    donor = make_donor()
+    patient = make_patient()
+    assert donor.id == patient.id
+    user_cache.get('donor', donor.id)
+    patient.name = 'Renamed'
+    db.session.commit()
+    hits = user_cache.hits
+    user_cache.get('donor', donor.id)
+    assert user_cache.hits == hits + 1
+
+
+def test_bulk_change_clears_everything(make_donor):
+    donor = make_donor(name='Before')
+    user_cache.get('donor', donor.id)
+    db.session.execute(Donor.__table__.update().values(name='After'))
+    db.session.commit()
+    assert user_cache.get('donor', donor.id).name == 'Before'  # bypassed the ORM hooks
+    bulk_changed(Donor)
+    assert user_cache.get('donor', donor.id).name == 'After'
+
+
+def test_ttl_expiry(app, make_donor, monkeypatch):
+    donor = make_donor(name='Before')
+    monkeypatch.setitem(app.config, 'USER_CACHE_TTL', 0)
+    user_cache.get('donor', donor.id)
+    db.session.execute(Donor.__table__.update().values(name='After'))
+    db.session.commit()
+    assert user_cache.get('donor', donor.id).name == 'After'
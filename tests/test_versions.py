@@ -0,0 +1,81 @@
+"""
+Tests for version stamps and conditional GETs
+"""
+
+from models import db, Donor
+from hooks import bulk_changed
+from versions import versions, chat_resource
+import versions as versions_module
+
+
+def test_commit_bumps_resource(make_donor):
+    before = versions.get('donors')
+    make_donor()
+    assert versions.get('donors') == before + 1
+
+
+def test_rollback_does_not_bump(app):
+    before = versions.get('donors')
+    db.session.add(Donor(name='x', email='x@example.com', phone='1', age=30, password='x', blood_type='O+'))
+    db.session.flush()
+    db.session.rollback()
+    assert versions.get('donors') == before
+
+
+def test_chat_message_bumps_its_conversation_only(make_message):
+    message = make_message(('donor', 1), ('patient', 2))
+    other = chat_resource('donor:1|patient:3')
+    before, other_before = versions.get(chat_resource(message.conversation_key)), versions.get(other)
+    make_message(('patient', 2), ('donor', 1))
+    assert versions.get(chat_resource(message.conversation_key)) == before + 1
+    assert versions.get(other) == other_before
+
+
+def test_search_revalidates_until_a_donor_changes(client, make_donor):
+    donor = make_donor()
+    first = client.get('/api/search/donors')
+    assert first.status_code == 200 and first.headers['ETag']
+
+    cached = client.get('/api/search/donors', headers={'If-None-Match': first.headers['ETag']})
+    assert cached.status_code == 304
+
+    donor.is_available = False
+    db.session.commit()
+    changed = client.get('/api/search/donors', headers={'If-None-Match': first.headers['ETag']})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != first.headers['ETag']
+
+
+def test_bulk_load_bumps(client, make_donor):
+    make_donor()
+    etag = client.get('/api/search/donors').headers['ETag']
+    bulk_changed(Donor)
+    assert client.get('/api/search/donors', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_etag_depends_on_query_string(client, make_donor):
+    make_donor()
+    etag = client.get('/api/search/donors').headers['ETag']
+    response = client.get('/api/search/donors', query_string={'blood_type': 'O+'}, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+
+
+def test_etag_expires_after_ttl(app, client, make_donor, monkeypatch):
+    make_donor()
+    monkeypatch.setitem(app.config, 'CONDITIONAL_GET_TTL', 30)
+    clock = [1000.0]
+    monkeypatch.setattr(versions_module.time, 'time', lambda: clock[0])
+    etag = client.get('/api/search/donors').headers['ETag']
+    clock[0] += 10
+    assert client.get('/api/search/donors', headers={'If-None-Match': etag}).status_code == 304
+    clock[0] += 30
+    assert client.get('/api/search/donors', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_chat_history_revalidates_until_a_message_arrives(client, make_message):
+    make_message(('donor', 1), ('patient', 2))
+    args = {'user1': 1, 'type1': 'donor', 'user2': 2, 'type2': 'patient'}
+    etag = client.get('/chat/history', query_string=args).headers['ETag']
+    assert client.get('/chat/history', query_string=args, headers={'If-None-Match': etag}).status_code == 304
+    make_message(('patient', 2), ('donor', 1))
+    assert client.get('/chat/history', query_string=args, headers={'If-None-Match': etag}).status_code == 200
@@ -0,0 +1,99 @@
+"""
+Current-user cache for LifeLink Blood Bank Management System
+
+Per-process LRU of lightweight user snapshots keyed by ``(user_type,
+user_id)``. Entries expire after ``USER_CACHE_TTL`` seconds and are dropped
+as soon as a Donor or Patient write commits, so templates never need a
+database round trip just to draw the header.
+"""
+
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from flask import current_app
+from models import db, Donor, Patient
+from hooks import on_commit, on_bulk_change
+
+UserSnapshot = namedtuple('UserSnapshot', ['id', 'user_type', 'name', 'email', 'blood_type', 'is_available'])
+
+USER_MODELS = {'donor': Donor, 'patient': Patient}
+_MISSING = object()
+
+
+class UserCache:
+    """LRU + TTL cache of UserSnapshot objects with hit/miss counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self, user_type, user_id):
+        model = USER_MODELS.get(user_type)
+        if model is None:
+            return None
+        user = db.session.get(model, user_id)
+        if user is None:
+            return None
+        return UserSnapshot(user.id, user_type, user.name, user.email, user.blood_type,
+                            getattr(user, 'is_available', None))
+
+    def get(self, user_type, user_id):
+        """Return the snapshot for a user, or None if the user does not exist"""
+        key = (user_type, user_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        snapshot = self._load(user_type, user_id)
+        config = current_app.config
+        with self._lock:
+            self._entries[key] = (snapshot, now + config.get('USER_CACHE_TTL', 300))
+            self._entries.move_to_end(key)
+            while len(self._entries) > config.get('USER_CACHE_SIZE', 10000):
+                self._entries.popitem(last=False)
+        return snapshot
+
+    def invalidate(self, user_type, user_id):
+        """Drop a user's snapshot, e.g. after a profile or availability change"""
+        with self._lock:
+            self._entries.pop((user_type, user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+# Global user cache instance
+user_cache = UserCache()
+
+
+@on_commit(Donor)
+def _invalidate_donor(operation, row, previous):
+    user_cache.invalidate('donor', row['id'])
+
+
+@on_commit(Patient)
+def _invalidate_patient(operation, row, previous):
+    user_cache.invalidate('patient', row['id'])
+
+
+@on_bulk_change(Donor)
+@on_bulk_change(Patient)
+def _clear_on_bulk_load():
+    user_cache.clear()
@@ -8,7 +8,8 @@ import secrets
 import string
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
-from models import BloodType, EmergencyUrgency
+from config import Config
+from compatibility import BLOOD_TYPES, recipient_types_for
 
 def generate_secure_token(length: int = 32) -> str:
     """Generate a secure random token"""
@@ -31,13 +32,11 @@ def validate_phone(phone: str) -> bool:
 
 def validate_blood_type(blood_type: str) -> bool:
     """Validate blood type"""
-    valid_types = [bt.value for bt in BloodType]
-    return blood_type in valid_types
+    return blood_type in BLOOD_TYPES
 
 def validate_urgency_level(urgency: str) -> bool:
     """Validate urgency level"""
-    valid_levels = [ul.value for ul in EmergencyUrgency]
-    return urgency in valid_levels
+    return urgency in Config.URGENCY_LEVELS
 
 def calculate_age(birth_date: datetime) -> int:
     """Calculate age from birth date"""
@@ -48,10 +47,10 @@ def calculate_age(birth_date: datetime) -> int:
     return age
 
 def is_eligible_for_donation(age: int, last_donation_date: Optional[datetime] = None) -> Dict[str, bool]:
-    """Check if donor is eligible for donation"""
-    min_age = 18
-    max_age = 65
-    min_interval_days = 56  # 8 weeks
+    """Check if donor is eligible for donation (see eligibility.py for SQL and batch checks)"""
+    min_age = Config.MIN_DONATION_AGE
+    max_age = Config.MAX_DONATION_AGE
+    min_interval_days = Config.MIN_DONATION_INTERVAL_DAYS
     
     # Check age eligibility
     age_eligible = min_age <= age <= max_age
@@ -70,21 +69,11 @@ def is_eligible_for_donation(age: int, last_donation_date: Optional[datetime] =
 
 def get_next_eligible_date(last_donation_date: datetime) -> datetime:
     """Calculate next eligible donation date"""
-    return last_donation_date + timedelta(days=56)
+    return last_donation_date + timedelta(days=Config.MIN_DONATION_INTERVAL_DAYS)
 
 def get_blood_compatibility(blood_type: str) -> List[str]:
     """Get compatible blood types for donation"""
-    compatibility_map = {
-        'O-': ['O-', 'O+', 'A+', 'A-', 'B+', 'B-', 'AB+', 'AB-'],
-        'O+': ['O+', 'A+', 'B+', 'AB+'],
-        'A-': ['A-', 'A+', 'AB+', 'AB-'],
-        'A+': ['A+', 'AB+'],
-        'B-': ['B-', 'B+', 'AB+', 'AB-'],
-        'B+': ['B+', 'AB+'],
-        'AB-': ['AB+', 'AB-'],
-        'AB+': ['AB+']
-    }
-    return compatibility_map.get(blood_type, [])
+    return recipient_types_for(blood_type)
 
 def format_time_ago(date: datetime) -> str:
     """Format time difference as human-readable string"""
@@ -0,0 +1,124 @@
+"""
+Resource version stamps for LifeLink Blood Bank Management System
+
+Each cacheable resource (``donors``, ``emergencies``, ``chat:<conversation
+key>``) has an in-process counter bumped whenever a write to it commits.
+JSON read endpoints wrapped in ``@conditional(...)`` derive their ETag
+from those counters, so a matching ``If-None-Match`` is answered with a
+304 before any query runs.
+
+Every ETag also carries a per-process boot nonce, so counters restarting
+at zero after a restart can never validate a stale response.
+
+Stamps live in one process, so a write made by another worker or by a CLI
+command (``flask ingest``, ``flask generate``) never bumps them. To bound
+how long such a write can be hidden behind 304s, ETags also carry the
+current ``CONDITIONAL_GET_TTL`` window: every ETag stops validating when
+the window rolls over, and the next request re-runs the view.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from functools import wraps
+from flask import current_app, request, session, make_response
+from models import Donor, EmergencyRequest, ChatMessage
+from hooks import on_commit, on_bulk_change
+
+BOOT_NONCE = os.urandom(6).hex()
+
+
+class VersionStamps:
+    """Per-resource write counters plus conditional GET hit/miss counts"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        return self._versions.get(key, 0)
+
+    def bump(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._versions[key] = self._versions.get(key, 0) + 1
+
+    def etag(self, keys):
+        """ETag for the current request given the resources it reads"""
+        ttl = current_app.config.get('CONDITIONAL_GET_TTL', 30)
+        parts = [BOOT_NONCE, str(int(time.time() // ttl)), request.full_path,
+                 str(session.get('user_type')), str(session.get('user_id'))]
+        parts.extend(f'{key}={self.get(key)}' for key in keys)
+        return hashlib.sha1('|'.join(parts).encode()).hexdigest()[:20]
+
+    def stats(self):
+        requests = self.hits + self.misses
+        return {
+            'resources': len(self._versions),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / requests, 4) if requests else 0.0
+        }
+
+
+# Global version stamps instance
+versions = VersionStamps()
+
+
+def chat_resource(conversation_key):
+    return f'chat:{conversation_key}'
+
+
+def conditional(*resources):
+    """Serve 304 Not Modified when none of ``resources`` changed
+
+    Each resource is a key string or a callable returning one, evaluated
+    per request (e.g. to pick the conversation from the query string).
+    Versions are read before the view runs, so a write that lands during
+    the query only makes the next request miss.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            keys = [resource() if callable(resource) else resource for resource in resources]
+            etag = versions.etag(keys)
+            if etag in request.if_none_match:
+                versions.hits += 1
+                response = make_response('', 304)
+                response.set_etag(etag)
+                return response
+            versions.misses += 1
+            response = make_response(f(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag)
+            return response
+        return decorated_function
+    return decorator
+
+
+@on_commit(Donor)
+def _bump_donors(operation, row, previous):
+    versions.bump('donors')
+
+
+@on_bulk_change(Donor)
+def _bump_donors_on_bulk_load():
+    versions.bump('donors')
+
+
+@on_commit(EmergencyRequest)
+def _bump_emergencies(operation, row, previous):
+    versions.bump('emergencies')
+
+
+@on_bulk_change(EmergencyRequest)
+def _bump_emergencies_on_bulk_load():
+    versions.bump('emergencies')
+
+
+@on_commit(ChatMessage)
+def _bump_conversation(operation, row, previous):
+    versions.bump(chat_resource(row['conversation_key']))